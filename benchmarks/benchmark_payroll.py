@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+工资计算器 - 性能基准测试
+
+用固定随机种子生成合成员工名单（收入覆盖默认税率表全部8档，扣除项选择混合），
+测量单人计算、批量计算、CSV导出、配置导入导出的耗时、吞吐量和峰值内存，
+结果写入 JSON 文件；比较两个结果文件可以发现性能回退。
+
+用法:
+    python benchmarks/benchmark_payroll.py --sizes 1000,10000,100000 --output bench.json
+    python benchmarks/benchmark_payroll.py --compare base.json bench.json --threshold 0.10
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from salary_calculator_core import SalaryCalculator
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+SINGLE_CALCULATIONS = 20000
+
+
+def build_calculator():
+    """基准测试用的计算器：默认配置加一个固定金额扣除项和一个可选百分比扣除项，不使用结果缓存"""
+    calculator = SalaryCalculator(cache_size=0)
+    calculator.add_deduction_item("餐费", "fixed_amount", amount=200, optional=True)
+    calculator.add_deduction_item("工会费", "percentage", rate=0.005, base="绩效奖金", optional=True)
+    return calculator
+
+
+def generate_roster(calculator, size, seed=20240617):
+    """生成合成员工名单：先均匀选一个税率档次，再反推出落在该档的基本工资"""
+    rng = random.Random(seed)
+    brackets = calculator.get_tax_brackets()
+    deduction_items = calculator.get_deduction_items()
+    pre_tax_rate = sum(item["rate"] for name, item in deduction_items.items()
+                       if item["type"] == "percentage" and item.get("pre_tax") and item["base"] == "基本工资")
+    threshold = calculator.config["calculation_methods"]["progressive_tax"].get("threshold", 5000)
+    required = [name for name, item in deduction_items.items() if not item.get("optional", False)]
+    optional = [name for name, item in deduction_items.items() if item.get("optional", False)]
+
+    records = []
+    for i in range(size):
+        bracket = rng.choice(brackets)
+        upper = bracket["max"] if bracket["max"] != float("inf") else bracket["min"] * 2
+        taxable = rng.uniform(bracket["min"], upper)
+        bonus = rng.choice([0, 500, 1000, 2000, 5000])
+        allowance = rng.choice([0, 300, 800])
+        # 应税收入 = 基本工资 × (1 - 税前比例) + 奖金 + 补贴 - 起征点
+        base_salary = round(max(2000, (taxable + threshold - bonus - allowance) / (1 - pre_tax_rate)), 2)
+
+        salary_data = {"基本工资": base_salary, "绩效奖金": bonus, "餐补": allowance}
+        if rng.random() < 0.3:
+            salary_data["加班费"] = round(rng.uniform(0, 3000), 2)
+        selected = [name for name in required if rng.random() < 0.9]
+        selected += [name for name in optional if rng.random() < 0.4]
+        if "餐费" in selected and rng.random() < 0.5:
+            salary_data["deduction_餐费"] = rng.choice([100, 150, 300])
+        records.append((f"员工{i:07d}", salary_data, selected))
+    return records
+
+
+def measure(func, repeat=1):
+    """返回 (最短耗时秒数, 峰值内存字节)；峰值内存单独跑一次测量，避免 tracemalloc 影响计时"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def run_benchmarks(sizes, seed, repeat):
+    results = []
+
+    def record(name, size, seconds, peak, operations):
+        results.append({
+            "name": name,
+            "size": size,
+            "seconds": seconds,
+            "throughput": operations / seconds if seconds > 0 else None,
+            "peak_memory_bytes": peak
+        })
+        print(f"{name:<28} {size:>9,}  {seconds * 1000:>10.2f} ms  "
+              f"{operations / seconds if seconds > 0 else 0:>14,.0f} /s  {peak / 1e6:>8.1f} MB")
+
+    print(f"{'benchmark':<28} {'size':>9}  {'time':>13}  {'throughput':>16}  {'peak mem':>11}")
+
+    # 单人计算（不经过缓存）
+    calculator = build_calculator()
+    sample = generate_roster(calculator, SINGLE_CALCULATIONS, seed)
+
+    def single():
+        for _, salary_data, selected in sample:
+            calculator.calculate_salary(salary_data, selected)
+
+    seconds, peak = measure(single, repeat)
+    record("calculate_salary", SINGLE_CALCULATIONS, seconds, peak, SINGLE_CALCULATIONS)
+
+    seconds, peak = measure(lambda: [calculator.calculate_progressive_tax(x * 25.0) for x in range(SINGLE_CALCULATIONS)],
+                            repeat)
+    record("calculate_progressive_tax", SINGLE_CALCULATIONS, seconds, peak, SINGLE_CALCULATIONS)
+
+    # 配置导入导出
+    config_json = calculator.export_config()
+    seconds, peak = measure(lambda: [calculator.export_config() for _ in range(1000)], repeat)
+    record("export_config", 1000, seconds, peak, 1000)
+    seconds, peak = measure(lambda: [calculator.import_config(config_json) for _ in range(1000)], repeat)
+    record("import_config", 1000, seconds, peak, 1000)
+
+    for size in sizes:
+        calculator = build_calculator()
+        calculator.add_employees(generate_roster(calculator, size, seed))
+
+        seconds, peak = measure(calculator.calculate_all_employees_columnar, repeat)
+        record("calculate_all_columnar", size, seconds, peak, size)
+
+        def full_batch():
+            calculator.invalidate_results()  # 强制整体重算
+            calculator.calculate_all_employees()
+
+        seconds, peak = measure(full_batch, repeat)
+        record("calculate_all_employees", size, seconds, peak, size)
+
+        seconds, peak = measure(calculator.export_employees_to_csv, repeat)
+        record("export_employees_to_csv", size, seconds, peak, size)
+
+        seconds, peak = measure(lambda: calculator.write_employees_csv(io.StringIO()), repeat)
+        record("write_employees_csv", size, seconds, peak, size)
+
+    return results
+
+
+def compare(base_path, new_path, threshold):
+    """比较两个结果文件，耗时变慢超过 threshold 的项目视为回退，返回回退数量"""
+    with open(base_path, "r", encoding="utf-8") as f:
+        base = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+    with open(new_path, "r", encoding="utf-8") as f:
+        new = {(r["name"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    print(f"{'benchmark':<28} {'size':>9}  {'base':>10}  {'new':>10}  {'change':>8}  {'mem change':>10}")
+    for key in sorted(base.keys() & new.keys()):
+        old_result, new_result = base[key], new[key]
+        change = new_result["seconds"] / old_result["seconds"] - 1
+        mem_change = new_result["peak_memory_bytes"] / max(old_result["peak_memory_bytes"], 1) - 1
+        flag = ""
+        if change > threshold:
+            regressions += 1
+            flag = "  <-- 回退"
+        print(f"{key[0]:<28} {key[1]:>9,}  {old_result['seconds'] * 1000:>8.2f}ms  "
+              f"{new_result['seconds'] * 1000:>8.2f}ms  {change:>+8.1%}  {mem_change:>+10.1%}{flag}")
+    for key in sorted(base.keys() - new.keys()):
+        print(f"{key[0]:<28} {key[1]:>9,}  仅存在于基准文件")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="工资计算器性能基准测试")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="员工规模，逗号分隔（如 1000,10000,100000,1000000）")
+    parser.add_argument("--seed", type=int, default=20240617, help="随机种子")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最短耗时）")
+    parser.add_argument("--output", default="bench_results.json", help="结果文件")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="比较两个结果文件")
+    parser.add_argument("--threshold", type=float, default=0.10, help="视为回退的变慢比例")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        regressions = compare(args.compare[0], args.compare[1], args.threshold)
+        return 1 if regressions else 0
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    results = run_benchmarks(sizes, args.seed, args.repeat)
+    payload = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": args.seed,
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    print(f"结果已写入 {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
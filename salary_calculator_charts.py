@@ -0,0 +1,92 @@
+"""
+工资计算器 - 汇总图表数据
+员工较多时不再逐人画柱状图，而是用一次向量化计算得到税后收入分布、各税率档次汇总、
+税后收入最高的员工和抽样散点，图表数据量与员工人数无关。
+"""
+
+import numpy as np
+
+# 员工人数超过该值时改用汇总图表
+CHART_DETAIL_LIMIT = 100
+# 税后收入分布的分组数
+HISTOGRAM_BINS = 30
+# 税后收入排行显示的人数
+TOP_EARNERS = 20
+# 收入散点图最多抽样的员工数
+SCATTER_SAMPLE_SIZE = 5000
+
+
+def net_income_histogram(net_incomes, bins=HISTOGRAM_BINS):
+    """税后收入分布：返回 (各组的左边界, 右边界, 人数)"""
+    if len(net_incomes) == 0:
+        return np.empty(0), np.empty(0), np.empty(0, dtype=np.int64)
+    counts, edges = np.histogram(net_incomes, bins=bins)
+    return edges[:-1], edges[1:], counts
+
+
+def bracket_label(tax_table, index):
+    """税率档次的显示名称，如 第2档 (3%)；index 为 -1 表示未计个税"""
+    if index < 0:
+        return "未计个税"
+    return f"第{index + 1}档 ({tax_table.rates[index] * 100:g}%)"
+
+
+def bracket_totals(brackets, tax_table, total_incomes, total_deductions, net_incomes):
+    """按个税档次汇总人数和金额，只列出有员工的档次（未计个税的员工单独一行）"""
+    slots = len(tax_table.rates) + 1
+    positions = brackets + 1  # 未计个税的 -1 放在第 0 位
+    headcounts = np.bincount(positions, minlength=slots)
+    incomes = np.bincount(positions, weights=total_incomes, minlength=slots)
+    deductions = np.bincount(positions, weights=total_deductions, minlength=slots)
+    nets = np.bincount(positions, weights=net_incomes, minlength=slots)
+    return [
+        {
+            "档次": bracket_label(tax_table, position - 1),
+            "人数": int(headcounts[position]),
+            "总收入": float(incomes[position]),
+            "总扣除": float(deductions[position]),
+            "税后收入": float(nets[position])
+        }
+        for position in np.flatnonzero(headcounts)
+    ]
+
+
+def top_earners(names, net_incomes, count=TOP_EARNERS):
+    """税后收入最高的员工，返回 [(员工姓名, 税后收入), ...]（从高到低）"""
+    count = min(count, len(net_incomes))
+    if count == 0:
+        return []
+    top = np.argpartition(net_incomes, len(net_incomes) - count)[-count:]
+    top = top[np.argsort(-net_incomes[top], kind="stable")]
+    return [(names[index], float(net_incomes[index])) for index in top]
+
+
+def sample_indices(count, size=SCATTER_SAMPLE_SIZE, seed=0):
+    """固定种子的不放回抽样（按名单顺序排列），员工不多于 size 时返回全部"""
+    if count <= size:
+        return np.arange(count)
+    return np.sort(np.random.default_rng(seed).choice(count, size, replace=False))
+
+
+def summarize_payroll(payroll_run, bins=HISTOGRAM_BINS, top_count=TOP_EARNERS, sample_size=SCATTER_SAMPLE_SIZE):
+    """工资计算快照的汇总图表数据"""
+    arrays = payroll_run.chart_arrays()
+    names = arrays["employees"]
+    lower, upper, counts = net_income_histogram(arrays["net_incomes"], bins)
+    sample = sample_indices(len(names), sample_size)
+    summary = {
+        "headcount": len(names),
+        "histogram": {"lower": lower, "upper": upper, "counts": counts},
+        "brackets": [],
+        "top_earners": top_earners(names, arrays["net_incomes"], top_count),
+        "sample": {
+            "employees": [names[index] for index in sample],
+            "total_incomes": arrays["total_incomes"][sample],
+            "net_incomes": arrays["net_incomes"][sample]
+        }
+    }
+    if payroll_run.plan is not None:
+        summary["brackets"] = bracket_totals(arrays["tax_brackets"], payroll_run.plan.tax_table,
+                                             arrays["total_incomes"], arrays["total_deductions"],
+                                             arrays["net_incomes"])
+    return summary
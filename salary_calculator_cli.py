@@ -0,0 +1,222 @@
+"""
+工资计算器 - 命令行批量计算
+不启动网页界面，直接用配置文件和员工名单计算工资并输出 CSV / JSON，
+只依赖核心计算模块（不导入 streamlit、plotly），适合定时任务和脚本调用。
+
+用法:
+    salary-calculator batch --config 工资配置.json --roster 员工名单.csv --output 工资表.csv
+    salary-calculator batch --config 工资配置.json --roster 员工名单.xlsx --output 工资表.json
+    salary-calculator batch --config 工资配置.json --roster 员工名单.parquet --output 工资表.parquet
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_import import parse_amount
+
+OUTPUT_FORMATS = ("csv", "json", "parquet")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="salary-calculator batch",
+        description="按配置文件批量计算员工工资（不启动网页界面）"
+    )
+    parser.add_argument("--config", help="配置文件（JSON，与“导出配置”的格式相同），不指定时使用默认配置")
+    parser.add_argument("--roster", required=True,
+                        help="员工名单：CSV / XLSX / Parquet（与批量导入格式相同）或 JSON（{员工姓名: 员工数据}）")
+    parser.add_argument("--output", default="-", help="输出文件，默认输出到标准输出；以 .gz 结尾时压缩")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="输出格式，不指定时按输出文件扩展名判断")
+    parser.add_argument("--encoding", default="utf-8-sig", help="CSV 名单和 CSV 输出的编码")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="分块导入和导出的员工数")
+    parser.add_argument("--workers", type=int, help="多进程计算的工作进程数，CSV / JSON / Parquet 输出均适用"
+                             "（员工少于 5 万名时不启用，分块导出时每块至少 5 万名员工）")
+    parser.add_argument("--strict", action="store_true", help="名单中有无效行时不输出结果，直接失败")
+    return parser
+
+
+def _output_format(args):
+    if args.format:
+        return args.format
+    path = args.output.lower()
+    if path.endswith(".gz"):
+        path = path[:-3]
+    if path.endswith(".json"):
+        return "json"
+    if path.endswith(".parquet"):
+        return "parquet"
+    return "csv"
+
+
+def _parse_roster_entry(data, deduction_names):
+    """解析 JSON 名单中一个员工的数据，返回 (薪资数据, 适用扣除项)，数据无效时抛出 ValueError
+
+    金额与 CSV / Excel 导入一样用 parse_amount 解析，空值视为未填写（取默认值）
+    """
+    if not isinstance(data, dict):
+        raise ValueError("员工数据必须是 {\"salary_data\": {...}, \"selected_deductions\": [...]} 格式")
+    salary_data = data.get("salary_data")
+    if salary_data is not None and not isinstance(salary_data, dict):
+        raise ValueError("salary_data 必须是 {收入项: 金额} 格式")
+    selected_deductions = data.get("selected_deductions")
+    if selected_deductions is not None and not isinstance(selected_deductions, list):
+        raise ValueError("selected_deductions 必须是扣除项名称列表")
+
+    parsed = None
+    if salary_data is not None:
+        parsed = {}
+        for key, value in salary_data.items():
+            try:
+                amount = parse_amount(value)
+            except ValueError as e:
+                raise ValueError(f"{key}: {str(e)}")
+            if amount is not None:
+                parsed[key] = amount
+    if selected_deductions is not None:
+        unknown = [str(name) for name in selected_deductions if name not in deduction_names]
+        if unknown:
+            raise ValueError(f"未知扣除项: {'、'.join(unknown)}")
+    return parsed, selected_deductions
+
+
+def load_roster(calculator, path, chunk_size, encoding):
+    """读取员工名单，返回导入报告（格式与 import_employees 相同）"""
+    if path.lower().endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            employees = json.load(f)
+        if not isinstance(employees, dict):
+            raise ValueError("JSON 名单必须是 {员工姓名: 员工数据} 格式")
+        deduction_names = calculator.config["deduction_items"]
+        rows = []  # (名单中的序号, 员工记录)
+        errors = []
+        for index, (name, data) in enumerate(employees.items()):
+            try:
+                salary_data, selected_deductions = _parse_roster_entry(data, deduction_names)
+            except ValueError as e:
+                errors.append({"row": index + 1, "name": name, "error": str(e)})
+                continue
+            rows.append((index, (name, salary_data, selected_deductions)))
+        added, failures = calculator.add_employees([record for _, record in rows])
+        errors += [{"row": rows[index][0] + 1, "name": name, "error": reason} for index, name, reason in failures]
+        errors.sort(key=lambda error: error["row"])
+        return {
+            "imported": added,
+            "failed": len(errors),
+            "errors": errors,
+            "ignored_columns": []
+        }
+    return calculator.import_employees(path, chunk_size=chunk_size, encoding=encoding)
+
+
+def json_payload(calculator):
+    """公司汇总和每个员工的计算结果"""
+    return {
+        "totals": calculator.get_company_totals(),
+        "employees": dict(calculator.calculate_all_employees())
+    }
+
+
+def write_json(payload, file):
+    json.dump(payload, file, ensure_ascii=False, indent=2)
+    file.write("\n")
+
+
+def write_json_file(payload, path):
+    """写入 JSON 文件（以 .gz 结尾时压缩）：先写临时文件再替换，出错时不留下不完整的输出文件"""
+    temp_path = f"{path}.tmp"
+    try:
+        if path.endswith(".gz"):
+            f = gzip.open(temp_path, "wt", compresslevel=6, encoding="utf-8")
+        else:
+            f = open(temp_path, "w", encoding="utf-8")
+        with f:
+            write_json(payload, f)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def run_batch(args):
+    """执行批量计算，返回退出码"""
+    runner = None
+    if args.workers and args.workers > 1:
+        from salary_calculator_parallel import ParallelPayrollRunner
+        runner = ParallelPayrollRunner(workers=args.workers)
+    calculator = SalaryCalculator(parallel_runner=runner)
+
+    try:
+        if args.config:
+            success, message = calculator.import_config_from_file(args.config)
+            if not success:
+                print(message, file=sys.stderr)
+                return 1
+        else:
+            valid, message = calculator.validate_config()
+            if not valid:
+                print(message, file=sys.stderr)
+                return 1
+        for warning in calculator.get_config_warnings():
+            print(f"注意: {warning}", file=sys.stderr)
+
+        try:
+            report = load_roster(calculator, args.roster, args.chunk_size, args.encoding)
+        except (OSError, ValueError, ImportError) as e:
+            print(f"员工名单读取失败: {str(e)}", file=sys.stderr)
+            return 1
+        for error in report["errors"]:
+            print(f"第{error['row']}行 {error['name']}: {error['error']}", file=sys.stderr)
+        if report.get("config_changed"):
+            print("注意: 名单文件是在不同的工资配置下导出的，请核对收入项和扣除项", file=sys.stderr)
+        if report["ignored_columns"]:
+            print(f"已忽略无法识别的列: {'、'.join(report['ignored_columns'])}", file=sys.stderr)
+        if report["failed"] and args.strict:
+            print(f"名单中有{report['failed']}行无效，未输出结果", file=sys.stderr)
+            return 1
+
+        output_format = _output_format(args)
+        if output_format == "parquet":
+            output = sys.stdout.buffer if args.output == "-" else args.output
+            success, message = calculator.export_employees_to_parquet(output)
+            if not success:
+                print(message, file=sys.stderr)
+                return 1
+        elif output_format == "json":
+            # 先算完全部结果再输出
+            payload = json_payload(calculator)
+            if args.output == "-":
+                write_json(payload, sys.stdout)
+            else:
+                try:
+                    write_json_file(payload, args.output)
+                except OSError as e:
+                    print(f"工资表导出失败: {str(e)}", file=sys.stderr)
+                    return 1
+        elif args.output == "-":
+            calculator.write_employees_csv(sys.stdout, args.chunk_size)
+        else:
+            success, message = calculator.export_employees_to_csv_file(args.output, args.chunk_size, args.encoding)
+            if not success:
+                print(message, file=sys.stderr)
+                return 1
+
+        print(f"计算完成：{report['imported']}名员工，{report['failed']}行无效", file=sys.stderr)
+        return 0
+    finally:
+        if runner is not None:
+            runner.shutdown()
+
+
+def main(argv=None):
+    """命令行入口"""
+    args = build_parser().parse_args(argv)
+    return run_batch(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
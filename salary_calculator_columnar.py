@@ -0,0 +1,345 @@
+"""
+工资计算器 - 列式批量计算引擎
+将员工名单装入 NumPy 数组（每个收入项一列），对整列一次性完成扣除项和个税计算，
+结果与逐个员工调用 SalaryCalculator.calculate_salary 完全一致；
+计算计划按分计算时（plan.fen 不为空），全部金额改用 int64 的分计算
+"""
+
+import math
+from fractions import Fraction
+from functools import cached_property
+
+import numpy as np
+
+from salary_calculator_fen import FEN_PER_YUAN, to_fen_array, to_yuan
+from salary_calculator_plan import STEP_PERCENTAGE, STEP_FIXED_AMOUNT, STEP_PROGRESSIVE_TAX
+
+
+class ColumnarPayroll:
+    """列式工资计算结果"""
+
+    def __init__(self, names, income_items, deduction_items, income, deductions,
+                 selected, selections, total_income, total_deductions, net_income):
+        self.names = names                      # 员工姓名列表（名单顺序）
+        self.income_items = income_items        # 收入项名称（配置顺序）
+        self.deduction_items = deduction_items  # 扣除项名称（配置顺序）
+        self.income = income                    # shape: (收入项数, 员工数)
+        self.deductions = deductions            # shape: (扣除项数, 员工数)，未选中为0
+        self.selected = selected                # shape: (扣除项数, 员工数)，布尔
+        self.selections = selections            # 每个员工原始的扣除项选择列表（序列）
+        self.total_income = total_income
+        self.total_deductions = total_deductions
+        self.net_income = net_income
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def concat(cls, parts):
+        """按顺序拼接多个分片的计算结果（各分片须基于同一计算计划）"""
+        first = parts[0]
+        names = []
+        selections = []
+        for part in parts:
+            names.extend(part.names)
+            selections.extend(part.selections)
+        return cls(
+            names, first.income_items, first.deduction_items,
+            np.concatenate([part.income for part in parts], axis=1),
+            np.concatenate([part.deductions for part in parts], axis=1),
+            np.concatenate([part.selected for part in parts], axis=1),
+            selections,
+            np.concatenate([part.total_income for part in parts]),
+            np.concatenate([part.total_deductions for part in parts]),
+            np.concatenate([part.net_income for part in parts])
+        )
+
+    def totals(self):
+        """公司汇总（总收入、总扣除、实发总额、人数）"""
+        return {
+            "total_income": float(self.total_income.sum()),
+            "total_deductions": float(self.total_deductions.sum()),
+            "net_income": float(self.net_income.sum()),
+            "headcount": len(self.names)
+        }
+
+    def exact_totals(self):
+        """总收入、总扣除、实发总额的精确值 (Fraction)，用作增量汇总的起点"""
+        return {
+            "total_income": Fraction(math.fsum(self.total_income.tolist())),
+            "total_deductions": Fraction(math.fsum(self.total_deductions.tolist())),
+            "net_income": Fraction(math.fsum(self.net_income.tolist()))
+        }
+
+    def iter_rows(self):
+        """逐行生成 [姓名, 各收入项, 各扣除项(未选中为空), 总收入, 总扣除, 税后收入]"""
+        income_rows = self.income.T.tolist()
+        deduction_rows = self.deductions.T.tolist()
+        selected_rows = self.selected.T.tolist()
+        total_income = self.total_income.tolist()
+        total_deductions = self.total_deductions.tolist()
+        net_income = self.net_income.tolist()
+
+        for i, name in enumerate(self.names):
+            row = [name]
+            row.extend(income_rows[i])
+            row.extend(amount if chosen else "" for amount, chosen in zip(deduction_rows[i], selected_rows[i]))
+            row.append(total_income[i])
+            row.append(total_deductions[i])
+            row.append(net_income[i])
+            yield row
+
+    def to_results(self):
+        """转换为与 calculate_all_employees 相同的 {员工: 结果字典} 结构"""
+        income_rows = self.income.T.tolist()
+        deduction_rows = self.deductions.T.tolist()
+        selected_rows = self.selected.T.tolist()
+        total_income = self.total_income.tolist()
+        total_deductions = self.total_deductions.tolist()
+        net_income = self.net_income.tolist()
+
+        results = {}
+        for i, name in enumerate(self.names):
+            results[name] = {
+                "total_income": total_income[i],
+                "income_breakdown": dict(zip(self.income_items, income_rows[i])),
+                "deductions": {
+                    item: amount
+                    for item, amount, chosen in zip(self.deduction_items, deduction_rows[i], selected_rows[i])
+                    if chosen
+                },
+                "total_deductions": total_deductions[i],
+                "net_income": net_income[i],
+                "selected_deductions": self.selections[i]
+            }
+        return results
+
+
+class FenColumnarPayroll(ColumnarPayroll):
+    """按分计算的列式结果：*_fen 为 int64 的分，income、deductions 等元金额数组在第一次使用时换算，
+    汇总按整数分相加"""
+
+    def __init__(self, names, income_items, deduction_items, income_fen, deductions_fen,
+                 selected, selections, total_income_fen, total_deductions_fen):
+        self.names = names
+        self.income_items = income_items
+        self.deduction_items = deduction_items
+        self.income_fen = income_fen
+        self.deductions_fen = deductions_fen
+        self.selected = selected
+        self.selections = selections
+        self.total_income_fen = total_income_fen
+        self.total_deductions_fen = total_deductions_fen
+        self.net_income_fen = total_income_fen - total_deductions_fen
+
+    @cached_property
+    def income(self):
+        return to_yuan(self.income_fen)
+
+    @cached_property
+    def deductions(self):
+        return to_yuan(self.deductions_fen)
+
+    @cached_property
+    def total_income(self):
+        return to_yuan(self.total_income_fen)
+
+    @cached_property
+    def total_deductions(self):
+        return to_yuan(self.total_deductions_fen)
+
+    @cached_property
+    def net_income(self):
+        return to_yuan(self.net_income_fen)
+
+    @classmethod
+    def concat(cls, parts):
+        """按顺序拼接多个分片的计算结果（各分片须基于同一计算计划）"""
+        first = parts[0]
+        names = []
+        selections = []
+        for part in parts:
+            names.extend(part.names)
+            selections.extend(part.selections)
+        return cls(
+            names, first.income_items, first.deduction_items,
+            np.concatenate([part.income_fen for part in parts], axis=1),
+            np.concatenate([part.deductions_fen for part in parts], axis=1),
+            np.concatenate([part.selected for part in parts], axis=1),
+            selections,
+            np.concatenate([part.total_income_fen for part in parts]),
+            np.concatenate([part.total_deductions_fen for part in parts])
+        )
+
+    def totals(self):
+        """公司汇总（整数分相加后换算为元）"""
+        return {
+            "total_income": int(self.total_income_fen.sum()) / FEN_PER_YUAN,
+            "total_deductions": int(self.total_deductions_fen.sum()) / FEN_PER_YUAN,
+            "net_income": int(self.net_income_fen.sum()) / FEN_PER_YUAN,
+            "headcount": len(self.names)
+        }
+
+    def exact_totals(self):
+        return {
+            "total_income": Fraction(int(self.total_income_fen.sum()), FEN_PER_YUAN),
+            "total_deductions": Fraction(int(self.total_deductions_fen.sum()), FEN_PER_YUAN),
+            "net_income": Fraction(int(self.net_income_fen.sum()), FEN_PER_YUAN)
+        }
+
+
+class RosterColumns:
+    """按列读取员工名单：姓名、扣除项选择，以及任一键（收入项或 deduction_ 自定义金额）的整列数值
+
+    默认从 (员工姓名, 员工数据) 序列逐个读取；员工存储可以通过 roster_columns() 提供
+    直接读取内部编码的实现（见 CompactEmployeeRepository），省去逐个还原员工数据字典
+    """
+
+    def __init__(self, employees):
+        self.names = []
+        self.selections = []  # 每个员工原始的扣除项选择列表
+        self._salary_datas = []
+        for name, employee_data in employees:
+            self.names.append(name)
+            self._salary_datas.append(employee_data.get("salary_data", {}))
+            self.selections.append(employee_data.get("selected_deductions", []))
+
+    def __len__(self):
+        return len(self.names)
+
+    def values(self, key, default):
+        """整列 key 的金额（float64），未填写的员工为 default"""
+        return np.fromiter((data.get(key, default) for data in self._salary_datas),
+                           dtype=np.float64, count=len(self.names))
+
+    def fen_values(self, key, default):
+        """整列 key 的金额换算为分（int64），按分计算时使用"""
+        return to_fen_array(self.values(key, default))
+
+    def chosen(self, deduction):
+        """整列是否选择了扣除项 deduction"""
+        return np.fromiter((deduction in selection for selection in self.selections),
+                           dtype=bool, count=len(self.names))
+
+
+def read_roster_columns(employees):
+    """把员工序列转为 RosterColumns：已是列式数据时原样返回，存储提供 roster_columns() 时直接使用"""
+    if isinstance(employees, RosterColumns):
+        return employees
+    reader = getattr(employees, "roster_columns", None)
+    if reader is not None:
+        return reader()
+    return RosterColumns(employees)
+
+
+def calculate_payroll_columnar(plan, employees):
+    """按计算计划对员工名单做列式工资计算
+
+    plan: 已编译的 CalculationPlan
+    employees: 可迭代的 (员工姓名, 员工数据) 序列，员工数据格式与 SalaryCalculator.employees 相同，
+    或 RosterColumns
+    """
+    if plan.fen is not None:
+        return calculate_payroll_fen(plan, employees)
+
+    roster = read_roster_columns(employees)
+    names = roster.names
+    selections = roster.selections
+    count = len(names)
+
+    # 每个收入项一列
+    income_items = [item_name for item_name, _ in plan.income_items]
+    income = np.empty((len(income_items), count), dtype=np.float64)
+    total_income = np.zeros(count, dtype=np.float64)
+    for row, (item_name, default) in enumerate(plan.income_items):
+        income[row] = roster.values(item_name, default)
+        total_income += income[row]
+    income_rows = dict(zip(income_items, income))
+
+    # 扣除项按依赖顺序逐列计算，未选中的员工记为0
+    deduction_items = plan.deduction_order
+    deduction_rows = {name: row for row, name in enumerate(deduction_items)}
+    deductions = np.zeros((len(deduction_items), count), dtype=np.float64)
+    selected = np.zeros((len(deduction_items), count), dtype=bool)
+
+    for step in plan.steps:
+        chosen = roster.chosen(step.name)
+
+        kind = step.kind
+        if kind == STEP_PERCENTAGE:
+            amount = income_rows[step.base] * step.rate
+        elif kind == STEP_FIXED_AMOUNT:
+            amount = roster.values(step.override_key, step.amount)
+        elif kind == STEP_PROGRESSIVE_TAX:
+            # 应税收入 = 总收入 - 税前扣除 - 起征点
+            pre_tax_deductions = np.zeros(count, dtype=np.float64)
+            for dependency in step.depends_on:
+                pre_tax_deductions += deductions[deduction_rows[dependency]]
+            taxable_income = np.maximum(0, total_income - pre_tax_deductions - plan.threshold)
+            amount = plan.tax_table.tax_array(taxable_income)
+        else:
+            amount = np.zeros(count)
+
+        deductions[step.index] = np.where(chosen, amount, 0.0)
+        selected[step.index] = chosen
+
+    # 合计保持配置顺序
+    total_deductions = np.zeros(count, dtype=np.float64)
+    for row in range(len(deduction_items)):
+        total_deductions += deductions[row]
+
+    net_income = total_income - total_deductions
+
+    return ColumnarPayroll(names, income_items, deduction_items, income, deductions,
+                           selected, selections, total_income, total_deductions, net_income)
+
+
+def calculate_payroll_fen(plan, employees):
+    """按分计算的列式工资计算：输入换算为分后全部用 int64 运算，舍入规则见 salary_calculator_fen"""
+    fen = plan.fen
+    roster = read_roster_columns(employees)
+    names = roster.names
+    selections = roster.selections
+    count = len(names)
+
+    income_items = [item_name for item_name, _ in plan.income_items]
+    income = np.empty((len(income_items), count), dtype=np.int64)
+    for row, (item_name, default) in enumerate(plan.income_items):
+        income[row] = roster.fen_values(item_name, default)
+    total_income = income.sum(axis=0)
+    income_rows = dict(zip(income_items, income))
+
+    deduction_items = plan.deduction_order
+    deduction_rows = {name: row for row, name in enumerate(deduction_items)}
+    deductions = np.zeros((len(deduction_items), count), dtype=np.int64)
+    selected = np.zeros((len(deduction_items), count), dtype=bool)
+
+    for step in plan.steps:
+        chosen = roster.chosen(step.name)
+
+        kind = step.kind
+        if kind == STEP_PERCENTAGE:
+            amount = fen.percentage(step.name, income_rows[step.base])
+        elif kind == STEP_FIXED_AMOUNT:
+            # 未填写的员工记为 NaN，直接用已换算的默认金额
+            values = roster.values(step.override_key, np.nan)
+            present = ~np.isnan(values)
+            amount = np.full(count, fen.amounts[step.name], dtype=np.int64)
+            if present.any():
+                amount[present] = to_fen_array(values[present])
+        elif kind == STEP_PROGRESSIVE_TAX:
+            pre_tax_deductions = np.zeros(count, dtype=np.int64)
+            for dependency in step.depends_on:
+                pre_tax_deductions += deductions[deduction_rows[dependency]]
+            amount = fen.tax(np.maximum(0, total_income - pre_tax_deductions - fen.threshold))
+        else:
+            amount = np.zeros(count, dtype=np.int64)
+
+        deductions[step.index] = np.where(chosen, amount, 0)
+        selected[step.index] = chosen
+
+    # 整数相加与顺序无关
+    total_deductions = deductions.sum(axis=0)
+
+    return FenColumnarPayroll(names, income_items, deduction_items, income, deductions,
+                              selected, selections, total_income, total_deductions)
@@ -0,0 +1,113 @@
+"""
+工资计算器 - 不可变配置快照
+修改配置时不改动原来的字典，而是生成新的快照：未改动的部分与旧快照共用同一对象（结构共享），
+已经开始的计算继续使用它取得的快照，读取配置无需加锁或深拷贝。
+快照带有版本号和内容哈希，可直接用作缓存键。
+"""
+
+import hashlib
+import json
+
+
+class FrozenDict(dict):
+    """只读字典：修改操作抛出 TypeError；可以直接 JSON 序列化和 pickle，拷贝时返回自身"""
+
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("配置快照不可修改，请通过 SalaryCalculator 的方法修改配置")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def set(self, key, value):
+        """返回把 key 设为 value 的新字典，其余的值与本字典共用"""
+        data = dict(self)
+        data[key] = freeze(value)
+        return FrozenDict(data)
+
+    def remove(self, key):
+        """返回去掉 key 的新字典，其余的值与本字典共用"""
+        data = dict(self)
+        del data[key]
+        return FrozenDict(data)
+
+
+def freeze(value):
+    """把嵌套的 dict / list 转为 FrozenDict / tuple，已冻结的部分原样返回（保持共用）"""
+    if isinstance(value, FrozenDict):
+        return value
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        items = tuple(freeze(item) for item in value)
+        if type(value) is tuple and all(new is old for new, old in zip(items, value)):
+            return value
+        return items
+    return value
+
+
+def thaw(value):
+    """把快照转回普通的可修改 dict / list（深拷贝）"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def assoc_in(node, path, value):
+    """返回把 path 处的值设为 value 的新节点，只重建路径上的字典和元组，其余部分共用
+
+    path 中的字符串为字典键，整数为元组（如税率表）下标。
+    """
+    key = path[0]
+    if len(path) > 1:
+        value = assoc_in(node[key], path[1:], value)
+    if isinstance(node, tuple):
+        return node[:key] + (freeze(value),) + node[key + 1:]
+    return node.set(key, value)
+
+
+def dissoc_in(node, path):
+    """返回去掉 path 处的值的新节点，只重建路径上的字典和元组，其余部分共用"""
+    key = path[0]
+    if len(path) > 1:
+        return assoc_in(node, (key,), dissoc_in(node[key], path[1:]))
+    if isinstance(node, tuple):
+        return node[:key] + node[key + 1:]
+    return node.remove(key)
+
+
+class ConfigSnapshot(FrozenDict):
+    """某一版本的完整配置（只读）
+
+    version: 配置版本号，计算器每发布一个新快照加一
+    config_hash: 配置内容的 SHA-256，第一次使用时计算
+    """
+
+    __slots__ = ("version", "_config_hash")
+
+    def __init__(self, config, version=0):
+        super().__init__({key: freeze(value) for key, value in config.items()})
+        self.version = version
+        self._config_hash = None
+
+    def __reduce__(self):
+        return (ConfigSnapshot, (dict(self), self.version))
+
+    @property
+    def config_hash(self):
+        if self._config_hash is None:
+            content = json.dumps(self, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+            self._config_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        return self._config_hash
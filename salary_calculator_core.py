@@ -1,13 +1,253 @@
 import json
-import pandas as pd
+import csv
+import gzip
+import hashlib
 from datetime import datetime
 import math
 import io
+from collections import OrderedDict
+from bisect import bisect_left, insort
+from fractions import Fraction
+from itertools import islice
+from types import MappingProxyType
+import numpy as np
+from salary_calculator_columnar import calculate_payroll_columnar
+from salary_calculator_grossup import GrossUpError, solve_gross_up
+from salary_calculator_import import import_employees
+from salary_calculator_metrics import PayrollMetrics, record_roster, record_salary, timed
+from salary_calculator_config import ConfigSnapshot, assoc_in, dissoc_in
+from salary_calculator_fen import (DEFAULT_ROUNDING, FEN_PER_YUAN, MONEY_UNITS, MONEY_UNIT_YUAN, ROUNDING_MODES,
+                                   fen_fraction, money_settings, to_fen, to_fen_array, to_yuan, uses_fen)
+from salary_calculator_periods import (PeriodError, calculate_period, compile_cumulative_tax_table,
+                                       cumulative_tax_settings)
+from salary_calculator_plan import STEP_PROGRESSIVE_TAX, CalculationPlan, PlanError
+from salary_calculator_search import EmployeeNameIndex
+from salary_calculator_storage import CompactEmployeeRepository
+from salary_calculator_sweep import sweep
+from salary_calculator_tax import TaxBracketTable, TaxBracketError
+
+# 增量重算时，待重算员工超过该数量就改用列式引擎
+INCREMENTAL_BATCH_THRESHOLD = 64
+# 配置中税率表的位置
+TAX_BRACKETS_PATH = ("calculation_methods", "progressive_tax", "brackets")
+
+
+class LRUResultCache:
+    """有界LRU结果缓存，记录命中、未命中和淘汰次数"""
+    
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key):
+        """查找缓存，返回 (是否命中, 值)"""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return True, value
+    
+    def put(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """清空缓存（保留统计数据）"""
+        self._data.clear()
+    
+    def stats(self):
+        """缓存统计"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._data),
+            "maxsize": self.maxsize
+        }
+
+
+def build_csv_header(income_items, deduction_items):
+    """员工工资表CSV表头（按配置顺序列出全部收入项和扣除项）"""
+    return (["员工姓名"]
+            + [f"收入_{item_name}" for item_name in income_items]
+            + [f"扣除_{item_name}" for item_name in deduction_items]
+            + ["总收入", "总扣除", "税后收入", "计算时间"])
+
+
+def _with_warnings(message, warnings):
+    """在提示消息后附上配置提醒"""
+    if not warnings:
+        return message
+    return f"{message}（注意: {'；'.join(warnings)}）"
+
+
+class PayrollRun:
+    """一次工资计算的不可变快照：明细结果、公司汇总和按需生成的导出内容
+
+    汇总表、图表、统计卡片和CSV下载共用同一个快照，名单或配置变化后才重新生成。
+    快照生成后不再修改，返回的列表和字典由各调用方共享，请勿修改。
+    """
+    
+    def __init__(self, results, totals, income_items, deduction_items, config_version, roster_token, plan=None):
+        self._results = results
+        self.totals = totals
+        self.income_items = tuple(income_items)
+        self.deduction_items = tuple(deduction_items)
+        self.config_version = config_version
+        self.roster_token = roster_token
+        self.plan = plan  # 计算所用的计划（按税率档次汇总时使用）
+        self.computed_at = datetime.now()
+        self._summary_rows = None
+        self._chart_data = None
+        self._chart_arrays = None
+        self._result_hash = None
+        self._csv_content = None
+    
+    @property
+    def headcount(self):
+        return len(self._results)
+    
+    def results(self):
+        """{员工: 结果字典}，与 calculate_all_employees 相同"""
+        return self._results
+    
+    def summary_rows(self):
+        """工资汇总表的格式化行"""
+        if self._summary_rows is None:
+            self._summary_rows = [
+                {
+                    "员工姓名": name,
+                    "总收入": f"¥{result['total_income']:,.2f}",
+                    "总扣除": f"¥{result['total_deductions']:,.2f}",
+                    "税后收入": f"¥{result['net_income']:,.2f}"
+                }
+                for name, result in self._results.items()
+            ]
+        return self._summary_rows
+    
+    def chart_data(self):
+        """图表数据：员工姓名、总收入、总扣除、税后收入四个列表"""
+        if self._chart_data is None:
+            results = self._results.values()
+            self._chart_data = {
+                "employees": list(self._results.keys()),
+                "total_incomes": [result["total_income"] for result in results],
+                "total_deductions": [result["total_deductions"] for result in results],
+                "net_incomes": [result["net_income"] for result in results]
+            }
+        return self._chart_data
+    
+    def chart_arrays(self):
+        """图表用的 NumPy 数组：总收入、总扣除、税后收入，以及个税档次下标（未计个税为 -1）"""
+        if self._chart_arrays is None:
+            results = list(self._results.values())
+            count = len(results)
+            total_incomes = np.fromiter((result["total_income"] for result in results), np.float64, count)
+            brackets = np.full(count, -1, dtype=np.int64)
+            tax_step = None
+            if self.plan is not None:
+                tax_step = next((step for step in self.plan.steps if step.kind == STEP_PROGRESSIVE_TAX), None)
+            if tax_step is not None:
+                # 应税收入 = 总收入 - 税前扣除 - 起征点，与计算时相同
+                taxed = np.fromiter((tax_step.name in result["deductions"] for result in results), bool, count)
+                taxable = total_incomes - self.plan.threshold
+                for name in tax_step.depends_on:
+                    taxable -= np.fromiter((result["deductions"].get(name, 0) for result in results),
+                                           np.float64, count)
+                indices = self.plan.tax_table.bracket_indices(np.maximum(0, taxable))
+                brackets = np.where(taxed, indices, -1)
+            self._chart_arrays = {
+                "employees": list(self._results.keys()),
+                "total_incomes": total_incomes,
+                "total_deductions": np.fromiter((result["total_deductions"] for result in results),
+                                                np.float64, count),
+                "net_incomes": np.fromiter((result["net_income"] for result in results), np.float64, count),
+                "tax_brackets": brackets
+            }
+        return self._chart_arrays
+    
+    def result_hash(self):
+        """计算结果的哈希（员工姓名、金额、个税档次和税率），内容相同的快照哈希相同，可用作图表缓存键"""
+        if self._result_hash is None:
+            arrays = self.chart_arrays()
+            digest = hashlib.sha256()
+            digest.update("\n".join(arrays["employees"]).encode("utf-8"))
+            for key in ("total_incomes", "total_deductions", "net_incomes", "tax_brackets"):
+                digest.update(arrays[key].tobytes())
+            if self.plan is not None:
+                digest.update(repr(self.plan.tax_table.rates).encode("ascii"))
+            self._result_hash = digest.hexdigest()
+        return self._result_hash
+    
+    def has_csv_content(self):
+        """CSV导出内容是否已经生成"""
+        return self._csv_content is not None
+    
+    def csv_content(self):
+        """CSV导出内容（首次调用时生成，计算时间取快照生成时刻）"""
+        if self._csv_content is None:
+            run_time = self.computed_at.strftime("%Y-%m-%d %H:%M:%S")
+            output = io.StringIO()
+            writer = csv.writer(output, lineterminator="\n")
+            writer.writerow(build_csv_header(self.income_items, self.deduction_items))
+            for name, result in self._results.items():
+                income_breakdown = result["income_breakdown"]
+                deductions = result["deductions"]
+                row = [name]
+                row.extend(income_breakdown.get(item_name, "") for item_name in self.income_items)
+                row.extend(deductions.get(item_name, "") for item_name in self.deduction_items)
+                row.extend([result["total_income"], result["total_deductions"], result["net_income"], run_time])
+                writer.writerow(row)
+            self._csv_content = output.getvalue()
+        return self._csv_content
+
 
 class SalaryCalculator:
-    def __init__(self):
-        self.config = self.load_default_config()
-        self.employees = {}  # 存储员工数据
+    def __init__(self, cache_size=4096, employee_store=None, parallel_runner=None, metrics=False, plan_provider=None):
+        # 当前配置快照（只读），修改配置时发布新的快照，config.version 即配置版本号
+        self.config = ConfigSnapshot(self.load_default_config())
+        # 存储员工数据：默认为紧凑的内存存储，也可传入 SQLiteEmployeeRepository 等实现字典接口的存储
+        self.employees = employee_store if employee_store is not None else CompactEmployeeRepository()
+        self._sync_store_config()
+        self.roster_version = 0  # 员工名单版本号，每次增删改员工时加一
+        self._payroll_run = None  # 最近一次的工资计算快照
+        self._tax_table = None  # (税率表快照, 编译后的税率表)，税率表不变时其他配置修改后仍可复用
+        self._plan = None  # (配置快照, 编译后的计算计划)
+        self._result_cache = LRUResultCache(cache_size)
+        # 可选的多进程分片计算（ParallelPayrollRunner），为空时在当前进程计算
+        self.parallel_runner = parallel_runner
+        # 可选的计算计划来源 plan_provider(配置哈希, 配置) -> CalculationPlan，
+        # 用于在多个计算器之间共享同一配置编译好的计划和税率表，为空时由本对象自己编译
+        self.plan_provider = plan_provider
+        # 增量计算：每个员工的最近结果和公司汇总，只重算有变动的员工
+        self._employee_results = {}  # 员工 → 计算结果（名单顺序）
+        self._dirty = {}  # 待重算的员工（有序集合）
+        self._results_token = None  # 结果对应的 (配置版本, 存储外部修改标记)，不一致时全部重算
+        self._running_totals = None  # 精确累计的 总收入/总扣除/实发 (Fraction)
+        # 分页用的员工排序（升序，由计算结果生成并随结果的增删改逐项更新）：
+        # "roster" → 员工姓名列表，"name" → 排好序的姓名列表，"net_income" → 排好序的 (税后收入, 姓名) 列表
+        self._employee_orders = {}
+        self._name_index = None  # 员工姓名搜索索引，第一次搜索时建立，之后随增删员工更新
+        self._name_index_token = None  # 索引对应的存储外部修改标记
+        # 按月累计预扣：(年, 月) → PayrollPeriod，每月在上个月的年度累计快照上计算
+        self._periods = {}
+        self._cumulative_tax_table = None  # (年度税率表快照, 编译后的税率表)
+        # 运行指标（调用次数、耗时分布、税率档次分布），默认关闭
+        self.metrics = None
+        if metrics:
+            self.enable_metrics()
         
     def load_default_config(self):
         """加载默认配置"""
@@ -21,13 +261,14 @@ class SalaryCalculator:
                 "技能津贴": {"type": "input", "default": 0, "required": False}
             },
             "deduction_items": {
-                "社保": {"type": "percentage", "rate": 0.105, "base": "基本工资"},
-                "公积金": {"type": "percentage", "rate": 0.12, "base": "基本工资"},
+                "社保": {"type": "percentage", "rate": 0.105, "base": "基本工资", "pre_tax": True},
+                "公积金": {"type": "percentage", "rate": 0.12, "base": "基本工资", "pre_tax": True},
                 "个人所得税": {"type": "calculated", "method": "progressive_tax"}
             },
             "calculation_methods": {
                 "progressive_tax": {
                     "name": "累进税率计算",
+                    "threshold": 5000,
                     "brackets": [
                         {"min": 0, "max": 5000, "rate": 0, "deduction": 0},
                         {"min": 5000, "max": 8000, "rate": 0.03, "deduction": 150},
@@ -38,152 +279,271 @@ class SalaryCalculator:
                         {"min": 60000, "max": 85000, "rate": 0.35, "deduction": 8910},
                         {"min": 85000, "max": float('inf'), "rate": 0.45, "deduction": 17410}
                     ]
+                },
+                "cumulative_tax": {
+                    "name": "累计预扣法",
+                    "threshold": 5000,
+                    "brackets": [
+                        {"min": 0, "max": 36000, "rate": 0.03, "deduction": 0},
+                        {"min": 36000, "max": 144000, "rate": 0.10, "deduction": 2520},
+                        {"min": 144000, "max": 300000, "rate": 0.20, "deduction": 16920},
+                        {"min": 300000, "max": 420000, "rate": 0.25, "deduction": 31920},
+                        {"min": 420000, "max": 660000, "rate": 0.30, "deduction": 52920},
+                        {"min": 660000, "max": 960000, "rate": 0.35, "deduction": 85920},
+                        {"min": 960000, "max": float('inf'), "rate": 0.45, "deduction": 181920}
+                    ]
                 }
             }
         }
     
+    @property
+    def config_version(self):
+        """配置版本号，每次修改配置时加一"""
+        return self.config.version
+    
+    def get_config_snapshot(self):
+        """获取当前配置快照（只读）；之后的配置修改会发布新快照，不影响已取得的快照"""
+        return self.config
+    
+    def get_config_hash(self):
+        """配置内容的哈希（SHA-256），用于判断导出的文件是否基于同一配置"""
+        return self.config.config_hash
+    
+    def get_tax_table(self):
+        """获取编译后的税率表（仅在税率表变化后重新编译）"""
+        return self._tax_table_for(self.config)
+    
+    def _tax_table_for(self, config):
+        """配置快照对应的税率表；税率表未改动时快照共用同一元组，直接复用编译结果"""
+        brackets = config["calculation_methods"]["progressive_tax"]["brackets"]
+        cached = self._tax_table
+        if cached is None or cached[0] is not brackets:
+            tax_table = None
+            if self.plan_provider is not None:
+                try:
+                    tax_table = self._plan_for(config).tax_table
+                except PlanError:
+                    pass  # 扣除项配置有误时仍可单独使用税率表
+            if tax_table is None:
+                tax_table = TaxBracketTable.compile(brackets)
+            cached = self._tax_table = (brackets, tax_table)
+        return cached[1]
+    
+    def _publish_config(self, config):
+        """发布新的配置快照：版本号加一，旧版本的缓存结果不再命中；正在使用旧快照的计算不受影响"""
+        self.config = ConfigSnapshot(config, self.config.version + 1)
+        self._sync_store_config()
+    
+    def _sync_store_config(self):
+        """把收入项默认值和扣除项告知员工存储（紧凑存储据此省略默认值）"""
+        sync_config = getattr(self.employees, "sync_config", None)
+        if sync_config is not None:
+            sync_config(self.config)
+    
+    def get_calculation_plan(self):
+        """获取编译后的计算计划（仅在配置变化后重新编译）"""
+        return self._plan_for(self.config)
+    
+    def _plan_for(self, config):
+        """配置快照对应的计算计划"""
+        cached = self._plan
+        if cached is None or cached[0] is not config:
+            if self.plan_provider is not None:
+                plan = self.plan_provider(config.config_hash, config)
+            else:
+                plan = CalculationPlan.compile(config, self._tax_table_for(config))
+            cached = self._plan = (config, plan)
+        return cached[1]
+    
+    def validate_tax_brackets(self):
+        """检查税率表是否连续、无重叠"""
+        try:
+            self.get_tax_table()
+            return True, "税率表有效"
+        except TaxBracketError as e:
+            return False, f"税率表无效: {str(e)}"
+    
+    def validate_config(self):
+        """检查配置能否编译为计算计划（税率表连续、扣除项引用和依赖有效），有提醒时附在消息后"""
+        valid, message = self.validate_tax_brackets()
+        if not valid:
+            return valid, message
+        try:
+            plan = self.get_calculation_plan()
+        except PlanError as e:
+            return False, f"配置无效: {str(e)}"
+        return True, _with_warnings("配置有效", plan.warnings)
+    
+    def get_config_warnings(self):
+        """能计算但需要提醒用户的配置问题（如百分比扣除项的计算基数已删除，按0计算）"""
+        try:
+            return list(self.get_calculation_plan().warnings)
+        except (PlanError, TaxBracketError):
+            return []
+    
     def calculate_progressive_tax(self, taxable_income):
-        """计算累进税"""
-        brackets = self.config["calculation_methods"]["progressive_tax"]["brackets"]
-        
-        for bracket in brackets:
-            if bracket["min"] <= taxable_income <= bracket["max"]:
-                tax = taxable_income * bracket["rate"] - bracket["deduction"]
-                return max(0, tax)
-        return 0
+        """计算累进税（按分计算时按个税的舍入方式舍入到分）"""
+        if uses_fen(self.config):
+            fen = self.get_calculation_plan().fen
+            return fen.tax_one(max(0, to_fen(taxable_income))) / FEN_PER_YUAN
+        return self.get_tax_table().tax(taxable_income)
+    
+    def _cache_key(self, kind, salary_inputs, selected_deductions):
+        """结果缓存键：配置版本 + 薪资输入 + 选择的扣除项，输入不可哈希时返回 None"""
+        try:
+            key = (
+                self.config_version,
+                kind,
+                tuple(sorted(salary_inputs.items())),
+                None if selected_deductions is None else tuple(selected_deductions)
+            )
+            hash(key)
+        except TypeError:
+            return None
+        return key
+    
+    def get_cache_stats(self):
+        """获取结果缓存的命中、未命中、淘汰统计"""
+        return self._result_cache.stats()
+    
+    def clear_cache(self):
+        """清空结果缓存"""
+        self._result_cache.clear()
+    
+    def invalidate_results(self):
+        """丢弃增量计算结果和工资计算快照，下次计算时整体重算（名单和配置不变）"""
+        self._results_token = None
+        self._payroll_run = None
     
+    def enable_metrics(self):
+        """开启运行指标记录"""
+        if self.metrics is None:
+            self.metrics = PayrollMetrics()
+        return self.metrics
+    
+    def disable_metrics(self):
+        """关闭运行指标记录并丢弃已记录的指标"""
+        self.metrics = None
+    
+    def get_metrics(self):
+        """获取运行指标快照，未开启时返回 None"""
+        if self.metrics is None:
+            return None
+        return self.metrics.snapshot()
+    
+    def export_metrics_to_file(self, file_path):
+        """把运行指标写成 Prometheus 文本格式文件"""
+        if self.metrics is None:
+            return False, "运行指标未开启"
+        try:
+            self.metrics.write_prometheus(file_path)
+            return True, "运行指标导出成功"
+        except Exception as e:
+            return False, f"运行指标导出失败: {str(e)}"
+    
+    @timed("calculate_salary", record_salary)
     def calculate_salary(self, salary_inputs, selected_deductions=None):
-        """计算工资"""
-        # 如果没有指定选择的扣除项，默认使用所有非可选扣除项
-        if selected_deductions is None:
-            selected_deductions = [name for name, config in self.config["deduction_items"].items() 
-                                 if not config.get("optional", False)]
-        
-        # 计算总收入
-        total_income = 0
-        income_breakdown = {}
-        
-        for item_name, item_config in self.config["salary_items"].items():
-            value = salary_inputs.get(item_name, item_config["default"])
-            income_breakdown[item_name] = value
-            total_income += value
-        
-        # 计算扣除项
-        deductions = {}
-        total_deductions = 0
-        
-        for item_name, item_config in self.config["deduction_items"].items():
-            # 只计算选中的扣除项
-            if item_name not in selected_deductions:
-                continue
-                
-            if item_config["type"] == "percentage":
-                base_amount = income_breakdown.get(item_config["base"], 0)
-                deduction = base_amount * item_config["rate"]
-            elif item_config["type"] == "fixed_amount":
-                # 新增固定金额扣除类型
-                deduction = item_config.get("amount", 0)
-                # 如果在salary_inputs中有自定义金额，使用自定义金额
-                if f"deduction_{item_name}" in salary_inputs:
-                    deduction = salary_inputs[f"deduction_{item_name}"]
-            elif item_config["type"] == "calculated":
-                if item_config["method"] == "progressive_tax":
-                    # 计算应税收入（总收入 - 社保公积金 - 起征点5000）
-                    social_deductions = sum([
-                        v for k, v in deductions.items() 
-                        if k in ["社保", "公积金"]
-                    ])
-                    taxable_income = total_income - social_deductions - 5000
-                    deduction = self.calculate_progressive_tax(max(0, taxable_income))
-                else:
-                    deduction = 0
-            else:
-                deduction = 0
-            
-            deductions[item_name] = deduction
-            total_deductions += deduction
-        
-        # 计算税后收入
-        net_income = total_income - total_deductions
-        
-        return {
-            "total_income": total_income,
-            "income_breakdown": income_breakdown,
-            "deductions": deductions,
-            "total_deductions": total_deductions,
-            "net_income": net_income,
-            "selected_deductions": selected_deductions
-        }
+        """计算工资（结果会被缓存，收入明细和扣除明细字典与缓存共享，请勿修改）"""
+        key = self._cache_key("salary", salary_inputs, selected_deductions)
+        if key is None:
+            return self._calculate_salary(salary_inputs, selected_deductions)
+        hit, result = self._result_cache.get(key)
+        if not hit:
+            # 缓存的结果不引用调用方传入的扣除项列表
+            if selected_deductions is not None:
+                selected_deductions = list(selected_deductions)
+            result = self._calculate_salary(salary_inputs, selected_deductions)
+            self._result_cache.put(key, result)
+        # 返回浅拷贝，调用方修改 selected_deductions 列表不影响缓存
+        return dict(result, selected_deductions=list(result["selected_deductions"]))
+    
+    def _calculate_salary(self, salary_inputs, selected_deductions=None):
+        """计算工资（不经过缓存）"""
+        return self.get_calculation_plan().evaluate(salary_inputs, selected_deductions)
     
     def add_salary_item(self, name, default=0, required=False):
         """添加收入项"""
         if name and name not in self.config["salary_items"]:
-            self.config["salary_items"][name] = {
+            self._publish_config(assoc_in(self.config, ("salary_items", name), {
                 "type": "input",
                 "default": default,
                 "required": required
-            }
+            }))
             return True
         return False
     
     def update_salary_item(self, old_name, new_name=None, default=None, required=None):
         """更新收入项"""
-        if old_name not in self.config["salary_items"]:
+        config = self.config
+        if old_name not in config["salary_items"]:
             return False
         
-        item = self.config["salary_items"][old_name]
-        
-        # 更新名称
-        if new_name and new_name != old_name:
-            self.config["salary_items"][new_name] = self.config["salary_items"].pop(old_name)
-            old_name = new_name
-        
         # 更新其他属性
+        item = dict(config["salary_items"][old_name])
         if default is not None:
             item["default"] = default
         if required is not None:
             item["required"] = required
-            
+        
+        # 更新名称（改名后排在最后），引用该收入项作为计算基数的扣除项一并更新
+        if new_name and new_name != old_name:
+            config = dissoc_in(config, ("salary_items", old_name))
+            for deduction_name, deduction in config["deduction_items"].items():
+                if deduction["type"] == "percentage" and deduction["base"] == old_name:
+                    config = assoc_in(config, ("deduction_items", deduction_name, "base"), new_name)
+            old_name = new_name
+        
+        self._publish_config(assoc_in(config, ("salary_items", old_name), item))
         return True
     
     def delete_salary_item(self, name):
-        """删除收入项"""
+        """删除收入项（以其为计算基数的百分比扣除项此后按0计算，见 get_config_warnings）"""
         if name in self.config["salary_items"]:
-            del self.config["salary_items"][name]
+            self._publish_config(dissoc_in(self.config, ("salary_items", name)))
             return True
         return False
     
-    def add_deduction_item(self, name, deduction_type, rate=None, base=None, amount=None, method=None, optional=True):
+    def get_salary_item_dependents(self, name):
+        """获取以该收入项为计算基数的扣除项"""
+        return [deduction_name for deduction_name, deduction in self.config["deduction_items"].items()
+                if deduction["type"] == "percentage" and deduction["base"] == name]
+    
+    def add_deduction_item(self, name, deduction_type, rate=None, base=None, amount=None, method=None, optional=True,
+                           pre_tax=False):
         """添加扣除项"""
         if name and name not in self.config["deduction_items"]:
             if deduction_type == "percentage":
-                self.config["deduction_items"][name] = {
+                item = {
                     "type": "percentage",
                     "rate": rate or 0.1,
                     "base": base or list(self.config["salary_items"].keys())[0],
-                    "optional": optional
+                    "optional": optional,
+                    "pre_tax": pre_tax
                 }
             elif deduction_type == "fixed_amount":
-                self.config["deduction_items"][name] = {
+                item = {
                     "type": "fixed_amount",
                     "amount": amount or 0,
-                    "optional": optional
+                    "optional": optional,
+                    "pre_tax": pre_tax
                 }
             else:
-                self.config["deduction_items"][name] = {
+                item = {
                     "type": "calculated",
                     "method": method or "custom",
                     "optional": optional
                 }
+            self._publish_config(assoc_in(self.config, ("deduction_items", name), item))
             return True
         return False
     
-    def update_deduction_item(self, name, rate=None, base=None, amount=None, optional=None):
-        """更新扣除项"""
+    def update_deduction_item(self, name, rate=None, base=None, amount=None, optional=None, pre_tax=None,
+                              rounding=None):
+        """更新扣除项（rounding: 按分计算时该项的舍入方式，"" 表示改用默认舍入方式）"""
         if name not in self.config["deduction_items"]:
             return False
             
-        item = self.config["deduction_items"][name]
+        item = dict(self.config["deduction_items"][name])
         if item["type"] == "percentage":
             if rate is not None:
                 item["rate"] = rate
@@ -195,22 +555,49 @@ class SalaryCalculator:
         
         if optional is not None:
             item["optional"] = optional
+        if pre_tax is not None and item["type"] != "calculated":
+            item["pre_tax"] = pre_tax
+        if rounding == "":
+            item.pop("rounding", None)
+        elif rounding is not None:
+            if rounding not in ROUNDING_MODES:
+                return False
+            item["rounding"] = rounding
         
+        self._publish_config(assoc_in(self.config, ("deduction_items", name), item))
         return True
     
     def delete_deduction_item(self, name):
         """删除扣除项"""
         if name in self.config["deduction_items"]:
-            del self.config["deduction_items"][name]
+            self._publish_config(dissoc_in(self.config, ("deduction_items", name)))
             return True
         return False
     
+    def get_money_settings(self):
+        """金额计算方式：{"unit": "yuan"（浮点元）或 "fen"（整数分）, "rounding": 默认舍入方式}"""
+        money = money_settings(self.config)
+        return {"unit": money.get("unit", MONEY_UNIT_YUAN), "rounding": money.get("rounding", DEFAULT_ROUNDING)}
+    
+    def set_money_settings(self, unit, rounding=None):
+        """设置金额计算方式：unit 为 "fen" 时全部金额按整数分计算，rounding 为未单独设置的扣除项的舍入方式"""
+        money = self.get_money_settings()
+        if unit not in MONEY_UNITS:
+            return False
+        money["unit"] = unit
+        if rounding is not None:
+            if rounding not in ROUNDING_MODES:
+                return False
+            money["rounding"] = rounding
+        self._publish_config(assoc_in(self.config, ("calculation_methods", "money"), money))
+        return True
+    
     # 税率表管理方法
     def update_tax_bracket(self, index, min_income=None, max_income=None, rate=None, deduction=None):
         """更新税率表中的某一档"""
         brackets = self.config["calculation_methods"]["progressive_tax"]["brackets"]
         if 0 <= index < len(brackets):
-            bracket = brackets[index]
+            bracket = dict(brackets[index])
             if min_income is not None:
                 bracket["min"] = min_income
             if max_income is not None:
@@ -219,12 +606,13 @@ class SalaryCalculator:
                 bracket["rate"] = rate
             if deduction is not None:
                 bracket["deduction"] = deduction
+            self._publish_config(assoc_in(self.config, TAX_BRACKETS_PATH + (index,), bracket))
             return True
         return False
     
     def add_tax_bracket(self, min_income, max_income, rate, deduction):
         """添加新的税率档次"""
-        brackets = self.config["calculation_methods"]["progressive_tax"]["brackets"]
+        brackets = list(self.config["calculation_methods"]["progressive_tax"]["brackets"])
         new_bracket = {
             "min": min_income,
             "max": max_income if max_income != -1 else float('inf'),
@@ -234,13 +622,14 @@ class SalaryCalculator:
         brackets.append(new_bracket)
         # 按最小收入排序
         brackets.sort(key=lambda x: x["min"])
+        self._publish_config(assoc_in(self.config, TAX_BRACKETS_PATH, brackets))
         return True
     
     def delete_tax_bracket(self, index):
         """删除税率档次"""
         brackets = self.config["calculation_methods"]["progressive_tax"]["brackets"]
         if 0 <= index < len(brackets):
-            del brackets[index]
+            self._publish_config(dissoc_in(self.config, TAX_BRACKETS_PATH + (index,)))
             return True
         return False
     
@@ -248,22 +637,32 @@ class SalaryCalculator:
         """导出配置为JSON字符串"""
         return json.dumps(self.config, ensure_ascii=False, indent=2)
     
+    def _publish_imported_config(self, config_data):
+        """编译导入的配置（有 plan_provider 时由其提供计划）后发布，配置无效时抛出异常且不修改当前配置"""
+        config = ConfigSnapshot(config_data, self.config.version + 1)
+        plan = self._plan_for(config)
+        self.config = config
+        self._sync_store_config()
+        self._tax_table = (config["calculation_methods"]["progressive_tax"]["brackets"], plan.tax_table)
+    
+    @timed("import_config")
     def import_config(self, config_json):
         """从JSON字符串导入配置"""
         try:
             config_data = json.loads(config_json)
-            self.config = config_data
-            return True, "配置导入成功"
+            self._publish_imported_config(config_data)
+            return True, _with_warnings("配置导入成功", self.get_config_warnings())
         except Exception as e:
             return False, f"配置导入失败: {str(e)}"
     
+    @timed("import_config_from_file")
     def import_config_from_file(self, file_path):
         """从文件导入配置"""
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 config_data = json.load(f)
-            self.config = config_data
-            return True, "配置导入成功"
+            self._publish_imported_config(config_data)
+            return True, _with_warnings("配置导入成功", self.get_config_warnings())
         except Exception as e:
             return False, f"配置导入失败: {str(e)}"
     
@@ -278,23 +677,30 @@ class SalaryCalculator:
     
     def reset_config(self):
         """重置为默认配置"""
-        self.config = self.load_default_config()
+        self._publish_config(self.load_default_config())
         return True, "已重置为默认配置"
     
     def get_salary_items(self):
-        """获取所有收入项"""
+        """获取所有收入项（只读）"""
         return self.config["salary_items"]
     
     def get_deduction_items(self):
-        """获取所有扣除项"""
+        """获取所有扣除项（只读）"""
         return self.config["deduction_items"]
     
     def get_tax_brackets(self):
-        """获取税率表"""
+        """获取税率表（只读）"""
         return self.config["calculation_methods"]["progressive_tax"]["brackets"]
     
     def get_calculation_summary(self, salary_inputs, selected_deductions=None):
         """获取计算结果的格式化摘要"""
+        key = self._cache_key("summary", salary_inputs, selected_deductions)
+        if key is not None:
+            hit, cached = self._result_cache.get(key)
+            if hit:
+                summary, result = cached
+                return summary, dict(result, selected_deductions=list(result["selected_deductions"]))
+        
         result = self.calculate_salary(salary_inputs, selected_deductions)
         
         summary = {
@@ -305,6 +711,8 @@ class SalaryCalculator:
             "扣除明细": {k: f"¥{v:,.2f}" for k, v in result["deductions"].items()}
         }
         
+        if key is not None:
+            self._result_cache.put(key, (summary, dict(result, selected_deductions=list(result["selected_deductions"]))))
         return summary, result 
     
     # 员工管理方法
@@ -324,26 +732,274 @@ class SalaryCalculator:
                 "salary_data": salary_data,
                 "selected_deductions": selected_deductions
             }
+            self._roster_changed(name)
+            if self._name_index is not None:
+                self._name_index.add(name)
             return True
         return False
     
+    def add_employees(self, employees):
+        """批量添加员工，所有有效记录通过一次批量写入保存
+        
+        employees: (员工姓名, 薪资数据, 扣除项) 序列，薪资数据和扣除项为 None 时与 add_employee 一样使用默认值
+        返回 (添加数量, [(序号, 员工姓名, 失败原因), ...])
+        """
+        default_salary = {item: config["default"] for item, config in self.config["salary_items"].items()}
+        default_deductions = [name for name, config in self.config["deduction_items"].items() 
+                              if not config.get("optional", False)]
+        
+        records = []
+        failures = []
+        seen = set()
+        for index, (name, salary_data, selected_deductions) in enumerate(employees):
+            if not name:
+                failures.append((index, name, "员工姓名不能为空"))
+                continue
+            if name in seen or name in self.employees:
+                failures.append((index, name, "员工姓名已存在"))
+                continue
+            seen.add(name)
+            records.append((name, {
+                "salary_data": dict(default_salary) if salary_data is None else salary_data,
+                "selected_deductions": list(default_deductions) if selected_deductions is None else selected_deductions
+            }))
+        
+        if records:
+            add_many = getattr(self.employees, "add_many", None)
+            if add_many is not None:
+                add_many(records)
+            else:
+                for name, employee_data in records:
+                    self.employees[name] = employee_data
+            self._roster_changed(*[name for name, _ in records])
+            if self._name_index is not None:
+                self._name_index.add_many([name for name, _ in records])
+        return len(records), failures
+    
+    def import_employees(self, source, file_type=None, chunk_size=5000, encoding="utf-8-sig"):
+        """从 CSV / XLSX 文件分块批量导入员工，返回导入报告（见 salary_calculator_import.import_employees）"""
+        return import_employees(self, source, file_type, chunk_size, encoding)
+    
     def update_employee(self, name, salary_data=None, selected_deductions=None):
         """更新员工薪资数据"""
         if name in self.employees:
+            # 读出后整体写回，外部存储返回的是副本
+            employee_data = dict(self.employees[name])
             if salary_data is not None:
-                self.employees[name]["salary_data"] = salary_data
+                employee_data["salary_data"] = salary_data
             if selected_deductions is not None:
-                self.employees[name]["selected_deductions"] = selected_deductions
+                employee_data["selected_deductions"] = selected_deductions
+            self.employees[name] = employee_data
+            self._roster_changed(name)
             return True
         return False
     
+    def rename_employee(self, old_name, new_name):
+        """员工改名（存储支持时保持员工编号和名单顺序不变）"""
+        if old_name not in self.employees or not new_name or new_name in self.employees:
+            return False
+        rename = getattr(self.employees, "rename", None)
+        if rename is not None:
+            rename(old_name, new_name)
+        else:
+            self.employees[new_name] = self.employees.pop(old_name)
+        was_dirty = self._dirty.pop(old_name, False) is None
+        if rename is not None and old_name in self._employee_results:
+            # 存储保持名单顺序：结果在原位置改名，金额不变，无需重算
+            self._employee_results = {
+                new_name if name == old_name else name: result for name, result in self._employee_results.items()
+            }
+            self._orders_rename(old_name, new_name, self._employee_results[new_name])
+            self._roster_changed(*([new_name] if was_dirty else []))
+        else:
+            old_result = self._employee_results.pop(old_name, None)
+            if old_result is not None:
+                self._add_to_totals(old_result, -1)
+                self._orders_remove(old_name, old_result)
+            self._roster_changed(new_name)
+        if self._name_index is not None:
+            self._name_index.rename(old_name, new_name)
+        return True
+    
     def delete_employee(self, name):
         """删除员工"""
         if name in self.employees:
             del self.employees[name]
+            self._roster_changed()
+            if self._name_index is not None:
+                self._name_index.remove(name)
+            self._dirty.pop(name, None)
+            old_result = self._employee_results.pop(name, None)
+            if old_result is not None:
+                self._add_to_totals(old_result, -1)
+                self._orders_remove(name, old_result)
             return True
         return False
     
+    def _roster_changed(self, *names):
+        """员工名单已修改：版本号加一，受影响的员工标记为待重算"""
+        self.roster_version += 1
+        for name in names:
+            self._dirty[name] = None
+    
+    def _external_change_token(self):
+        """存储的外部修改标记（如其他会话写入了同一个数据库）"""
+        change_token = getattr(self.employees, "change_token", None)
+        return change_token() if change_token else None
+    
+    def _roster_token(self):
+        """员工名单的当前标记：本对象的修改版本 + 存储的外部修改标记"""
+        return self.roster_version, self._external_change_token()
+    
+    def _add_to_totals(self, result, sign):
+        """把一个员工的结果计入（sign=1）或移出（sign=-1）公司汇总"""
+        totals = self._running_totals
+        # 按分计算时金额都是整数分，换回分数以免汇总带入浮点误差
+        exact = fen_fraction if uses_fen(self.config) else Fraction
+        totals["total_income"] += sign * exact(result["total_income"])
+        totals["total_deductions"] += sign * exact(result["total_deductions"])
+        totals["net_income"] += sign * exact(result["net_income"])
+    
+    def _refresh_results(self):
+        """更新增量计算结果：配置或外部数据变化时整体重算，否则只重算待重算的员工"""
+        token = (self.config_version, self._external_change_token())
+        if token != self._results_token:
+            payroll = self.calculate_all_employees_columnar()
+            self._employee_results = payroll.to_results()
+            self._employee_orders = {}
+            self._dirty.clear()
+            self._running_totals = payroll.exact_totals()
+            self._results_token = token
+            return
+        
+        if not self._dirty:
+            return
+        names = [name for name in self._dirty if name in self.employees]
+        self._dirty.clear()
+        if len(names) > INCREMENTAL_BATCH_THRESHOLD:
+            # 变动较多时用列式引擎一次算完
+            payroll = calculate_payroll_columnar(self.get_calculation_plan(),
+                                                 [(name, self.employees[name]) for name in names])
+            new_results = payroll.to_results()
+            # 逐项更新排序不如用到时重新生成
+            self._employee_orders = {}
+        else:
+            new_results = {}
+            for name in names:
+                employee_data = self.employees[name]
+                new_results[name] = self._calculate_salary(employee_data.get("salary_data", {}),
+                                                            employee_data.get("selected_deductions", []))
+        
+        for name, result in new_results.items():
+            old_result = self._employee_results.get(name)
+            if old_result is not None:
+                self._add_to_totals(old_result, -1)
+            self._add_to_totals(result, 1)
+            self._employee_results[name] = result
+            self._orders_update(name, old_result, result)
+    
+    def get_employee_result(self, name):
+        """获取单个员工的工资计算结果（使用增量计算缓存，返回的字典请勿修改）"""
+        self._refresh_results()
+        return self._employee_results.get(name)
+    
+    def get_company_totals(self):
+        """公司汇总：总收入、总扣除、实发总额、人数（只重算有变动的员工）"""
+        self._refresh_results()
+        totals = self._running_totals
+        return {
+            "total_income": float(totals["total_income"]),
+            "total_deductions": float(totals["total_deductions"]),
+            "net_income": float(totals["net_income"]),
+            "headcount": len(self._employee_results)
+        }
+    
+    def _get_employee_order(self, sort_by):
+        """员工排序（升序）：第一次使用时由计算结果生成，之后随结果的增删改逐项更新，不整体重排"""
+        order = self._employee_orders.get(sort_by)
+        if order is None:
+            results = self._employee_results
+            if sort_by == "name":
+                order = sorted(results)
+            elif sort_by == "net_income":
+                order = sorted((result["net_income"], name) for name, result in results.items())
+            else:
+                order = list(results)
+            self._employee_orders[sort_by] = order
+        return order
+    
+    def _orders_remove(self, name, result):
+        """从已生成的排序中移除员工"""
+        for sort_by, order in self._employee_orders.items():
+            if sort_by == "name":
+                del order[bisect_left(order, name)]
+            elif sort_by == "net_income":
+                del order[bisect_left(order, (result["net_income"], name))]
+            else:
+                order.remove(name)
+    
+    def _orders_update(self, name, old_result, result):
+        """员工结果新增（old_result 为 None，排在名单最后）或变化后更新已生成的排序"""
+        for sort_by, order in self._employee_orders.items():
+            if sort_by == "net_income":
+                if old_result is not None:
+                    del order[bisect_left(order, (old_result["net_income"], name))]
+                insort(order, (result["net_income"], name))
+            elif old_result is None:
+                if sort_by == "name":
+                    insort(order, name)
+                else:
+                    order.append(name)
+    
+    def _orders_rename(self, old_name, new_name, result):
+        """员工改名（名单位置不变）后更新已生成的排序"""
+        for sort_by, order in self._employee_orders.items():
+            if sort_by == "name":
+                del order[bisect_left(order, old_name)]
+                insort(order, new_name)
+            elif sort_by == "net_income":
+                del order[bisect_left(order, (result["net_income"], old_name))]
+                insort(order, (result["net_income"], new_name))
+            else:
+                order[order.index(old_name)] = new_name
+    
+    def get_employee_page(self, page=1, page_size=20, sort_by="roster", descending=False):
+        """分页获取员工及其计算结果
+        
+        sort_by: "roster"（名单顺序）、"name"（姓名）或 "net_income"（税后收入相同时按姓名）
+        返回 {"employees": [(员工姓名, 计算结果), ...], "page": 页码, "page_count": 总页数, "total": 员工数}，
+        排序由计算结果生成，增删改员工时逐项更新，取一页的耗时与员工总数无关
+        """
+        self._refresh_results()
+        order = self._get_employee_order(sort_by)
+        total = len(order)
+        page_size = max(1, int(page_size))
+        page_count = max(1, math.ceil(total / page_size))
+        page = min(max(1, int(page)), page_count)
+        start = (page - 1) * page_size
+        if descending:
+            entries = order[max(0, total - start - page_size):total - start][::-1]
+        else:
+            entries = order[start:start + page_size]
+        if sort_by == "net_income":
+            names = [name for _, name in entries]
+        else:
+            names = entries
+        return {
+            "employees": [(name, self._employee_results[name]) for name in names],
+            "page": page,
+            "page_count": page_count,
+            "total": total
+        }
+    
+    def search_employees(self, query, limit=20):
+        """按姓名前缀、拼音首字母或包含的文字查找员工，返回最多 limit 个员工姓名"""
+        token = self._external_change_token()
+        if self._name_index is None or token != self._name_index_token:
+            self._name_index = EmployeeNameIndex(self.employees)
+            self._name_index_token = token
+        return self._name_index.search(query, limit)
+    
     def get_employees(self):
         """获取所有员工"""
         return self.employees
@@ -362,51 +1018,222 @@ class SalaryCalculator:
         employee_data = self.employees.get(name, {})
         return employee_data.get("selected_deductions", [])
     
+    @timed("calculate_all_employees", record_roster)
     def calculate_all_employees(self):
-        """计算所有员工的工资"""
-        results = {}
-        for employee_name, employee_data in self.employees.items():
-            salary_data = employee_data.get("salary_data", {})
-            selected_deductions = employee_data.get("selected_deductions", [])
-            results[employee_name] = self.calculate_salary(salary_data, selected_deductions)
-        return results
+        """计算所有员工的工资（只重算有变动的员工），返回 员工 → 计算结果 的只读视图，
+        不复制结果；视图只对应本次计算，名单或配置变化后请重新调用，需要保留的快照请用 get_payroll_run"""
+        self._refresh_results()
+        return MappingProxyType(self._employee_results)
     
-    def export_employees_to_csv(self):
-        """导出所有员工工资到CSV"""
-        if not self.employees:
-            return None
+    def calculate_all_employees_columnar(self):
+        """使用列式引擎计算所有员工的工资，返回 ColumnarPayroll（只需汇总时无需展开为字典）"""
+        config = self.config
+        plan = self._plan_for(config)
+        if self.parallel_runner is not None:
+            return self.parallel_runner.run(config, config.version, plan, self.employees.items())
+        return calculate_payroll_columnar(plan, self.employees.items())
+    
+    def gross_up(self, target_net, salary_inputs=None, selected_deductions=None, item="基本工资"):
+        """税后反算：求收入项 item 为多少时税后收入等于 target_net，返回该输入下的计算结果（与 calculate_salary 相同）
         
-        # 计算所有员工的工资
-        all_results = self.calculate_all_employees()
+        其他收入项取 salary_inputs 中的值（未填写的取默认值）；以非负金额无法达到目标时抛出 GrossUpError。
+        按分计算时求得的金额舍入到分，税后收入与目标可能相差几分
+        """
+        plan = self.get_calculation_plan()
+        salary_inputs = dict(salary_inputs or {})
+        selection = list(plan.default_deductions) if selected_deductions is None else selected_deductions
+        amount = solve_gross_up(plan, item, [target_net], [salary_inputs], [selection])[0]
+        if math.isnan(amount):
+            raise GrossUpError(f"调整「{item}」无法使税后收入达到 ¥{target_net:,.2f}")
+        if plan.fen is not None:
+            amount = to_yuan(to_fen(amount))
+        salary_inputs[item] = float(amount)
+        return self.calculate_salary(salary_inputs, selected_deductions)
+    
+    def gross_up_employees(self, targets, item="绩效奖金"):
+        """批量税后反算：targets 为 {员工: 目标税后收入}，按员工现有数据一次性求出收入项 item 应为多少
         
-        # 准备CSV数据
-        csv_data = []
-        for employee_name, result in all_results.items():
-            row = {"员工姓名": employee_name}
-            
-            # 添加收入项
-            for item_name, amount in result["income_breakdown"].items():
-                row[f"收入_{item_name}"] = amount
-            
-            # 添加扣除项
-            for item_name, amount in result["deductions"].items():
-                row[f"扣除_{item_name}"] = amount
-            
-            # 添加汇总
-            row["总收入"] = result["total_income"]
-            row["总扣除"] = result["total_deductions"]
-            row["税后收入"] = result["net_income"]
-            row["计算时间"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            csv_data.append(row)
+        返回 {员工: 金额}，无法达到目标的员工为 None（按分计算时金额舍入到分）；员工不存在时抛出 GrossUpError
+        """
+        names = list(targets)
+        missing = [name for name in names if name not in self.employees]
+        if missing:
+            raise GrossUpError(f"员工不存在: {', '.join(missing[:5])}")
+        employee_datas = [self.employees[name] for name in names]
+        plan = self.get_calculation_plan()
+        amounts = solve_gross_up(plan, item, [targets[name] for name in names],
+                                 [employee_data.get("salary_data", {}) for employee_data in employee_datas],
+                                 [employee_data.get("selected_deductions", []) for employee_data in employee_datas])
+        if plan.fen is not None:
+            solved = ~np.isnan(amounts)
+            amounts[solved] = to_yuan(to_fen_array(amounts[solved]))
+        return {name: None if math.isnan(amount) else amount for name, amount in zip(names, amounts.tolist())}
+    
+    def sweep_config(self, path, values):
+        """试算配置参数的一组取值，不修改配置，返回 SweepResult
+        
+        path: 参数路径，如 "deduction_items.社保.rate"、"calculation_methods.progressive_tax.brackets.2.rate"
+        或等价的元组；values: 参数的各个取值。所有取值对整个名单一次性计算，
+        结果包括每个取值的公司汇总和每个员工相对当前配置的变化；路径或取值无效时抛出 SweepError
+        """
+        config = self.config
+        return sweep(config, self._plan_for(config), self.employees.items(), path, values)
+    
+    def get_cumulative_tax_table(self):
+        """获取编译后的年度累计税率表（按月累计预扣个税用）"""
+        return self._cumulative_tax_table_for(self.config)
+    
+    def _cumulative_tax_table_for(self, config):
+        brackets = cumulative_tax_settings(config)["brackets"]
+        cached = self._cumulative_tax_table
+        if cached is None or cached[0] is not brackets:
+            cached = self._cumulative_tax_table = (brackets, compile_cumulative_tax_table(config))
+        return cached[1]
+    
+    def calculate_period(self, year, month, employees=None):
+        """按累计预扣法计算某年某月的工资，返回 PayrollPeriod
+        
+        employees: 本月的员工名单 [(员工姓名, 员工数据), ...]，默认为当前名单
+        只在上个月的年度累计快照上累加，不重算之前的月份；本年已计算过更早的月份时须先计算上个月。
+        重新计算某个月后，同一年之后月份的结果作废，需要依次重新计算
+        """
+        if not 1 <= month <= 12:
+            raise PeriodError(f"月份必须在1到12之间，当前为{month}")
+        previous = self._periods.get((year, month - 1))
+        if previous is None and any(key[0] == year and key[1] < month for key in self._periods):
+            raise PeriodError(f"请先计算{year}年{month - 1}月的工资")
+        
+        config = self.config
+        period = calculate_period(self._plan_for(config), self._cumulative_tax_table_for(config),
+                                  cumulative_tax_settings(config)["threshold"],
+                                  self.employees.items() if employees is None else employees,
+                                  year, month, previous)
+        for later in range(month + 1, 13):
+            self._periods.pop((year, later), None)
+        self._periods[(year, month)] = period
+        return period
+    
+    def get_period(self, year, month):
+        """获取已计算的某年某月工资结果，未计算时返回 None"""
+        return self._periods.get((year, month))
+    
+    def get_periods(self):
+        """已计算的工资月份 [(年, 月), ...]，按时间排序"""
+        return sorted(self._periods)
+    
+    def get_employee_ytd(self, name, year, month):
+        """员工截至某年某月的年度累计数据（累计收入、税前扣除、减除费用、应纳税所得额、已预扣税额）"""
+        period = self._periods.get((year, month))
+        if period is None:
+            return None
+        return period.year_to_date(name)
+    
+    def get_payroll_run(self):
+        """获取当前名单和配置下的工资计算快照（名单或配置变化后才重新计算）"""
+        run = self._payroll_run
+        roster_token = self._roster_token()
+        if (run is None or run.config_version != self.config_version
+                or run.roster_token != roster_token):
+            plan = self.get_calculation_plan()
+            # 快照保存结果的副本，之后的增量计算不影响它
+            run = PayrollRun(dict(self.calculate_all_employees()), self.get_company_totals(),
+                             [item_name for item_name, _ in plan.income_items], plan.deduction_order,
+                             self.config_version, roster_token, plan)
+            self._payroll_run = run
+        return run
+    
+    def _iter_employee_chunks(self, chunk_size):
+        """按名单顺序分块遍历员工，每块为 [(员工姓名, 员工数据), ...]"""
+        items = iter(self.employees.items())
+        while True:
+            chunk = list(islice(items, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _iter_payroll_chunks(self, config, plan, chunk_size):
+        """按名单顺序分块计算工资，逐块生成 ColumnarPayroll（整个过程使用同一配置快照）
         
-        # 创建DataFrame并转换为CSV
-        df = pd.DataFrame(csv_data)
+        设置了多进程计算时每块至少 min_parallel_size 名员工，使每块都能分片并行计算
+        """
+        runner = self.parallel_runner
+        if runner is not None:
+            chunk_size = max(chunk_size, runner.min_parallel_size)
+        for chunk in self._iter_employee_chunks(chunk_size):
+            if runner is not None:
+                yield runner.run(config, config.version, plan, chunk)
+            else:
+                yield calculate_payroll_columnar(plan, chunk)
+    
+    def get_csv_header(self):
+        """员工工资表CSV表头（按配置顺序列出全部收入项和扣除项）"""
+        plan = self.get_calculation_plan()
+        return build_csv_header([item_name for item_name, _ in plan.income_items], plan.deduction_order)
+    
+    def iter_employees_csv(self, chunk_size=5000):
+        """逐块生成员工工资表CSV文本，每块只计算和缓存 chunk_size 名员工"""
+        config = self.config
+        plan = self._plan_for(config)
+        run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        # 使用StringIO创建CSV内容
         output = io.StringIO()
-        df.to_csv(output, index=False, encoding='utf-8')
-        csv_content = output.getvalue()
-        output.close()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerow(build_csv_header([item_name for item_name, _ in plan.income_items], plan.deduction_order))
+        
+        for payroll in self._iter_payroll_chunks(config, plan, chunk_size):
+            for row in payroll.iter_rows():
+                row.append(run_time)
+                writer.writerow(row)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+        
+        # 没有员工时也输出表头
+        if output.tell():
+            yield output.getvalue()
+    
+    def write_employees_csv(self, file, chunk_size=5000):
+        """把员工工资表流式写入文本文件对象，返回写入的员工数"""
+        for text in self.iter_employees_csv(chunk_size):
+            file.write(text)
+        return len(self.employees)
+    
+    @timed("export_employees_to_csv_file")
+    def export_employees_to_csv_file(self, file_path, chunk_size=5000, encoding="utf-8-sig"):
+        """导出员工工资表到CSV文件，文件名以 .gz 结尾时写入 gzip 压缩流"""
+        try:
+            if file_path.endswith(".gz"):
+                f = gzip.open(file_path, "wt", compresslevel=6, encoding=encoding, newline="")
+            else:
+                f = open(file_path, "w", encoding=encoding, newline="")
+            with f:
+                count = self.write_employees_csv(f, chunk_size)
+            return True, f"工资表导出成功，共{count}名员工"
+        except Exception as e:
+            return False, f"工资表导出失败: {str(e)}"
+    
+    def export_employees_to_parquet(self, file_path, chunk_size=50000):
+        """导出员工工资计算结果到 Parquet 文件（需要 pyarrow），file_path 也可以是二进制文件对象"""
+        try:
+            from salary_calculator_parquet import write_payroll
+            count = write_payroll(self, file_path, chunk_size)
+            return True, f"工资表导出成功，共{count}名员工"
+        except Exception as e:
+            return False, f"工资表导出失败: {str(e)}"
+    
+    def export_roster_to_parquet(self, file_path, chunk_size=5000):
+        """导出员工名单（薪资数据和扣除项选择）到 Parquet 文件，可用 import_employees 重新导入"""
+        try:
+            from salary_calculator_parquet import write_roster
+            count = write_roster(self, file_path, chunk_size)
+            return True, f"员工名单导出成功，共{count}名员工"
+        except Exception as e:
+            return False, f"员工名单导出失败: {str(e)}"
+    
+    @timed("export_employees_to_csv")
+    def export_employees_to_csv(self):
+        """导出所有员工工资到CSV"""
+        if not self.employees:
+            return None
         
-        return csv_content 
\ No newline at end of file
+        return "".join(self.iter_employees_csv())
@@ -0,0 +1,233 @@
+"""
+工资计算器 - 按分（整数）计算金额
+配置中 calculation_methods.money.unit 为 "fen" 时，所有金额以 int64 的“分”保存和计算：
+收入项、固定扣除、起征点和税率表金额换算为分，比例扣除和个税按整数运算后在固定位置舍入到分，
+合计为整数相加，没有浮点累积误差。比例（扣除比例、税率）按百万分之一精度换算为整数。
+
+舍入位置与方式：
+    每个比例扣除项：收入 × 比例 舍入到分，方式取该扣除项的 "rounding"，没有时取 money.rounding
+    个税：应税收入 × 税率 舍入到分后减速算扣除数，方式取个税扣除项的 "rounding"
+    输入金额（元）换算为分时一律四舍五入
+"""
+
+import math
+from bisect import bisect_left
+from fractions import Fraction
+
+import numpy as np
+
+MONEY_UNIT_YUAN = "yuan"
+MONEY_UNIT_FEN = "fen"
+MONEY_UNITS = (MONEY_UNIT_YUAN, MONEY_UNIT_FEN)
+
+ROUND_HALF_UP = "half_up"      # 四舍五入（远离0）
+ROUND_HALF_EVEN = "half_even"  # 四舍六入五成双（银行家舍入）
+ROUND_DOWN = "down"            # 舍去（向0）
+ROUND_UP = "up"                # 进一（远离0）
+ROUNDING_MODES = (ROUND_HALF_UP, ROUND_HALF_EVEN, ROUND_DOWN, ROUND_UP)
+DEFAULT_ROUNDING = ROUND_HALF_UP
+
+FEN_PER_YUAN = 100
+# 比例换算为整数的倍数：0.105 → 105000
+RATE_SCALE = 10 ** 6
+# 金额 × 比例（不超过1）舍入时不超出 int64 的金额上限（约 92 亿元）
+MAX_FEN = np.iinfo(np.int64).max // RATE_SCALE - 1
+# 换算为分时，与 0.5 分相差不到该值的按 0.5 分处理
+HALF_FEN_TOLERANCE = 1e-6
+# 税率表最后一档的无上限
+UNBOUNDED_FEN = np.iinfo(np.int64).max
+
+
+class FenError(ValueError):
+    """舍入方式无效，或金额超出按分计算的范围"""
+
+
+def money_settings(config):
+    """配置中的金额计算设置，没有时按元（浮点）计算"""
+    return config["calculation_methods"].get("money", {"unit": MONEY_UNIT_YUAN})
+
+
+def uses_fen(config):
+    """配置是否按分计算，计算方式无效时抛出 FenError"""
+    unit = money_settings(config).get("unit", MONEY_UNIT_YUAN)
+    if unit not in MONEY_UNITS:
+        raise FenError(f"金额计算方式「{unit}」无效，可选: {', '.join(MONEY_UNITS)}")
+    return unit == MONEY_UNIT_FEN
+
+
+def to_fen_array(values):
+    """把元金额换算为分（四舍五入），超出范围时抛出 FenError"""
+    values = np.asarray(values, dtype=np.float64) * FEN_PER_YUAN
+    # 加上一点余量，抵消乘法带来的二进制误差（如 1.005 × 100 = 100.49999…）后再四舍五入
+    magnitude = np.abs(values)
+    magnitude += 0.5 + HALF_FEN_TOLERANCE
+    np.floor(magnitude, out=magnitude)
+    if not (magnitude <= MAX_FEN).all():
+        raise FenError(f"金额超出按分计算的范围（绝对值不超过 {MAX_FEN // FEN_PER_YUAN:,} 元）")
+    fen = magnitude.astype(np.int64)
+    negative = values < 0
+    if negative.any():
+        fen[negative] = -fen[negative]
+    return fen
+
+
+def to_fen(value):
+    """单个元金额换算为分（int），结果与 to_fen_array 相同，不经过 NumPy"""
+    value = float(value) * FEN_PER_YUAN
+    shifted = abs(value) + (0.5 + HALF_FEN_TOLERANCE)
+    if not shifted < MAX_FEN + 1:
+        raise FenError(f"金额超出按分计算的范围（绝对值不超过 {MAX_FEN // FEN_PER_YUAN:,} 元）")
+    fen = math.floor(shifted)
+    return -fen if value < 0 else fen
+
+
+def to_yuan(fen):
+    """分换算为元（float），整数分换算后是最接近的 float"""
+    return np.asarray(fen) / FEN_PER_YUAN
+
+
+def fen_fraction(value):
+    """整数分换算成的元金额（float）还原为精确的分数"""
+    return Fraction(round(value * FEN_PER_YUAN), FEN_PER_YUAN)
+
+
+def scale_rate(rate):
+    """比例换算为 RATE_SCALE 倍的整数"""
+    return int(round(rate * RATE_SCALE))
+
+
+def divide_rounded(numerator, denominator, rounding):
+    """整数数组除以正整数，按 rounding 舍入为整数
+
+    只用除数为标量的整除（NumPy 对此有快速实现），不用 divmod
+    """
+    numerator = np.asarray(numerator, dtype=np.int64)
+    negative = numerator < 0
+    has_negative = negative.any()
+    magnitude = np.abs(numerator) if has_negative else numerator
+    if rounding == ROUND_DOWN:
+        quotient = magnitude // denominator
+    elif rounding == ROUND_UP:
+        quotient = (magnitude + (denominator - 1)) // denominator
+    else:
+        half = denominator // 2
+        quotient = (magnitude + half) // denominator
+        if rounding == ROUND_HALF_EVEN and denominator % 2 == 0:
+            # 恰好为 0.5 时进位后为奇数则退回
+            quotient -= (quotient * denominator == magnitude + half) & (quotient % 2 == 1)
+    return np.where(negative, -quotient, quotient) if has_negative else quotient
+
+
+def divide_rounded_int(numerator, denominator, rounding):
+    """单个整数除以正整数，按 rounding 舍入，结果与 divide_rounded 相同"""
+    magnitude = abs(numerator)
+    if rounding == ROUND_DOWN:
+        quotient = magnitude // denominator
+    elif rounding == ROUND_UP:
+        quotient = (magnitude + (denominator - 1)) // denominator
+    else:
+        half = denominator // 2
+        quotient = (magnitude + half) // denominator
+        if (rounding == ROUND_HALF_EVEN and denominator % 2 == 0
+                and quotient * denominator == magnitude + half and quotient % 2 == 1):
+            quotient -= 1
+    return -quotient if numerator < 0 else quotient
+
+
+def check_rounding(rounding, where):
+    if rounding not in ROUNDING_MODES:
+        raise FenError(f"{where}的舍入方式「{rounding}」无效，可选: {', '.join(ROUNDING_MODES)}")
+    return rounding
+
+
+class FenTaxTable:
+    """以分为单位的累进税率表，档次划分与 TaxBracketTable 相同"""
+
+    __slots__ = ("minimum", "maxs", "rates", "deductions", "rounding", "_brackets")
+
+    def __init__(self, minimum, maxs, rates, deductions, rounding):
+        self.minimum = minimum        # 第一档最低收入（分）
+        self.maxs = maxs              # 各档上限（分），无上限为 UNBOUNDED_FEN
+        self.rates = rates            # 各档税率 × RATE_SCALE
+        self.deductions = deductions  # 各档速算扣除数（分）
+        self.rounding = rounding      # 应纳税额的舍入方式
+        self._brackets = (maxs.tolist(), rates.tolist(), deductions.tolist())  # 单个计算用的 Python 整数
+
+    @classmethod
+    def compile(cls, tax_table, rounding=DEFAULT_ROUNDING):
+        """从已编译的 TaxBracketTable 换算"""
+        maxs = [UNBOUNDED_FEN if upper == float('inf') else to_fen(upper) for upper in tax_table.maxs]
+        return cls(
+            to_fen(tax_table.mins[0]),
+            np.array(maxs, dtype=np.int64),
+            np.array([scale_rate(rate) for rate in tax_table.rates], dtype=np.int64),
+            to_fen_array(tax_table.deductions),
+            check_rounding(rounding, "个税")
+        )
+
+    def tax(self, taxable_fen):
+        """整列应税收入（分，非负）的累进税（分）：应税收入 × 税率 舍入到分后减速算扣除数"""
+        taxable_fen = np.asarray(taxable_fen, dtype=np.int64)
+        if not (taxable_fen <= MAX_FEN).all():
+            raise FenError(f"应税收入超出按分计算的范围（不超过 {MAX_FEN // FEN_PER_YUAN:,} 元）")
+        indices = np.searchsorted(self.maxs, taxable_fen, side="left")
+        tax = divide_rounded(taxable_fen * self.rates[indices], RATE_SCALE, self.rounding)
+        tax = np.maximum(0, tax - self.deductions[indices])
+        return np.where(taxable_fen < self.minimum, 0, tax)
+
+    def tax_one(self, taxable_fen):
+        """单个应税收入（分，非负整数）的累进税（分），结果与 tax 相同，不经过 NumPy"""
+        if taxable_fen > MAX_FEN:
+            raise FenError(f"应税收入超出按分计算的范围（不超过 {MAX_FEN // FEN_PER_YUAN:,} 元）")
+        if taxable_fen < self.minimum:
+            return 0
+        maxs, rates, deductions = self._brackets
+        index = bisect_left(maxs, taxable_fen)
+        return max(0, divide_rounded_int(taxable_fen * rates[index], RATE_SCALE, self.rounding) - deductions[index])
+
+
+class FenTables:
+    """按分计算用的整数参数：各扣除项的比例、默认金额和舍入方式，起征点和税率表（分）"""
+
+    __slots__ = ("rates", "amounts", "roundings", "threshold", "tax_table")
+
+    def __init__(self, rates, amounts, roundings, threshold, tax_table):
+        self.rates = rates            # 扣除项 → 比例 × RATE_SCALE
+        self.amounts = amounts        # 扣除项 → 默认金额（分）
+        self.roundings = roundings    # 扣除项 → 舍入方式
+        self.threshold = threshold    # 起征点（分）
+        self.tax_table = tax_table    # FenTaxTable，舍入方式取个税扣除项的设置
+
+    @classmethod
+    def compile(cls, config, steps, tax_table, threshold):
+        """从配置和已编译的扣除步骤、税率表换算整数参数，舍入方式无效时抛出 FenError"""
+        default_rounding = check_rounding(money_settings(config).get("rounding", DEFAULT_ROUNDING), "金额计算")
+        deduction_items = config["deduction_items"]
+        rates = {}
+        amounts = {}
+        roundings = {}
+        tax_rounding = default_rounding
+        for step in steps:
+            item = deduction_items[step.name]
+            rates[step.name] = scale_rate(step.rate)
+            amounts[step.name] = to_fen(step.amount)
+            roundings[step.name] = check_rounding(item.get("rounding", default_rounding), f"扣除项「{step.name}」")
+            if item.get("method") == "progressive_tax":
+                tax_rounding = roundings[step.name]
+        return cls(rates, amounts, roundings, to_fen(threshold), FenTaxTable.compile(tax_table, tax_rounding))
+
+    def percentage(self, name, base_fen):
+        """比例扣除：收入（分）× 比例，舍入到分"""
+        return divide_rounded(base_fen * self.rates[name], RATE_SCALE, self.roundings[name])
+
+    def tax(self, taxable_fen):
+        """按配置的税率表计算个税（分）"""
+        return self.tax_table.tax(taxable_fen)
+
+    def percentage_one(self, name, base_fen):
+        """单个员工的比例扣除（分），结果与 percentage 相同"""
+        return divide_rounded_int(base_fen * self.rates[name], RATE_SCALE, self.roundings[name])
+
+    def tax_one(self, taxable_fen):
+        """单个员工的个税（分）"""
+        return self.tax_table.tax_one(taxable_fen)
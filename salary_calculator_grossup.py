@@ -0,0 +1,164 @@
+"""
+工资计算器 - 税后反算税前
+已知目标税后收入，求某个收入项（如基本工资、奖金）应为多少。
+固定其他输入后，税后收入是该收入项的分段线性函数：
+    税后收入 = A + B·x - 个税(max(0, C + E·x))
+其中 B、E 由以该收入项为基数的百分比扣除决定，个税在每个税率档次内也是线性的。
+逐段求出闭式解并取落在本段内的那个；不满足单调条件的配置改用二分法。
+"""
+
+import numpy as np
+
+from salary_calculator_plan import STEP_PERCENTAGE, STEP_FIXED_AMOUNT, STEP_PROGRESSIVE_TAX
+
+# 二分法的迭代次数（金额为 float64，足以收敛到最小精度）
+BISECTION_STEPS = 200
+
+
+class GrossUpError(ValueError):
+    """无法反算（收入项不存在，或目标税后收入无法达到）"""
+
+
+def _linear_terms(plan, item, salary_datas, selections):
+    """每个员工的 A、B、C、E 系数和是否计个税"""
+    count = len(salary_datas)
+    incomes = {}
+    other_income = np.zeros(count, dtype=np.float64)
+    for item_name, default in plan.income_items:
+        if item_name == item:
+            continue
+        incomes[item_name] = np.fromiter((data.get(item_name, default) for data in salary_datas),
+                                         dtype=np.float64, count=count)
+        other_income += incomes[item_name]
+
+    constant = np.zeros(count, dtype=np.float64)      # 与 x 无关的扣除（不含个税）
+    slope = np.zeros(count, dtype=np.float64)         # 每 1 元 x 带来的扣除（不含个税）
+    pre_tax_constant = np.zeros(count, dtype=np.float64)
+    pre_tax_slope = np.zeros(count, dtype=np.float64)
+    taxed = np.zeros(count, dtype=bool)
+    for step in plan.steps:
+        chosen = np.fromiter((step.name in selection for selection in selections), dtype=bool, count=count)
+        step_constant = step_slope = 0.0
+        if step.kind == STEP_PERCENTAGE:
+            if step.base == item:
+                step_slope = step.rate
+            else:
+                step_constant = incomes[step.base] * step.rate
+        elif step.kind == STEP_FIXED_AMOUNT:
+            step_constant = np.fromiter((data.get(step.override_key, step.amount) for data in salary_datas),
+                                        dtype=np.float64, count=count)
+        elif step.kind == STEP_PROGRESSIVE_TAX:
+            taxed = chosen
+            continue
+        step_constant = np.where(chosen, step_constant, 0.0)
+        step_slope = np.where(chosen, step_slope, 0.0)
+        constant += step_constant
+        slope += step_slope
+        if step.pre_tax:
+            pre_tax_constant += step_constant
+            pre_tax_slope += step_slope
+
+    return (other_income - constant, 1 - slope,
+            other_income - pre_tax_constant - plan.threshold, 1 - pre_tax_slope, taxed)
+
+
+def _tax_segments(tax_table):
+    """把个税函数按应税收入分成线性段：返回 (段起点, 段终点, 截距, 斜率)，个税 = 截距 + 斜率 × 应税收入"""
+    points = {0.0}
+    for lower, upper, rate, deduction in zip(tax_table.mins, tax_table.maxs, tax_table.rates, tax_table.deductions):
+        if upper != float('inf'):
+            points.add(float(upper))
+        # 税额为负时按0计，转折点也作为分段点
+        if rate > 0 and lower < deduction / rate < upper:
+            points.add(deduction / rate)
+    points = sorted(point for point in points if point >= 0)
+    starts = np.array(points, dtype=np.float64)
+    ends = np.append(starts[1:], np.inf)
+
+    # 每段取一个内部点判断所在档次和是否为0
+    probes = np.where(np.isinf(ends), starts + 1, (starts + ends) / 2)
+    indices = np.searchsorted(np.asarray(tax_table.maxs, dtype=np.float64), probes, side="left")
+    rates = np.asarray(tax_table.rates, dtype=np.float64)[indices]
+    deductions = np.asarray(tax_table.deductions, dtype=np.float64)[indices]
+    positive = probes * rates - deductions > 0
+    return starts, ends, np.where(positive, -deductions, 0.0), np.where(positive, rates, 0.0)
+
+
+def net_income_at(plan, terms, x):
+    """按系数计算收入项为 x 时的税后收入（与计算计划的结果相同）"""
+    a, b, c, e, taxed = terms
+    tax = plan.tax_table.tax_array(np.maximum(0, c + e * x))
+    return a + b * x - np.where(taxed, tax, 0.0)
+
+
+def _solve_closed_form(plan, terms, targets):
+    """逐段闭式求解，每行取应税收入落在本段内的解；不满足单调条件或无解的行为 NaN"""
+    a, b, c, e, taxed = terms
+    starts, ends, intercepts, rates = _tax_segments(plan.tax_table)
+
+    # 应税收入为0（不足起征点）的一段：个税为常数
+    zero_tax = plan.tax_table.tax_array(np.zeros(1))[0]
+    seg_intercepts = np.where(taxed[:, None], intercepts[None, :], 0.0)
+    seg_rates = np.where(taxed[:, None], rates[None, :], 0.0)
+    denominators = b[:, None] - seg_rates * e[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        below = (targets - a + np.where(taxed, zero_tax, 0.0)) / b
+        # 每个税率段：a + b·x - (截距 + 斜率·(c + e·x)) = 目标
+        candidates = (targets[:, None] - a[:, None] + seg_intercepts + seg_rates * c[:, None]) / denominators
+        taxable = c[:, None] + e[:, None] * candidates
+        result = np.where(c + e * below <= 0, below, np.nan)
+    valid = (taxable > starts[None, :]) & (taxable <= ends[None, :])
+    first = np.argmax(valid, axis=1)
+    found = valid.any(axis=1)
+    result = np.where(np.isnan(result) & found, candidates[np.arange(len(targets)), first], result)
+
+    # 税后收入须随 x 严格递增，否则闭式解可能不唯一
+    monotonic = (e > 0) & (b > 0) & (denominators > 0).all(axis=1)
+    return np.where(monotonic, result, np.nan)
+
+
+def _solve_bisection(plan, terms, targets):
+    """二分法求 x ≥ 0 的解（税后收入不必单调），找不到跨过目标的区间的行为 NaN"""
+    low = np.zeros(len(targets), dtype=np.float64)
+    high = np.maximum(np.abs(targets), 1.0)
+    low_above = net_income_at(plan, terms, low) >= targets
+    for _ in range(64):
+        same_side = (net_income_at(plan, terms, high) >= targets) == low_above
+        if not same_side.any():
+            break
+        high = np.where(same_side, high * 2, high)
+    reachable = (net_income_at(plan, terms, high) >= targets) != low_above
+    for _ in range(BISECTION_STEPS):
+        middle = (low + high) / 2
+        moved = (net_income_at(plan, terms, middle) >= targets) == low_above
+        low = np.where(moved, middle, low)
+        high = np.where(moved, high, middle)
+    # 取区间中税后收入不低于目标的一端
+    return np.where(reachable, np.where(low_above, low, high), np.nan)
+
+
+def solve_gross_up(plan, item, targets, salary_datas, selections):
+    """求收入项 item 应为多少才能使税后收入等于目标，返回金额数组（无法以非负金额达到的为 NaN）
+
+    targets: 目标税后收入数组；salary_datas、selections: 每个目标对应的其他收入项和适用扣除项，
+    只给一组时所有目标共用
+    """
+    if item not in [item_name for item_name, _ in plan.income_items]:
+        raise GrossUpError(f"收入项不存在: {item}")
+    targets = np.atleast_1d(np.asarray(targets, dtype=np.float64))
+    if len(salary_datas) == 1 and len(targets) > 1:
+        terms = tuple(np.repeat(term, len(targets)) for term in _linear_terms(plan, item, salary_datas, selections))
+    else:
+        if len(salary_datas) != len(targets):
+            raise GrossUpError("目标税后收入与员工数据的数量不一致")
+        terms = _linear_terms(plan, item, salary_datas, selections)
+
+    amounts = _solve_closed_form(plan, terms, targets)
+    fallback = np.isnan(amounts)
+    if fallback.any():
+        subset = tuple(term[fallback] for term in terms)
+        amounts[fallback] = _solve_bisection(plan, subset, targets[fallback])
+
+    # 舍入误差造成的极小负数按0计，明显为负说明其他收入已超过目标
+    amounts = np.where((amounts < 0) & (amounts > -1e-6), 0.0, amounts)
+    return np.where(amounts < 0, np.nan, amounts)
@@ -0,0 +1,250 @@
+"""
+工资计算器 - 员工批量导入
+分块读取 CSV / XLSX / Parquet 名单，把列映射到收入项和 deduction_ 自定义扣除金额，
+逐块校验后通过一次批量写入保存，其余行返回行级错误报告
+"""
+
+import csv
+import io
+import math
+import re
+from itertools import islice
+
+NAME_COLUMNS = ["员工姓名", "姓名"]
+SELECTION_COLUMNS = ["适用扣除项", "扣除项"]
+# 导出的工资表中的汇总列，重新导入时忽略
+SUMMARY_COLUMNS = ["总收入", "总扣除", "税后收入", "计算时间"]
+SELECTION_SEPARATOR = re.compile(r"[、,，;；|]")
+
+
+def parse_amount(value):
+    """解析金额单元格，空单元格返回 None，无法解析时抛出 ValueError"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        amount = float(value)
+    else:
+        text = str(value).strip().replace("¥", "").replace(",", "")
+        if not text:
+            return None
+        try:
+            amount = float(text)
+        except ValueError:
+            raise ValueError("不是有效数字")
+    if math.isnan(amount) or math.isinf(amount):
+        raise ValueError("不是有效数字")
+    if amount < 0:
+        raise ValueError("不能为负数")
+    return amount
+
+
+class RosterColumnMapping:
+    """表头到收入项、扣除项的映射
+
+    支持的列：员工姓名/姓名、收入项名称或 收入_<收入项>、deduction_<扣除项>（固定金额扣除的自定义金额）、
+    适用扣除项（用 、,; 分隔）。导出的工资表中的 扣除_<扣除项> 列也能识别：非空即视为适用，
+    固定金额扣除项取该列金额。
+    """
+
+    def __init__(self, header, config):
+        salary_items = config["salary_items"]
+        deduction_items = config["deduction_items"]
+        self.deduction_names = list(deduction_items.keys())
+        self.default_deductions = [name for name, item in deduction_items.items()
+                                   if not item.get("optional", False)]
+
+        self.name_index = None
+        self.selection_index = None
+        self.income_columns = []      # [(列号, 收入项)]
+        self.override_columns = []    # [(列号, 扣除项)]
+        self.export_deduction_columns = []  # [(列号, 扣除项, 是否固定金额)]
+        self.unknown_columns = []
+
+        for index, column in enumerate(header):
+            column = str(column).strip() if column is not None else ""
+            if column in NAME_COLUMNS and self.name_index is None:
+                self.name_index = index
+            elif column in SELECTION_COLUMNS and self.selection_index is None:
+                self.selection_index = index
+            elif column in salary_items:
+                self.income_columns.append((index, column))
+            elif column.startswith("收入_") and column[3:] in salary_items:
+                self.income_columns.append((index, column[3:]))
+            elif column.startswith("deduction_") and column[10:] in deduction_items:
+                self.override_columns.append((index, column[10:]))
+            elif column.startswith("扣除_") and column[3:] in deduction_items:
+                name = column[3:]
+                self.export_deduction_columns.append(
+                    (index, name, deduction_items[name]["type"] == "fixed_amount"))
+            elif column in SUMMARY_COLUMNS or not column:
+                continue
+            else:
+                self.unknown_columns.append(column)
+
+    def parse_row(self, values):
+        """解析一行，返回 (员工姓名, 薪资数据, 适用扣除项)，数据无效时抛出 ValueError"""
+        def cell(index):
+            return values[index] if index < len(values) else None
+
+        name = cell(self.name_index)
+        name = str(name).strip() if name is not None else ""
+        if not name:
+            raise ValueError("员工姓名不能为空")
+
+        salary_data = {}
+        for index, item_name in self.income_columns:
+            try:
+                amount = parse_amount(cell(index))
+            except ValueError as e:
+                raise ValueError(f"{item_name}: {str(e)}")
+            if amount is not None:
+                salary_data[item_name] = amount
+
+        selected_deductions = None
+        if self.selection_index is not None:
+            selected_deductions = self.parse_selection(cell(self.selection_index))
+        elif self.export_deduction_columns:
+            selected_deductions = []
+
+        for index, deduction_name, fixed_amount in self.export_deduction_columns:
+            try:
+                amount = parse_amount(cell(index))
+            except ValueError as e:
+                raise ValueError(f"扣除_{deduction_name}: {str(e)}")
+            if amount is None:
+                continue
+            if self.selection_index is None and deduction_name not in selected_deductions:
+                selected_deductions.append(deduction_name)
+            if fixed_amount:
+                salary_data[f"deduction_{deduction_name}"] = amount
+
+        for index, deduction_name in self.override_columns:
+            try:
+                amount = parse_amount(cell(index))
+            except ValueError as e:
+                raise ValueError(f"deduction_{deduction_name}: {str(e)}")
+            if amount is not None:
+                salary_data[f"deduction_{deduction_name}"] = amount
+
+        return name, salary_data, self.ordered_selection(selected_deductions)
+
+    def parse_selection(self, value):
+        """解析适用扣除项单元格（用分隔符分开的文字，或 Parquet 名单的字符串列表），
+        空单元格返回 None（使用默认扣除项），有未知扣除项时抛出 ValueError"""
+        selected_deductions = None
+        if isinstance(value, (list, tuple)):
+            selected_deductions = [str(part).strip() for part in value if str(part).strip()]
+            value = None
+        text = str(value).strip() if value is not None else ""
+        if text:
+            selected_deductions = [part.strip() for part in SELECTION_SEPARATOR.split(text) if part.strip()]
+        if selected_deductions is not None:
+            unknown = [part for part in selected_deductions if part not in self.deduction_names]
+            if unknown:
+                raise ValueError(f"未知扣除项: {'、'.join(unknown)}")
+        return selected_deductions
+
+    def ordered_selection(self, selected_deductions):
+        """保存用的适用扣除项：None 为默认扣除项，否则按配置顺序排列"""
+        if selected_deductions is None:
+            return list(self.default_deductions)
+        return [name for name in self.deduction_names if name in selected_deductions]
+
+
+def _open_rows(source, file_type, encoding):
+    """打开名单文件，返回 (逐行迭代器, 关闭函数)"""
+    if file_type == "xlsx":
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportError("读取 Excel 文件需要安装 openpyxl: pip install openpyxl")
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+        return rows, workbook.close
+
+    if isinstance(source, str):
+        f = open(source, "r", encoding=encoding, newline="")
+        return csv.reader(f), f.close
+    if isinstance(source, (bytes, bytearray)):
+        source = io.StringIO(source.decode(encoding))
+    elif not isinstance(source, io.TextIOBase):
+        # 二进制文件对象：读完后解除包装，不关闭调用方的文件
+        wrapper = io.TextIOWrapper(source, encoding=encoding, newline="")
+        return csv.reader(wrapper), wrapper.detach
+    return csv.reader(source), lambda: None
+
+
+def import_employees(calculator, source, file_type=None, chunk_size=5000, encoding="utf-8-sig"):
+    """从 CSV / XLSX 批量导入员工
+
+    source: 文件路径、字节串或文件对象；file_type 为 "csv"、"xlsx" 或 "parquet"，为空时按文件扩展名判断。
+    每 chunk_size 行校验一次并批量写入，返回导入报告：
+    {"imported": 成功数, "failed": 失败数, "errors": [{"row": 行号, "name": 姓名, "error": 原因}], "ignored_columns": [...]}
+    """
+    if file_type is None:
+        path = source.lower() if isinstance(source, str) else ""
+        if path.endswith((".xlsx", ".xlsm")):
+            file_type = "xlsx"
+        elif path.endswith(".parquet"):
+            file_type = "parquet"
+        else:
+            file_type = "csv"
+    if file_type == "parquet":
+        from salary_calculator_parquet import import_employees as import_parquet
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return import_parquet(calculator, source, batch_size=chunk_size)
+
+    report = {"imported": 0, "failed": 0, "errors": [], "ignored_columns": []}
+    rows, close = _open_rows(source, file_type, encoding)
+    try:
+        header = next(rows, None)
+        if header is None:
+            report["errors"].append({"row": 1, "name": "", "error": "文件为空"})
+            return report
+
+        mapping = RosterColumnMapping(header, calculator.config)
+        report["ignored_columns"] = mapping.unknown_columns
+        if mapping.name_index is None:
+            report["errors"].append({"row": 1, "name": "", "error": f"缺少姓名列（{' / '.join(NAME_COLUMNS)}）"})
+            return report
+
+        row_number = 1
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+
+            records = []
+            record_rows = []
+            for values in chunk:
+                row_number += 1
+                if not any(value not in (None, "") for value in values):
+                    continue  # 跳过空行
+                try:
+                    records.append(mapping.parse_row(values))
+                    record_rows.append(row_number)
+                except ValueError as e:
+                    name = values[mapping.name_index] if mapping.name_index < len(values) else ""
+                    report["errors"].append({"row": row_number, "name": name or "", "error": str(e)})
+
+            added, failures = calculator.add_employees(records)
+            report["imported"] += added
+            for index, name, reason in failures:
+                report["errors"].append({"row": record_rows[index], "name": name, "error": reason})
+    finally:
+        close()
+        report["errors"].sort(key=lambda error: error["row"])
+        report["failed"] = len(report["errors"])
+    return report
+
+
+def get_import_template(config):
+    """批量导入模板的表头（CSV文本）"""
+    header = ["员工姓名"] + list(config["salary_items"].keys())
+    header += [f"deduction_{name}" for name, item in config["deduction_items"].items()
+               if item["type"] == "fixed_amount"]
+    header.append("适用扣除项")
+    output = io.StringIO()
+    csv.writer(output, lineterminator="\n").writerow(header)
+    return output.getvalue()
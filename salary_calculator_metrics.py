@@ -0,0 +1,228 @@
+"""
+工资计算器 - 运行指标
+记录热点方法的调用次数和耗时分布、各税率档次的员工数，
+可通过 get_metrics() 读取，或写成 Prometheus 文本格式供监控采集。
+计时包装定义在 SalaryCalculator 类上（见 timed），未启用时直接调用原方法，不做任何记录；
+包装不保存在实例上，启用了指标的计算器也可以 pickle / deepcopy。
+"""
+
+import functools
+import os
+import threading
+import time
+
+import numpy as np
+
+from salary_calculator_plan import STEP_PROGRESSIVE_TAX
+
+# 耗时分布的桶上限（秒）
+LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+class LatencyHistogram:
+    """耗时分布（累计桶计数、总耗时、最大耗时）"""
+
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.bounds):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def cumulative_buckets(self):
+        """[(桶上限, 不超过该上限的调用数)]，最后一项为 +Inf"""
+        buckets = []
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            buckets.append((bound, running))
+        buckets.append((float("inf"), self.count))
+        return buckets
+
+
+def _taxable_income(plan, tax_step, result):
+    """根据计算结果还原应税收入，员工未选个税项时返回 None"""
+    deductions = result["deductions"]
+    if tax_step.name not in deductions:
+        return None
+    pre_tax_deductions = sum([deductions[name] for name in tax_step.depends_on if name in deductions])
+    return max(0, result["total_income"] - pre_tax_deductions - plan.threshold)
+
+
+def _find_tax_step(plan):
+    for step in plan.steps:
+        if step.kind == STEP_PROGRESSIVE_TAX:
+            return step
+    return None
+
+
+class PayrollMetrics:
+    """一个计算器实例的运行指标"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}            # 方法名 → LatencyHistogram
+        self.tax_bracket_hits = {}   # 单次计算落入的税率档次 → 次数
+        self.tax_bracket_employees = {}  # 最近一次批量计算中每个税率档次的员工数
+        self.tax_bracket_rates = {}  # 税率档次 → 税率（用作标签）
+        self.headcount = 0
+        self._roster_key = None      # 员工档次分布对应的 (配置版本, 名单标记)
+
+    def __getstate__(self):
+        # 锁不能 pickle，恢复时重新创建
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def observe(self, method, seconds):
+        """记录一次调用耗时"""
+        with self._lock:
+            histogram = self.latency.get(method)
+            if histogram is None:
+                histogram = self.latency[method] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def record_salary(self, plan, result):
+        """记录单次工资计算落入的税率档次"""
+        tax_step = _find_tax_step(plan)
+        if tax_step is None:
+            return
+        taxable_income = _taxable_income(plan, tax_step, result)
+        if taxable_income is None:
+            return
+        index = plan.tax_table.bracket_index(taxable_income)
+        with self._lock:
+            self.tax_bracket_hits[index] = self.tax_bracket_hits.get(index, 0) + 1
+            self.tax_bracket_rates[index] = plan.tax_table.rates[index]
+
+    def record_roster(self, plan, results, roster_key):
+        """记录批量计算的人数和各税率档次的员工数（名单和配置未变时不重复统计）"""
+        if roster_key == self._roster_key:
+            return
+        tax_step = _find_tax_step(plan)
+        employees = {}
+        if tax_step is not None:
+            taxable = [_taxable_income(plan, tax_step, result) for result in results.values()]
+            taxable = np.array([x for x in taxable if x is not None], dtype=np.float64)
+            indices = plan.tax_table.bracket_indices(taxable)
+            for index, count in zip(*np.unique(indices, return_counts=True)):
+                employees[int(index)] = int(count)
+        with self._lock:
+            self.headcount = len(results)
+            self.tax_bracket_employees = employees
+            for index in employees:
+                self.tax_bracket_rates[index] = plan.tax_table.rates[index]
+            self._roster_key = roster_key
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self.latency = {}
+            self.tax_bracket_hits = {}
+            self.tax_bracket_employees = {}
+            self.tax_bracket_rates = {}
+            self.headcount = 0
+            self._roster_key = None
+
+    def snapshot(self):
+        """指标快照（普通字典）"""
+        with self._lock:
+            calls = {}
+            for method, histogram in self.latency.items():
+                calls[method] = {
+                    "count": histogram.count,
+                    "total_seconds": histogram.total,
+                    "mean_seconds": histogram.total / histogram.count if histogram.count else 0.0,
+                    "max_seconds": histogram.max,
+                    "buckets": histogram.cumulative_buckets()
+                }
+            return {
+                "calls": calls,
+                "headcount": self.headcount,
+                "tax_bracket_employees": dict(sorted(self.tax_bracket_employees.items())),
+                "tax_bracket_hits": dict(sorted(self.tax_bracket_hits.items()))
+            }
+
+    def to_prometheus(self):
+        """Prometheus 文本格式"""
+        snapshot = self.snapshot()
+        rates = dict(self.tax_bracket_rates)
+        lines = [
+            "# HELP salary_calculator_call_duration_seconds Latency of SalaryCalculator hot-path methods.",
+            "# TYPE salary_calculator_call_duration_seconds histogram"
+        ]
+        for method, call in sorted(snapshot["calls"].items()):
+            for bound, count in call["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'salary_calculator_call_duration_seconds_bucket{{method="{method}",le="{le}"}} {count}')
+            lines.append(f'salary_calculator_call_duration_seconds_sum{{method="{method}"}} {call["total_seconds"]!r}')
+            lines.append(f'salary_calculator_call_duration_seconds_count{{method="{method}"}} {call["count"]}')
+
+        lines.append("# HELP salary_calculator_headcount Employees in the last payroll run.")
+        lines.append("# TYPE salary_calculator_headcount gauge")
+        lines.append(f"salary_calculator_headcount {snapshot['headcount']}")
+
+        lines.append("# HELP salary_calculator_tax_bracket_employees Employees per tax bracket in the last payroll run.")
+        lines.append("# TYPE salary_calculator_tax_bracket_employees gauge")
+        for index, count in snapshot["tax_bracket_employees"].items():
+            lines.append(f'salary_calculator_tax_bracket_employees{{bracket="{index + 1}",rate="{rates[index]}"}} {count}')
+
+        lines.append("# HELP salary_calculator_tax_bracket_hits_total Single salary calculations per tax bracket.")
+        lines.append("# TYPE salary_calculator_tax_bracket_hits_total counter")
+        for index, count in snapshot["tax_bracket_hits"].items():
+            lines.append(f'salary_calculator_tax_bracket_hits_total{{bracket="{index + 1}",rate="{rates[index]}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        """写入 Prometheus 文本文件（先写临时文件再替换，采集端不会读到一半的内容）"""
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, file_path)
+
+
+def record_salary(calculator, metrics, result):
+    """calculate_salary 的附加记录：税率档次"""
+    metrics.record_salary(calculator.get_calculation_plan(), result)
+
+
+def record_roster(calculator, metrics, results):
+    """calculate_all_employees 的附加记录：人数和各税率档次的员工数"""
+    metrics.record_roster(calculator.get_calculation_plan(), results,
+                          (calculator.config_version, calculator._roster_token()))
+
+
+def timed(method, record=None):
+    """计算器方法的计时包装：calculator.metrics 不为 None 时记录每次调用的耗时，
+    调用成功后再调用 record(calculator, metrics, 返回值) 记录其他指标"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(calculator, *args, **kwargs):
+            metrics = calculator.metrics
+            if metrics is None:
+                return func(calculator, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = func(calculator, *args, **kwargs)
+            finally:
+                metrics.observe(method, time.perf_counter() - start)
+            if record is not None:
+                record(calculator, metrics, result)
+            return result
+        return wrapper
+    return decorate
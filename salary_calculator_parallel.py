@@ -0,0 +1,79 @@
+"""
+工资计算器 - 多进程分片计算
+员工很多时把名单切成分片，交给进程池里的工作进程用列式引擎计算，再按名单顺序合并。
+配置在工作进程启动时传入一次并编译为计算计划，之后每个任务只传员工数据。
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from salary_calculator_columnar import calculate_payroll_columnar
+from salary_calculator_plan import CalculationPlan
+
+# 工作进程内编译好的计算计划
+_worker_plan = None
+
+
+def _init_worker(config):
+    """工作进程初始化：编译一次计算计划"""
+    global _worker_plan
+    _worker_plan = CalculationPlan.compile(config)
+
+
+def _calculate_shard(shard):
+    """在工作进程中计算一个分片"""
+    return calculate_payroll_columnar(_worker_plan, shard)
+
+
+class ParallelPayrollRunner:
+    """多进程分片工资计算
+
+    workers: 工作进程数，默认为 CPU 核数
+    min_parallel_size: 员工数少于该值时直接在当前进程计算
+    shards_per_worker: 每个工作进程分到的分片数，分片越多负载越均衡
+    """
+
+    def __init__(self, workers=None, min_parallel_size=50000, shards_per_worker=2):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_parallel_size = min_parallel_size
+        self.shards_per_worker = shards_per_worker
+        self._executor = None
+        self._config_token = None
+
+    def _get_executor(self, config, config_token):
+        """获取进程池，配置变化后重建（新配置只在工作进程启动时传一次）"""
+        if self._executor is None or self._config_token != config_token:
+            self.shutdown()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(config,)
+            )
+            self._config_token = config_token
+        return self._executor
+
+    def run(self, config, config_token, plan, employees):
+        """计算员工名单，结果与在当前进程中用同一计划计算完全相同
+
+        config_token: 标识配置版本，变化时重建进程池
+        plan: 当前进程中已编译的计算计划（小名单直接使用）
+        """
+        employees = list(employees)
+        if self.workers <= 1 or len(employees) < self.min_parallel_size:
+            return calculate_payroll_columnar(plan, employees)
+
+        shard_count = self.workers * self.shards_per_worker
+        shard_size = math.ceil(len(employees) / shard_count)
+        shards = [employees[i:i + shard_size] for i in range(0, len(employees), shard_size)]
+
+        executor = self._get_executor(config, config_token)
+        parts = list(executor.map(_calculate_shard, shards))
+        return type(parts[0]).concat(parts)
+
+    def shutdown(self):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._config_token = None
@@ -0,0 +1,205 @@
+"""
+工资计算器 - Parquet 导入导出
+员工名单和工资计算结果按列写成 Parquet 文件（每个收入项、扣除项一列，金额为 float64），
+文件元数据记录配置哈希，重新导入时可判断文件是否由当前配置生成。需要安装 pyarrow。
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+from salary_calculator_import import NAME_COLUMNS, SELECTION_COLUMNS, RosterColumnMapping
+
+METADATA_CONFIG_HASH = b"salary_calculator.config_hash"
+METADATA_KIND = b"salary_calculator.kind"
+METADATA_CREATED_AT = b"salary_calculator.created_at"
+KIND_ROSTER = b"roster"
+KIND_PAYROLL = b"payroll"
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("读写 Parquet 文件需要安装 pyarrow: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def _metadata(calculator, kind):
+    return {
+        METADATA_CONFIG_HASH: calculator.get_config_hash().encode("ascii"),
+        METADATA_KIND: kind,
+        METADATA_CREATED_AT: datetime.now().isoformat(timespec="seconds").encode("ascii")
+    }
+
+
+def write_roster(calculator, file, chunk_size=5000):
+    """把员工名单写成 Parquet：员工姓名、每个收入项一列（未填写为空，导入时取默认值）、
+    固定金额扣除项的 deduction_<扣除项> 列、适用扣除项（字符串列表）。返回写入的员工数"""
+    pa, pq = _require_pyarrow()
+    salary_items = list(calculator.config["salary_items"].keys())
+    override_keys = [f"deduction_{name}" for name, item in calculator.config["deduction_items"].items()
+                     if item["type"] == "fixed_amount"]
+    fields = [pa.field(NAME_COLUMNS[0], pa.string())]
+    fields += [pa.field(name, pa.float64()) for name in salary_items + override_keys]
+    fields.append(pa.field(SELECTION_COLUMNS[0], pa.list_(pa.string())))
+    schema = pa.schema(fields, metadata=_metadata(calculator, KIND_ROSTER))
+
+    count = 0
+    with pq.ParquetWriter(file, schema) as writer:
+        for chunk in calculator._iter_employee_chunks(chunk_size):
+            columns = [[name for name, _ in chunk]]
+            salary_datas = [employee_data.get("salary_data", {}) for _, employee_data in chunk]
+            for key in salary_items + override_keys:
+                columns.append([data.get(key) for data in salary_datas])
+            columns.append([employee_data.get("selected_deductions", []) for _, employee_data in chunk])
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def write_payroll(calculator, file, chunk_size=50000):
+    """把工资计算结果写成 Parquet：列名与CSV工资表相同（计算时间记在元数据中），
+    未选中的扣除项为空值。返回写入的员工数"""
+    pa, pq = _require_pyarrow()
+    config = calculator.get_config_snapshot()
+    plan = calculator._plan_for(config)
+    income_items = [item_name for item_name, _ in plan.income_items]
+    header = calculator.get_csv_header()[:-1]  # 去掉“计算时间”列
+    schema = pa.schema([pa.field(header[0], pa.string())] + [pa.field(name, pa.float64()) for name in header[1:]],
+                       metadata=_metadata(calculator, KIND_PAYROLL))
+
+    count = 0
+    with pq.ParquetWriter(file, schema) as writer:
+        for payroll in calculator._iter_payroll_chunks(config, plan, chunk_size):
+            # 直接用 NumPy 列构造 Arrow 数组，不经过文本
+            columns = [pa.array(payroll.names, type=pa.string())]
+            columns += [pa.array(payroll.income[row]) for row in range(len(income_items))]
+            columns += [pa.array(payroll.deductions[row], mask=~payroll.selected[row])
+                        for row in range(len(plan.deduction_order))]
+            columns += [pa.array(payroll.total_income), pa.array(payroll.total_deductions),
+                        pa.array(payroll.net_income)]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            count += len(payroll)
+    return count
+
+
+def _parse_rows(mapping, batch):
+    """逐行解析一批名单（与 CSV 导入相同），返回 ([(批内行号, 记录)], [(批内行号, 姓名, 原因)])"""
+    records = []
+    errors = []
+    columns = [column.to_pylist() for column in batch.columns]
+    for index, values in enumerate(zip(*columns)):
+        try:
+            records.append((index, mapping.parse_row(values)))
+        except ValueError as e:
+            errors.append((index, values[mapping.name_index] or "", str(e)))
+    return records, errors
+
+
+def _is_columnar(pa, mapping, schema):
+    """名单能否按列解析：姓名为字符串列，金额都是数值列，没有工资表的 扣除_ 列"""
+    if mapping.export_deduction_columns or not pa.types.is_string(schema.field(mapping.name_index).type):
+        return False
+    for index, _ in mapping.income_columns + mapping.override_columns:
+        field_type = schema.field(index).type
+        if not (pa.types.is_integer(field_type) or pa.types.is_floating(field_type)):
+            return False
+    return True
+
+
+def _parse_columns(mapping, batch):
+    """按列解析一批名单：金额整列用 NumPy 校验，相同的扣除项选择只解析一次；
+    有问题的行再逐行解析，得到与 CSV 导入相同的错误信息。返回值与 _parse_rows 相同"""
+    count = batch.num_rows
+    names = [name.strip() if name is not None else "" for name in batch.column(mapping.name_index).to_pylist()]
+    invalid = np.fromiter((not name for name in names), dtype=bool, count=count)
+
+    amounts = []  # (薪资数据中的键, 金额列表, 有值的行号列表)
+    for index, key in ([(index, name) for index, name in mapping.income_columns]
+                       + [(index, f"deduction_{name}") for index, name in mapping.override_columns]):
+        column = batch.column(index)
+        present = ~column.is_null().to_numpy(zero_copy_only=False)
+        values = column.to_numpy(zero_copy_only=False).astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            invalid |= present & ~(np.isfinite(values) & (values >= 0))
+        amounts.append((key, values.tolist(), np.flatnonzero(present).tolist()))
+
+    selections = [None] * count
+    if mapping.selection_index is not None:
+        parsed = {}  # 扣除项单元格 → 保存用的扣除项列表，无效时为 None
+        for row, value in enumerate(batch.column(mapping.selection_index).to_pylist()):
+            key = tuple(value) if isinstance(value, list) else value
+            if key not in parsed:
+                try:
+                    parsed[key] = mapping.ordered_selection(mapping.parse_selection(value))
+                except ValueError:
+                    parsed[key] = None
+            selections[row] = parsed[key]
+            if parsed[key] is None:
+                invalid[row] = True
+    else:
+        default = mapping.ordered_selection(None)
+        selections = [default] * count
+
+    salary_datas = [{} for _ in range(count)]
+    for key, values, rows in amounts:
+        for row in rows:
+            salary_datas[row][key] = values[row]
+
+    records = []
+    errors = []
+    bad_rows = set(np.flatnonzero(invalid).tolist())
+    for row in range(count):
+        if row in bad_rows:
+            values = [column[row].as_py() for column in batch.columns]
+            try:
+                records.append((row, mapping.parse_row(values)))
+            except ValueError as e:
+                errors.append((row, values[mapping.name_index] or "", str(e)))
+        else:
+            records.append((row, (names[row], salary_datas[row], list(selections[row]))))
+    return records, errors
+
+
+def import_employees(calculator, source, batch_size=5000):
+    """从 Parquet 名单（或导出的工资结果）批量导入员工
+
+    列的识别规则、校验和行号（表头为第1行）与 CSV 导入相同，返回的报告格式与
+    salary_calculator_import.import_employees 相同，另加 "config_hash"（文件记录的配置哈希）和
+    "config_changed"（与当前配置不同时为 True）。
+    金额为数值列的名单（write_roster 写出的格式）按列解析：不经过文本，整列用 NumPy 校验；
+    其他文件（如导出的工资表、金额为文字的列）逐行解析。
+    """
+    pa, pq = _require_pyarrow()
+    parquet_file = pq.ParquetFile(source)
+    metadata = parquet_file.schema_arrow.metadata or {}
+    config_hash = metadata.get(METADATA_CONFIG_HASH, b"").decode("ascii") or None
+
+    report = {"imported": 0, "failed": 0, "errors": [], "ignored_columns": [],
+              "config_hash": config_hash,
+              "config_changed": config_hash is not None and config_hash != calculator.get_config_hash()}
+    mapping = RosterColumnMapping(parquet_file.schema_arrow.names, calculator.config)
+    report["ignored_columns"] = mapping.unknown_columns
+    if mapping.name_index is None:
+        report["errors"].append({"row": 1, "name": "", "error": f"缺少姓名列（{' / '.join(NAME_COLUMNS)}）"})
+        report["failed"] = 1
+        return report
+
+    columnar = _is_columnar(pa, mapping, parquet_file.schema_arrow)
+    row_number = 1  # 与 CSV 导入相同，表头为第1行
+    for batch in parquet_file.iter_batches(batch_size=batch_size):
+        records, errors = (_parse_columns if columnar else _parse_rows)(mapping, batch)
+        for index, name, reason in errors:
+            report["errors"].append({"row": row_number + 1 + index, "name": name, "error": reason})
+
+        added, failures = calculator.add_employees([record for _, record in records])
+        report["imported"] += added
+        for index, name, reason in failures:
+            report["errors"].append({"row": row_number + 1 + records[index][0], "name": name, "error": reason})
+        row_number += batch.num_rows
+
+    report["errors"].sort(key=lambda error: error["row"])
+    report["failed"] = len(report["errors"])
+    return report
@@ -0,0 +1,205 @@
+"""
+工资计算器 - 按月累计预扣个税
+一个纳税年度内逐月计算工资，个税按累计预扣法预扣：
+    累计应纳税所得额 = 累计收入 - 累计税前扣除 - 每月减除费用 × 本年已发薪月数
+    本月预扣税额 = 累计应纳税所得额按年度税率表计算的税额 - 累计已预扣税额（小于0时为0）
+每个月的结果保存截至该月的累计数据（年度累计快照），下个月只在上个月的快照上累加，
+第12个月与第1个月的计算量相同。
+计算计划按分计算时，年度累计数据也以整数分保存，累计预扣税额按个税的舍入方式舍入到分。
+"""
+
+import numpy as np
+
+from salary_calculator_columnar import ColumnarPayroll, FenColumnarPayroll, calculate_payroll_columnar
+from salary_calculator_fen import FEN_PER_YUAN, FenTaxTable, to_fen
+from salary_calculator_plan import STEP_PROGRESSIVE_TAX
+from salary_calculator_tax import TaxBracketTable
+
+# 配置中年度累计税率表缺失时使用的默认值（综合所得年度税率表）
+DEFAULT_CUMULATIVE_TAX = {
+    "name": "累计预扣法",
+    "threshold": 5000,
+    "brackets": [
+        {"min": 0, "max": 36000, "rate": 0.03, "deduction": 0},
+        {"min": 36000, "max": 144000, "rate": 0.10, "deduction": 2520},
+        {"min": 144000, "max": 300000, "rate": 0.20, "deduction": 16920},
+        {"min": 300000, "max": 420000, "rate": 0.25, "deduction": 31920},
+        {"min": 420000, "max": 660000, "rate": 0.30, "deduction": 52920},
+        {"min": 660000, "max": 960000, "rate": 0.35, "deduction": 85920},
+        {"min": 960000, "max": float('inf'), "rate": 0.45, "deduction": 181920}
+    ]
+}
+
+
+class PeriodError(ValueError):
+    """工资月份无效或缺少上个月的累计数据"""
+
+
+def cumulative_tax_settings(config):
+    """配置中的累计预扣设置（没有时使用默认的年度税率表）"""
+    return config["calculation_methods"].get("cumulative_tax", DEFAULT_CUMULATIVE_TAX)
+
+
+def compile_cumulative_tax_table(config):
+    """编译年度累计税率表"""
+    return TaxBracketTable.compile(cumulative_tax_settings(config)["brackets"])
+
+
+class PayrollPeriod:
+    """一个月的工资计算结果和截至该月的年度累计快照（生成后不再修改）
+
+    payroll: 本月的 ColumnarPayroll，个税列为本月实际预扣的税额
+    年度累计数据按员工保存（包括本月未发薪、但本年之前发过薪的员工），按分计算时单位为分
+    """
+
+    def __init__(self, year, month, payroll, ytd_names, ytd_months, ytd_income, ytd_pre_tax, ytd_tax,
+                 monthly_threshold, fen=False):
+        self.year = year
+        self.month = month
+        self.payroll = payroll
+        self.monthly_threshold = monthly_threshold
+        self.fen = fen
+        self._ytd_names = ytd_names
+        self._ytd_index = {name: row for row, name in enumerate(ytd_names)}
+        self._ytd_months = ytd_months    # 本年已发薪月数
+        self._ytd_income = ytd_income    # 累计收入
+        self._ytd_pre_tax = ytd_pre_tax  # 累计税前扣除
+        self._ytd_tax = ytd_tax          # 累计已预扣税额
+        self._results = None
+
+    @property
+    def headcount(self):
+        return len(self.payroll)
+
+    def ytd_rows(self, names):
+        """员工在累计快照中的行号，没有累计数据的员工为 -1"""
+        index = self._ytd_index
+        return np.fromiter((index.get(name, -1) for name in names), dtype=np.int64, count=len(names))
+
+    def year_to_date(self, name):
+        """员工截至本月的年度累计数据，本年没有发过薪时返回 None"""
+        row = self._ytd_index.get(name)
+        if row is None:
+            return None
+        months = int(self._ytd_months[row])
+        threshold = months * self.monthly_threshold
+        if self.fen:
+            income = int(self._ytd_income[row])
+            pre_tax = int(self._ytd_pre_tax[row])
+            return {
+                "months": months,
+                "income": income / FEN_PER_YUAN,
+                "pre_tax_deductions": pre_tax / FEN_PER_YUAN,
+                "threshold": threshold,
+                "taxable_income": max(0, income - pre_tax - months * to_fen(self.monthly_threshold)) / FEN_PER_YUAN,
+                "tax_withheld": int(self._ytd_tax[row]) / FEN_PER_YUAN
+            }
+        income = float(self._ytd_income[row])
+        pre_tax = float(self._ytd_pre_tax[row])
+        return {
+            "months": months,
+            "income": income,
+            "pre_tax_deductions": pre_tax,
+            "threshold": threshold,
+            "taxable_income": max(0, income - pre_tax - threshold),
+            "tax_withheld": float(self._ytd_tax[row])
+        }
+
+    def totals(self):
+        """本月公司汇总"""
+        return self.payroll.totals()
+
+    def results(self):
+        """{员工: 结果字典}，格式与 calculate_all_employees 相同，另加 "year_to_date" 年度累计数据"""
+        if self._results is None:
+            results = self.payroll.to_results()
+            for name, result in results.items():
+                result["year_to_date"] = self.year_to_date(name)
+            self._results = results
+        return self._results
+
+
+def calculate_period(plan, cumulative_table, monthly_threshold, employees, year, month, previous=None):
+    """计算一个月的工资，个税按累计预扣法在上个月的累计快照上计算
+
+    previous: 同一年上个月的 PayrollPeriod，1月或本年首次计算时为 None
+    """
+    payroll = calculate_payroll_columnar(plan, employees)
+    names = payroll.names
+    count = len(names)
+    fen = plan.fen is not None
+    if fen:
+        # 金额均为整数分
+        dtype = np.int64
+        current_income = payroll.total_income_fen
+        deductions = payroll.deductions_fen.copy()
+        threshold = to_fen(monthly_threshold)
+        tax_array = FenTaxTable.compile(cumulative_table, plan.fen.tax_table.rounding).tax
+    else:
+        dtype = np.float64
+        current_income = payroll.total_income
+        deductions = payroll.deductions.copy()
+        threshold = monthly_threshold
+        tax_array = cumulative_table.tax_array
+
+    # 上个月的累计数据，本年新发薪的员工从0开始（上个月没有员工时与没有上个月相同）
+    if previous is not None and len(previous._ytd_names) > 0:
+        rows = previous.ytd_rows(names)
+        known = rows >= 0
+        months = np.where(known, previous._ytd_months[rows], 0) + 1
+        income = np.where(known, previous._ytd_income[rows], 0).astype(dtype) + current_income
+        previous_pre_tax = np.where(known, previous._ytd_pre_tax[rows], 0).astype(dtype)
+        previous_tax = np.where(known, previous._ytd_tax[rows], 0).astype(dtype)
+    else:
+        months = np.ones(count, dtype=np.int64)
+        income = current_income.copy()
+        previous_pre_tax = np.zeros(count, dtype=dtype)
+        previous_tax = np.zeros(count, dtype=dtype)
+
+    tax_step = next((step for step in plan.steps if step.kind == STEP_PROGRESSIVE_TAX), None)
+    pre_tax_items = tax_step.depends_on if tax_step is not None else tuple(
+        step.name for step in plan.steps if step.pre_tax)
+    deduction_rows = {name: row for row, name in enumerate(payroll.deduction_items)}
+    pre_tax = previous_pre_tax.copy()
+    for name in pre_tax_items:
+        pre_tax += deductions[deduction_rows[name]]
+
+    tax = previous_tax
+    if tax_step is not None:
+        taxable_income = np.maximum(0, income - pre_tax - months * threshold)
+        withheld = np.maximum(0, tax_array(taxable_income) - previous_tax)
+        chosen = payroll.selected[tax_step.index]
+        deductions[tax_step.index] = np.where(chosen, withheld, 0)
+        tax = previous_tax + deductions[tax_step.index]
+
+    if fen:
+        period_payroll = FenColumnarPayroll(
+            names, payroll.income_items, payroll.deduction_items, payroll.income_fen, deductions,
+            payroll.selected, payroll.selections, payroll.total_income_fen, deductions.sum(axis=0)
+        )
+    else:
+        # 合计保持配置顺序，与单月计算相同
+        total_deductions = np.zeros(count, dtype=np.float64)
+        for row in range(len(payroll.deduction_items)):
+            total_deductions += deductions[row]
+        period_payroll = ColumnarPayroll(
+            names, payroll.income_items, payroll.deduction_items, payroll.income, deductions,
+            payroll.selected, payroll.selections, payroll.total_income, total_deductions,
+            payroll.total_income - total_deductions
+        )
+
+    # 本月没有发薪的员工沿用之前的累计数据
+    ytd_names = list(names)
+    if previous is not None:
+        current = set(names)
+        carried = [row for row, name in enumerate(previous._ytd_names) if name not in current]
+        if carried:
+            carried = np.array(carried, dtype=np.int64)
+            ytd_names.extend(previous._ytd_names[row] for row in carried)
+            months = np.concatenate([months, previous._ytd_months[carried]])
+            income = np.concatenate([income, previous._ytd_income[carried]])
+            pre_tax = np.concatenate([pre_tax, previous._ytd_pre_tax[carried]])
+            tax = np.concatenate([tax, previous._ytd_tax[carried]])
+
+    return PayrollPeriod(year, month, period_payroll, ytd_names, months, income, pre_tax, tax, monthly_threshold,
+                         fen)
@@ -0,0 +1,242 @@
+"""
+工资计算器 - 预编译计算计划
+把配置一次性编译成按依赖关系排好序的扣除步骤：百分比扣除依赖其计算基数，
+个税依赖所有税前扣除项（pre_tax），计算时只需顺序执行这些步骤
+"""
+
+from salary_calculator_fen import FEN_PER_YUAN, FenError, FenTables, to_fen, uses_fen
+from salary_calculator_tax import TaxBracketTable
+
+# 旧版配置没有 pre_tax 标记时，沿用原先写死的税前扣除项
+LEGACY_PRE_TAX_ITEMS = ["社保", "公积金"]
+DEFAULT_TAX_THRESHOLD = 5000
+
+STEP_PERCENTAGE = "percentage"
+STEP_FIXED_AMOUNT = "fixed_amount"
+STEP_PROGRESSIVE_TAX = "progressive_tax"
+STEP_ZERO = "zero"
+
+
+class PlanError(ValueError):
+    """配置无法编译为计算计划（如依赖成环、个税项设为税前扣除）"""
+
+
+class PlanStep:
+    """一个扣除项的计算步骤"""
+
+    __slots__ = ("name", "index", "kind", "rate", "base", "amount", "override_key", "pre_tax", "depends_on")
+
+    def __init__(self, name, index, kind, rate=0, base=None, amount=0, override_key=None,
+                 pre_tax=False, depends_on=()):
+        self.name = name                  # 扣除项名称
+        self.index = index                # 在配置中的位置（输出顺序）
+        self.kind = kind
+        self.rate = rate
+        self.base = base                  # 百分比扣除的计算基数（收入项）
+        self.amount = amount              # 固定金额扣除的默认金额；按0计算的步骤为其结果（0 或 0.0）
+        self.override_key = override_key  # 员工自定义金额的键 deduction_<名称>
+        self.pre_tax = pre_tax            # 是否减少应税收入
+        self.depends_on = depends_on      # 必须先算完的扣除项（按配置顺序）
+
+
+def is_pre_tax(name, item_config):
+    """扣除项是否在计税前扣除"""
+    return item_config.get("pre_tax", name in LEGACY_PRE_TAX_ITEMS)
+
+
+class CalculationPlan:
+    """编译后的计算计划"""
+
+    __slots__ = ("income_items", "deduction_order", "steps", "default_deductions", "tax_table", "threshold", "fen",
+                 "warnings")
+
+    def __init__(self, income_items, deduction_order, steps, default_deductions, tax_table, threshold, fen=None,
+                 warnings=()):
+        self.income_items = income_items              # [(收入项, 默认值), ...]，配置顺序
+        self.deduction_order = deduction_order        # 扣除项名称，配置顺序
+        self.steps = steps                            # 按依赖拓扑排序后的 PlanStep
+        self.default_deductions = default_deductions  # 未指定时适用的非可选扣除项
+        self.tax_table = tax_table
+        self.threshold = threshold
+        self.fen = fen                                # 按分计算时的 FenTables，按元计算时为 None
+        self.warnings = warnings                      # 能计算但需要提醒用户的配置问题
+
+    @classmethod
+    def compile(cls, config, tax_table=None):
+        """从配置编译计算计划"""
+        salary_items = config["salary_items"]
+        deduction_items = config["deduction_items"]
+        tax_method = config["calculation_methods"]["progressive_tax"]
+        if tax_table is None:
+            tax_table = TaxBracketTable.compile(tax_method["brackets"])
+
+        pre_tax_items = [name for name, item in deduction_items.items()
+                         if item["type"] != "calculated" and is_pre_tax(name, item)]
+
+        steps = []
+        warnings = []
+        for index, (name, item) in enumerate(deduction_items.items()):
+            if item["type"] == "percentage" and item["base"] not in salary_items:
+                # 与旧版一样把不存在的计算基数按0计算，只提醒不报错，旧配置仍可导入
+                warnings.append(f"扣除项「{name}」的计算基数「{item['base']}」不是已配置的收入项，按0计算")
+                step = PlanStep(name, index, STEP_ZERO, amount=0.0, pre_tax=is_pre_tax(name, item))
+            elif item["type"] == "percentage":
+                step = PlanStep(name, index, STEP_PERCENTAGE, rate=item["rate"], base=item["base"],
+                                pre_tax=is_pre_tax(name, item))
+            elif item["type"] == "fixed_amount":
+                step = PlanStep(name, index, STEP_FIXED_AMOUNT, amount=item.get("amount", 0),
+                                override_key=f"deduction_{name}", pre_tax=is_pre_tax(name, item))
+            elif item["type"] == "calculated" and item.get("method") == "progressive_tax":
+                if item.get("pre_tax", False):
+                    raise PlanError(f"个税项「{name}」不能作为税前扣除")
+                step = PlanStep(name, index, STEP_PROGRESSIVE_TAX, depends_on=tuple(pre_tax_items))
+            else:
+                step = PlanStep(name, index, STEP_ZERO)
+            steps.append(step)
+
+        default_deductions = [name for name, item in deduction_items.items()
+                              if not item.get("optional", False)]
+        threshold = tax_method.get("threshold", DEFAULT_TAX_THRESHOLD)
+
+        fen = None
+        try:
+            if uses_fen(config):
+                fen = FenTables.compile(config, steps, tax_table, threshold)
+        except FenError as e:
+            raise PlanError(str(e))
+
+        return cls(
+            [(name, item["default"]) for name, item in salary_items.items()],
+            list(deduction_items.keys()),
+            _topological_order(steps),
+            default_deductions,
+            tax_table,
+            threshold,
+            fen,
+            tuple(warnings)
+        )
+
+    def evaluate(self, salary_inputs, selected_deductions=None):
+        """按计划计算单个员工的工资，返回与 calculate_salary 相同的结果结构"""
+        if selected_deductions is None:
+            selected_deductions = list(self.default_deductions)
+        if self.fen is not None:
+            return self._evaluate_fen(salary_inputs, selected_deductions)
+
+        # 计算总收入
+        total_income = 0
+        income_breakdown = {}
+        for item_name, default in self.income_items:
+            value = salary_inputs.get(item_name, default)
+            income_breakdown[item_name] = value
+            total_income += value
+
+        # 按依赖顺序计算选中的扣除项
+        amounts = {}
+        for step in self.steps:
+            if step.name not in selected_deductions:
+                continue
+
+            kind = step.kind
+            if kind == STEP_PERCENTAGE:
+                deduction = income_breakdown[step.base] * step.rate
+            elif kind == STEP_FIXED_AMOUNT:
+                deduction = salary_inputs.get(step.override_key, step.amount)
+            elif kind == STEP_PROGRESSIVE_TAX:
+                # 应税收入 = 总收入 - 税前扣除 - 起征点
+                pre_tax_deductions = sum([amounts[name] for name in step.depends_on if name in amounts])
+                taxable_income = total_income - pre_tax_deductions - self.threshold
+                deduction = self.tax_table.tax(max(0, taxable_income))
+            else:
+                deduction = step.amount
+            amounts[step.name] = deduction
+
+        # 输出和合计保持配置顺序
+        deductions = {}
+        total_deductions = 0
+        for item_name in self.deduction_order:
+            if item_name in amounts:
+                deductions[item_name] = amounts[item_name]
+                total_deductions += amounts[item_name]
+
+        return {
+            "total_income": total_income,
+            "income_breakdown": income_breakdown,
+            "deductions": deductions,
+            "total_deductions": total_deductions,
+            "net_income": total_income - total_deductions,
+            "selected_deductions": selected_deductions
+        }
+
+    def _evaluate_fen(self, salary_inputs, selected_deductions):
+        """按分计算单个员工的工资（舍入规则与列式引擎相同），金额换算回元"""
+        fen = self.fen
+        total_income = 0
+        income_breakdown = {}
+        for item_name, default in self.income_items:
+            income_breakdown[item_name] = to_fen(salary_inputs.get(item_name, default))
+            total_income += income_breakdown[item_name]
+
+        amounts = {}
+        for step in self.steps:
+            if step.name not in selected_deductions:
+                continue
+
+            kind = step.kind
+            if kind == STEP_PERCENTAGE:
+                deduction = fen.percentage_one(step.name, income_breakdown[step.base])
+            elif kind == STEP_FIXED_AMOUNT:
+                if step.override_key in salary_inputs:
+                    deduction = to_fen(salary_inputs[step.override_key])
+                else:
+                    deduction = fen.amounts[step.name]
+            elif kind == STEP_PROGRESSIVE_TAX:
+                pre_tax_deductions = sum([amounts[name] for name in step.depends_on if name in amounts])
+                taxable_income = total_income - pre_tax_deductions - fen.threshold
+                deduction = fen.tax_one(max(0, taxable_income))
+            else:
+                deduction = 0
+            amounts[step.name] = deduction
+
+        deductions = {}
+        total_deductions = 0
+        for item_name in self.deduction_order:
+            if item_name in amounts:
+                deductions[item_name] = amounts[item_name] / FEN_PER_YUAN
+                total_deductions += amounts[item_name]
+
+        # 整数分除以100与 to_yuan 的结果相同（都是最接近的 float）
+        return {
+            "total_income": total_income / FEN_PER_YUAN,
+            "income_breakdown": {item_name: value / FEN_PER_YUAN for item_name, value in income_breakdown.items()},
+            "deductions": deductions,
+            "total_deductions": total_deductions / FEN_PER_YUAN,
+            "net_income": (total_income - total_deductions) / FEN_PER_YUAN,
+            "selected_deductions": selected_deductions
+        }
+
+
+def _topological_order(steps):
+    """按依赖关系排序（无依赖关系时保持配置顺序），依赖成环时抛出 PlanError"""
+    by_name = {step.name: step for step in steps}
+    remaining = {step.name: len(step.depends_on) for step in steps}
+    dependents = {step.name: [] for step in steps}
+    for step in steps:
+        for dependency in step.depends_on:
+            dependents[dependency].append(step.name)
+
+    ordered = []
+    ready = [step.name for step in steps if remaining[step.name] == 0]
+    while ready:
+        name = ready.pop(0)
+        ordered.append(by_name[name])
+        for dependent in dependents[name]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+        ready.sort(key=lambda n: by_name[n].index)
+
+    if len(ordered) != len(steps):
+        cyclic = [step.name for step in steps if remaining[step.name] > 0]
+        raise PlanError(f"扣除项之间存在循环依赖: {', '.join(cyclic)}")
+    return ordered
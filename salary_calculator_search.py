@@ -0,0 +1,182 @@
+"""
+工资计算器 - 员工姓名搜索
+按前缀、拼音首字母前缀和子串查找员工，随员工增删增量维护。
+安装了 pypinyin 时用它取拼音首字母（支持多音字和生僻字），
+否则按 GB2312 一级汉字的编码区间推算首字母。
+"""
+
+import bisect
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:
+    lazy_pinyin = None
+
+# GB2312 一级汉字按拼音排序，各首字母的起始编码（区位码减 65536）
+_GB2312_INITIAL_CODES = [
+    -20319, -20283, -19775, -19218, -18710, -18526, -18239, -17922, -17417, -16474, -16212,
+    -15640, -15165, -14922, -14914, -14630, -14149, -14090, -13318, -12838, -12556, -11847, -11055
+]
+_GB2312_INITIALS = "abcdefghjklmnopqrstwxyz"
+_GB2312_LAST_CODE = -10247
+
+# 待合并的新增、删除超过该数量时重建子串搜索用的文本
+COMPACT_THRESHOLD = 1024
+
+
+def _gb2312_initial(char):
+    """GB2312 一级汉字的拼音首字母，无法推算时返回空字符串"""
+    try:
+        encoded = char.encode("gb2312")
+    except UnicodeEncodeError:
+        return ""
+    if len(encoded) != 2:
+        return ""
+    code = encoded[0] * 256 + encoded[1] - 65536
+    if code < _GB2312_INITIAL_CODES[0] or code > _GB2312_LAST_CODE:
+        return ""
+    return _GB2312_INITIALS[bisect.bisect_right(_GB2312_INITIAL_CODES, code) - 1]
+
+
+def name_initials(name):
+    """姓名的拼音首字母（小写），如 张三 → zs；英文字母和数字原样保留"""
+    if lazy_pinyin is not None:
+        letters = lazy_pinyin(name, style=Style.FIRST_LETTER, errors=lambda text: list(text))
+        return "".join(letter.lower() for letter in letters if letter.isascii() and letter.isalnum())
+
+    initials = []
+    for char in name:
+        if char.isascii():
+            if char.isalnum():
+                initials.append(char.lower())
+        else:
+            initials.append(_gb2312_initial(char))
+    return "".join(initials)
+
+
+class EmployeeNameIndex:
+    """员工姓名索引
+
+    前缀查找用有序姓名列表二分，拼音首字母用有序 (首字母, 姓名) 列表二分；
+    子串查找在所有姓名拼成的一段文本中用 str.find 查找，新增的姓名先放在待合并列表中，
+    删除的姓名先记下并在结果中跳过，积累较多时再重建文本。
+    """
+
+    def __init__(self, names=()):
+        self._sorted = sorted(names)
+        self._initials = sorted((name_initials(name), name) for name in self._sorted)
+        self._rebuild_text()
+
+    def _rebuild_text(self):
+        self._text_names = list(self._sorted)
+        self._offsets = []
+        offset = 0
+        for name in self._text_names:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+        self._text = "\n".join(self._text_names)
+        self._pending = []  # 尚未并入文本的新姓名
+        self._removed = set()  # 文本中已删除的姓名
+
+    def _maybe_compact(self):
+        if len(self._pending) + len(self._removed) > COMPACT_THRESHOLD:
+            self._rebuild_text()
+
+    def __len__(self):
+        return len(self._sorted)
+
+    def __contains__(self, name):
+        index = bisect.bisect_left(self._sorted, name)
+        return index < len(self._sorted) and self._sorted[index] == name
+
+    def add(self, name):
+        """添加姓名"""
+        if name in self:
+            return
+        bisect.insort(self._sorted, name)
+        bisect.insort(self._initials, (name_initials(name), name))
+        if name in self._removed:
+            self._removed.discard(name)
+        else:
+            self._pending.append(name)
+            self._maybe_compact()
+
+    def add_many(self, names):
+        """批量添加姓名（数量较多时整体归并，不逐个插入）"""
+        names = [name for name in dict.fromkeys(names) if name not in self]
+        if len(names) <= 64:
+            for name in names:
+                self.add(name)
+            return
+        self._sorted = sorted(self._sorted + names)
+        self._initials = sorted(self._initials + [(name_initials(name), name) for name in names])
+        for name in names:
+            if name in self._removed:
+                self._removed.discard(name)
+            else:
+                self._pending.append(name)
+        self._maybe_compact()
+
+    def remove(self, name):
+        """删除姓名"""
+        if name not in self:
+            return
+        del self._sorted[bisect.bisect_left(self._sorted, name)]
+        initials = name_initials(name)
+        del self._initials[bisect.bisect_left(self._initials, (initials, name))]
+        if name in self._pending:
+            self._pending.remove(name)
+        else:
+            self._removed.add(name)
+            self._maybe_compact()
+
+    def rename(self, old_name, new_name):
+        """姓名修改"""
+        self.remove(old_name)
+        self.add(new_name)
+
+    def search(self, query, limit=20):
+        """查找姓名，依次返回：完全一致、前缀匹配、拼音首字母前缀匹配、包含查询内容的姓名，最多 limit 个"""
+        query = query.strip()
+        if not query:
+            return self._sorted[:limit]
+
+        results = []
+        seen = set()
+
+        def take(name):
+            if name not in seen:
+                seen.add(name)
+                results.append(name)
+            return len(results) >= limit
+
+        # 前缀（包括完全一致，有序列表中排在最前）
+        index = bisect.bisect_left(self._sorted, query)
+        while index < len(self._sorted) and self._sorted[index].startswith(query):
+            if take(self._sorted[index]):
+                return results
+            index += 1
+
+        # 拼音首字母前缀
+        letters = query.lower()
+        if letters.isascii() and letters.isalnum():
+            index = bisect.bisect_left(self._initials, (letters,))
+            while index < len(self._initials) and self._initials[index][0].startswith(letters):
+                if take(self._initials[index][1]):
+                    return results
+                index += 1
+
+        # 子串
+        if "\n" not in query:
+            position = self._text.find(query)
+            while position != -1:
+                row = bisect.bisect_right(self._offsets, position) - 1
+                name = self._text_names[row]
+                if name not in self._removed and take(name):
+                    return results
+                next_offset = self._offsets[row + 1] if row + 1 < len(self._offsets) else len(self._text)
+                position = self._text.find(query, next_offset)
+        for name in self._pending:
+            if query in name and take(name):
+                return results
+        return results
@@ -0,0 +1,568 @@
+"""
+工资计算器 - 员工数据存储
+SalaryCalculator.employees 可以是任意实现了字典接口的存储：
+默认的紧凑内存存储，或多个会话、多台设备共享的 SQLite 文件
+"""
+
+import json
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections.abc import ItemsView, MutableMapping, Sequence
+
+import numpy as np
+
+from salary_calculator_columnar import RosterColumns
+
+
+class _EmployeeRecord:
+    """紧凑员工记录
+
+    收入项和扣除项按存储内的槽位编号（首次出现的顺序）记录：
+    present 为薪资数据中出现的收入项位掩码，其中值等于默认值的不单独保存，
+    overrides 为另存了值的收入项，values 按槽位顺序保存这些值；
+    retyped 为值等于默认值但 int / float 类型不同的收入项（如界面输入的 10000.0 对默认值 10000）。
+    deductions 为扣除项位掩码；扣除项顺序不是槽位顺序（或有未登记、重复的扣除项）时改为保存原列表的元组。
+    extra 保存 deduction_ 自定义金额等其他键。
+    """
+
+    __slots__ = ("id", "name", "present", "overrides", "retyped", "values", "deductions", "extra")
+
+    def __init__(self, employee_id, name):
+        self.id = employee_id
+        self.name = name
+        self.present = 0
+        self.overrides = 0
+        self.retyped = 0
+        self.values = None
+        self.deductions = 0
+        self.extra = None
+
+
+# 删除留下的空位至少达到该数量（且超过在职人数）时才压缩，避免频繁重建
+COMPACT_MIN_HOLES = 1024
+
+
+def _is_number(value):
+    return type(value) in (int, float)
+
+
+class CompactEmployeeRepository(MutableMapping):
+    """紧凑的内存员工存储
+
+    每个员工有固定的整数编号，按编号顺序（添加顺序）遍历，改名不改变编号和顺序；
+    删除员工留下的空位超过在职人数时整体压缩，遍历和批量计算只与在职人数有关。
+    只保存与收入项默认值不同的金额，扣除项选择保存为位掩码。
+    读取时返回新建的员工数据字典，与原来的内存存储内容相同；修改返回的字典不会写回存储。
+    """
+
+    def __init__(self, config=None):
+        self._by_name = {}  # 员工姓名 → 记录
+        self._records = []  # 名单顺序（编号递增）的记录，已删除的为 None，空位较多时压缩
+        self._ids = array("q")  # 与 _records 对应的员工编号，按编号查找时二分查找
+        self._holes = 0  # _records 中已删除的空位数
+        self._next_id = 0
+        self._salary_slots = {}  # 收入项 → 槽位
+        self._salary_names = []
+        self._salary_defaults = []  # 每个槽位省略存储时对应的默认值
+        self._deduction_slots = {}  # 扣除项 → 槽位
+        self._deduction_names = []
+        self._layouts = {}  # (present, overrides, retyped) → 解码用的 (收入项, 是否另存, 默认值) 序列
+        self._selections = {}  # 扣除项位掩码 → 扣除项元组
+        self._revision = 0  # 修改计数，列式读取的缓存据此判断是否过期
+        self._columns = None  # 最近一次的列式读取（名单未变时重复使用）
+        if config is not None:
+            self.sync_config(config)
+
+    def sync_config(self, config):
+        """按配置登记收入项、扣除项槽位；收入项默认值变化时，受影响的员工按新默认值重新编码（金额不变）"""
+        for name in config["deduction_items"]:
+            if name not in self._deduction_slots:
+                self._deduction_slots[name] = len(self._deduction_names)
+                self._deduction_names.append(name)
+                self._revision += 1
+
+        changed_mask = 0
+        new_defaults = {}
+        for name, item in config["salary_items"].items():
+            default = item.get("default", 0)
+            slot = self._salary_slots.get(name)
+            if slot is None:
+                self._salary_slots[name] = len(self._salary_names)
+                self._salary_names.append(name)
+                self._salary_defaults.append(default)
+                self._revision += 1
+            elif default != self._salary_defaults[slot] or type(default) is not type(self._salary_defaults[slot]):
+                changed_mask |= 1 << slot
+                new_defaults[slot] = default
+        if not changed_mask:
+            return
+        self._revision += 1
+
+        affected = [record for record in self._records if record is not None and record.present & changed_mask]
+        decoded = [self._decode_salary(record) for record in affected]
+        for slot, default in new_defaults.items():
+            self._salary_defaults[slot] = default
+        self._layouts.clear()
+        for record, salary_data in zip(affected, decoded):
+            self._encode_salary(record, salary_data)
+
+    def _encode_salary(self, record, salary_data):
+        present = overrides = retyped = 0
+        values = None
+        extra = None
+        slots = self._salary_slots
+        defaults = self._salary_defaults
+        positioned = []
+        for key, value in salary_data.items():
+            slot = slots.get(key)
+            if slot is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+                continue
+            bit = 1 << slot
+            present |= bit
+            default = defaults[slot]
+            if _is_number(value) and _is_number(default) and value == default:
+                if type(value) is not type(default):
+                    retyped |= bit
+            else:
+                overrides |= bit
+                positioned.append((slot, value))
+        if positioned:
+            positioned.sort(key=lambda pair: pair[0])
+            values = tuple(value for _, value in positioned)
+        record.present = present
+        record.overrides = overrides
+        record.retyped = retyped
+        record.values = values
+        record.extra = extra
+
+    def _decode_salary(self, record):
+        key = (record.present, record.overrides, record.retyped)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = []
+            present, overrides, retyped = key
+            slot = 0
+            while present:
+                if present & 1:
+                    bit = 1 << slot
+                    default = self._salary_defaults[slot]
+                    if retyped & bit:
+                        default = float(default) if type(default) is int else int(default)
+                    layout.append((self._salary_names[slot], bool(overrides & bit), default))
+                present >>= 1
+                slot += 1
+            layout = self._layouts[key] = tuple(layout)
+
+        if record.values is None:
+            salary_data = {name: default for name, _, default in layout}
+        else:
+            values = iter(record.values)
+            salary_data = {name: next(values) if stored else default for name, stored, default in layout}
+        if record.extra:
+            salary_data.update(record.extra)
+        return salary_data
+
+    def _encode_selection(self, record, selected_deductions):
+        mask = 0
+        last_slot = -1
+        canonical = True
+        for name in selected_deductions:
+            slot = self._deduction_slots.get(name)
+            if slot is None or slot <= last_slot:
+                # 未登记的扣除项、重复或不是槽位顺序：保存原列表
+                canonical = False
+                break
+            mask |= 1 << slot
+            last_slot = slot
+        record.deductions = mask if canonical else tuple(selected_deductions)
+
+    def _selection_names(self, mask):
+        """扣除项位掩码对应的扣除项元组"""
+        names = self._selections.get(mask)
+        if names is None:
+            names = self._selections[mask] = tuple(
+                name for slot, name in enumerate(self._deduction_names) if mask & (1 << slot))
+        return names
+
+    def _decode_selection(self, record):
+        mask = record.deductions
+        if type(mask) is tuple:
+            return list(mask)
+        return list(self._selection_names(mask))
+
+    def _store(self, record, employee_data):
+        self._encode_salary(record, employee_data.get("salary_data", {}))
+        self._encode_selection(record, employee_data.get("selected_deductions", []))
+
+    def _decode(self, record):
+        return {
+            "salary_data": self._decode_salary(record),
+            "selected_deductions": self._decode_selection(record)
+        }
+
+    def __getitem__(self, name):
+        return self._decode(self._by_name[name])
+
+    def __setitem__(self, name, employee_data):
+        record = self._by_name.get(name)
+        if record is None:
+            record = _EmployeeRecord(self._next_id, name)
+            self._next_id += 1
+            self._records.append(record)
+            self._ids.append(record.id)
+            self._by_name[name] = record
+        self._store(record, employee_data)
+        self._revision += 1
+
+    def __delitem__(self, name):
+        record = self._by_name.pop(name)
+        self._records[self._position(record.id)] = None
+        self._holes += 1
+        if self._holes >= COMPACT_MIN_HOLES and self._holes > len(self._by_name):
+            self._compact()
+        self._revision += 1
+
+    def _position(self, employee_id):
+        """员工编号在 _records 中的位置，编号不存在时返回 None"""
+        position = bisect_left(self._ids, employee_id)
+        if position < len(self._ids) and self._ids[position] == employee_id:
+            return position
+        return None
+
+    def _compact(self):
+        """去掉已删除员工的空位（编号不变）"""
+        self._records = [record for record in self._records if record is not None]
+        self._ids = array("q", [record.id for record in self._records])
+        self._holes = 0
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __len__(self):
+        return len(self._by_name)
+
+    def __iter__(self):
+        return iter([record.name for record in self._records if record is not None])
+
+    def items(self):
+        return _CompactItemsView(self)
+
+    def roster_columns(self):
+        """按列读取整个名单（供列式引擎使用），直接读取槽位和位掩码，不还原员工数据字典；
+        名单和收入项默认值未变时返回上次的结果，已读取的列不再重新读取"""
+        columns = self._columns
+        if columns is None or columns.revision != self._revision:
+            columns = self._columns = _CompactRosterColumns(
+                self, [record for record in self._records if record is not None], self._revision)
+        return columns
+
+    def iter_items(self, batch_size=1000):
+        """按名单顺序遍历 (员工姓名, 员工数据)"""
+        for record in list(self._records):
+            if record is not None:
+                yield record.name, self._decode(record)
+
+    def add_many(self, records):
+        """批量添加员工，records 为 (员工姓名, 员工数据) 序列，返回写入数量"""
+        count = 0
+        for name, employee_data in records:
+            self[name] = employee_data
+            count += 1
+        return count
+
+    def clear(self):
+        self._by_name.clear()
+        self._records = []
+        self._ids = array("q")
+        self._holes = 0
+        self._next_id = 0
+        self._revision += 1
+        self._columns = None
+
+    def employee_id(self, name):
+        """员工的整数编号（改名后不变），员工不存在时抛出 KeyError"""
+        return self._by_name[name].id
+
+    def get_by_id(self, employee_id):
+        """按编号读取 (员工姓名, 员工数据)，编号不存在时抛出 KeyError"""
+        position = self._position(employee_id)
+        record = self._records[position] if position is not None else None
+        if record is None:
+            raise KeyError(employee_id)
+        return record.name, self._decode(record)
+
+    def rename(self, old_name, new_name):
+        """员工改名，编号和名单顺序不变"""
+        if new_name in self._by_name:
+            raise ValueError(f"员工姓名已存在: {new_name}")
+        record = self._by_name.pop(old_name)
+        record.name = new_name
+        self._by_name[new_name] = record
+        self._revision += 1
+
+    def change_token(self):
+        """外部修改标记：内存存储只会被本进程修改，始终为 None"""
+        return None
+
+
+class _CompactSelections(Sequence):
+    """每个员工的扣除项选择列表，读取时才由扣除项元组生成（列式结果大多只用于汇总，不读取）"""
+
+    __slots__ = ("_choices", "_choice_ids")
+
+    def __init__(self, choices, choice_ids):
+        self._choices = choices
+        self._choice_ids = choice_ids
+
+    def __len__(self):
+        return len(self._choice_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [list(self._choices[choice]) for choice in self._choice_ids[index]]
+        return list(self._choices[self._choice_ids[index]])
+
+
+class _CompactRosterColumns(RosterColumns):
+    """紧凑存储的列式读取：相同位掩码的员工只计算一次取值方式，
+    只有另存了金额的员工逐个取值；读取过的列（及换算为分的列）按 (键, 默认值) 缓存，只读"""
+
+    def __init__(self, repository, records, revision):
+        self._repository = repository
+        self._records = records
+        self.revision = revision  # 读取时存储的修改计数
+        self.names = [record.name for record in records]
+        # 收入项位掩码相同的员工共用一种取值方式
+        layouts = {}
+        self._layout_ids = np.fromiter(
+            (layouts.setdefault((record.present, record.overrides), len(layouts)) for record in records),
+            dtype=np.intp, count=len(records))
+        self._layouts = list(layouts)
+        # 扣除项选择相同的员工共用一个结果（保存原列表的为元组）
+        choices = {}
+        choice_ids = [choices.setdefault(record.deductions, len(choices)) for record in records]
+        self._choice_ids = np.array(choice_ids, dtype=np.intp)
+        self._choices = list(choices)
+        self._extra_rows = [row for row, record in enumerate(records) if record.extra]
+        self.selections = _CompactSelections(
+            [choice if type(choice) is tuple else repository._selection_names(choice) for choice in self._choices],
+            choice_ids)
+        self._values = {}
+        self._fen_values = {}
+        self._chosen = {}
+
+    def values(self, key, default):
+        cache_key = (key, default)
+        column = self._values.get(cache_key)
+        if column is None:
+            column = self._values[cache_key] = self._read_values(key, default)
+            column.flags.writeable = False
+        return column
+
+    def fen_values(self, key, default):
+        cache_key = (key, default)
+        column = self._fen_values.get(cache_key)
+        if column is None:
+            column = self._fen_values[cache_key] = super().fen_values(key, default)
+            column.flags.writeable = False
+        return column
+
+    def _read_values(self, key, default):
+        count = len(self._records)
+        records = self._records
+        slot = self._repository._salary_slots.get(key)
+        if slot is None:
+            column = np.full(count, default, dtype=np.float64)
+        else:
+            bit = 1 << slot
+            lower = bit - 1
+            stored_default = self._repository._salary_defaults[slot]
+            constants = np.empty(len(self._layouts), dtype=np.float64)
+            ranks = np.full(len(self._layouts), -1, dtype=np.intp)
+            for index, (present, overrides) in enumerate(self._layouts):
+                if not present & bit:
+                    constants[index] = default
+                elif not overrides & bit:
+                    constants[index] = stored_default
+                else:
+                    # 另存的值按槽位顺序排列，下标为更低槽位中另存的个数
+                    ranks[index] = bin(overrides & lower).count("1")
+            column = constants[self._layout_ids]
+            row_ranks = ranks[self._layout_ids]
+            rows = np.flatnonzero(row_ranks >= 0)
+            if len(rows):
+                column[rows] = np.fromiter(
+                    (records[row].values[rank] for row, rank in zip(rows.tolist(), row_ranks[rows].tolist())),
+                    dtype=np.float64, count=len(rows))
+        # deduction_ 自定义金额等其他键，以及收入项登记前写入的值，保存在 extra 中
+        for row in self._extra_rows:
+            extra = records[row].extra
+            if key in extra:
+                column[row] = extra[key]
+        return column
+
+    def chosen(self, deduction):
+        column = self._chosen.get(deduction)
+        if column is None:
+            slot = self._repository._deduction_slots.get(deduction)
+            bit = 0 if slot is None else 1 << slot
+            table = np.fromiter(
+                ((deduction in choice) if type(choice) is tuple else bool(choice & bit) for choice in self._choices),
+                dtype=bool, count=len(self._choices))
+            column = self._chosen[deduction] = table[self._choice_ids]
+            column.flags.writeable = False
+        return column
+
+
+class _CompactItemsView(ItemsView):
+    """紧凑存储的 items() 视图：列式引擎通过 roster_columns() 直接按列读取"""
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+    def roster_columns(self):
+        return self._mapping.roster_columns()
+
+
+class _StreamingItemsView(ItemsView):
+    """items() 视图：遍历时分批从数据库读取，不一次性载入全部员工"""
+
+    def __iter__(self):
+        return self._mapping.iter_items()
+
+
+class SQLiteEmployeeRepository(MutableMapping):
+    """SQLite 员工存储
+
+    按姓名建唯一索引，WAL 模式允许多个读者与一个写者并发，
+    批量写入在单个事务中完成。名单顺序为首次添加的顺序。
+    """
+
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS employees (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL UNIQUE,
+                        salary_data TEXT NOT NULL,
+                        selected_deductions TEXT NOT NULL
+                    )
+                """)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _encode(employee_data):
+        return (
+            json.dumps(employee_data.get("salary_data", {}), ensure_ascii=False),
+            json.dumps(employee_data.get("selected_deductions", []), ensure_ascii=False)
+        )
+
+    @staticmethod
+    def _decode(salary_data, selected_deductions):
+        return {
+            "salary_data": json.loads(salary_data),
+            "selected_deductions": json.loads(selected_deductions)
+        }
+
+    def __getitem__(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT salary_data, selected_deductions FROM employees WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return self._decode(*row)
+
+    def __setitem__(self, name, employee_data):
+        salary_data, selected_deductions = self._encode(employee_data)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO employees (name, salary_data, selected_deductions) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET salary_data = excluded.salary_data, "
+                "selected_deductions = excluded.selected_deductions",
+                (name, salary_data, selected_deductions)
+            )
+
+    def __delitem__(self, name):
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM employees WHERE name = ?", (name,))
+        if cursor.rowcount == 0:
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM employees WHERE name = ?", (name,)).fetchone()
+        return row is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM employees").fetchone()[0]
+
+    def __iter__(self):
+        with self._lock:
+            names = [row[0] for row in self._conn.execute("SELECT name FROM employees ORDER BY id")]
+        return iter(names)
+
+    def items(self):
+        return _StreamingItemsView(self)
+
+    def iter_items(self, batch_size=None):
+        """按名单顺序分批读取 (员工姓名, 员工数据)"""
+        batch_size = batch_size or self.batch_size
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, name, salary_data, selected_deductions FROM employees "
+                    "WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row_id, name, salary_data, selected_deductions in rows:
+                yield name, self._decode(salary_data, selected_deductions)
+            last_id = rows[-1][0]
+
+    def add_many(self, records):
+        """在一个事务中批量添加员工，records 为 (员工姓名, 员工数据) 序列，返回写入数量"""
+        rows = [(name,) + self._encode(employee_data) for name, employee_data in records]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO employees (name, salary_data, selected_deductions) VALUES (?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM employees")
+
+    def rename(self, old_name, new_name):
+        """员工改名，编号和名单顺序不变"""
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM employees WHERE name = ?", (new_name,)).fetchone():
+                raise ValueError(f"员工姓名已存在: {new_name}")
+            cursor = self._conn.execute("UPDATE employees SET name = ? WHERE name = ?", (new_name, old_name))
+        if cursor.rowcount == 0:
+            raise KeyError(old_name)
+
+    def change_token(self):
+        """外部修改标记：其他连接提交写入后 PRAGMA data_version 会变化"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
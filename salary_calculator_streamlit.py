@@ -1,11 +1,148 @@
 import streamlit as st
 import pandas as pd
 import json
+import io
+import os
+import importlib.util
 from datetime import datetime
-import plotly.express as px
-import plotly.graph_objects as go
 import streamlit.components.v1 as components
+from salary_calculator_charts import CHART_DETAIL_LIMIT, summarize_payroll
 from salary_calculator_core import SalaryCalculator
+from salary_calculator_import import get_import_template
+from salary_calculator_plan import CalculationPlan, is_pre_tax
+from salary_calculator_storage import SQLiteEmployeeRepository
+
+# 员工数据保存在 SQLite 文件中，局域网内的所有会话共享同一份名单；设为 :memory: 时仅保存在当前会话
+EMPLOYEE_DB_PATH = os.environ.get("SALARY_CALCULATOR_DB", "employees.db")
+# 员工列表分页
+EMPLOYEE_PAGE_SIZES = [10, 20, 50, 100]
+EMPLOYEE_SORT_OPTIONS = {"名单顺序": "roster", "姓名": "name", "税后收入": "net_income"}
+# 员工搜索最多列出的匹配数
+EMPLOYEE_SEARCH_LIMIT = 20
+# 进程内最多保留多少份不同配置编译好的计算计划
+SHARED_PLAN_ENTRIES = 32
+# 进程内最多保留多少组不同工资结果的汇总图表
+SUMMARY_FIGURE_ENTRIES = 16
+
+@st.cache_resource(max_entries=SHARED_PLAN_ENTRIES, show_spinner=False)
+def get_shared_plan(config_hash, _config):
+    """按配置哈希编译计算计划（含税率表），同一进程内配置相同的会话共用一份"""
+    return CalculationPlan.compile(_config)
+
+@st.cache_resource(max_entries=SUMMARY_FIGURE_ENTRIES, show_spinner=False)
+def build_summary_figures(result_hash, _payroll_run):
+    """按工资结果哈希生成汇总图表，结果相同时所有会话直接复用（图表只读，显示时由 Streamlit 复制）
+
+    员工不超过 CHART_DETAIL_LIMIT 人时逐人显示；更多时显示税后收入分布、各税率档次汇总、
+    税后收入排行和抽样散点（WebGL），图表大小与人数无关。
+    """
+    # plotly 较大，只在第一次生成图表时导入
+    import plotly.express as px
+    import plotly.graph_objects as go
+    
+    if _payroll_run.headcount <= CHART_DETAIL_LIMIT:
+        chart_data = _payroll_run.chart_data()
+        employees = chart_data["employees"]
+        
+        # 员工税后收入对比
+        fig_bar = px.bar(
+            x=employees,
+            y=chart_data["net_incomes"],
+            title="员工税后收入对比",
+            labels={'x': '员工', 'y': '税后收入 (¥)'}
+        )
+        fig_bar.update_traces(marker_color='lightblue')
+        
+        # 总收入vs总扣除
+        fig_comparison = go.Figure()
+        fig_comparison.add_trace(go.Bar(
+            name='总收入',
+            x=employees,
+            y=chart_data["total_incomes"],
+            marker_color='lightgreen'
+        ))
+        fig_comparison.add_trace(go.Bar(
+            name='总扣除',
+            x=employees,
+            y=chart_data["total_deductions"],
+            marker_color='lightcoral'
+        ))
+        fig_comparison.update_layout(
+            title='收入与扣除对比',
+            barmode='group',
+            xaxis_title='员工',
+            yaxis_title='金额 (¥)'
+        )
+        return [fig_bar, fig_comparison]
+    
+    summary = summarize_payroll(_payroll_run)
+    
+    # 税后收入分布（只传各组人数，不传每个员工的金额）
+    histogram = summary["histogram"]
+    fig_histogram = go.Figure(go.Bar(
+        x=(histogram["lower"] + histogram["upper"]) / 2,
+        y=histogram["counts"],
+        width=histogram["upper"] - histogram["lower"],
+        customdata=list(zip(histogram["lower"], histogram["upper"])),
+        hovertemplate="¥%{customdata[0]:,.0f} - ¥%{customdata[1]:,.0f}<br>%{y} 人<extra></extra>",
+        marker_color='lightblue'
+    ))
+    fig_histogram.update_layout(title="税后收入分布", xaxis_title="税后收入 (¥)", yaxis_title="人数", bargap=0)
+    
+    # 各税率档次的收入与扣除
+    brackets = summary["brackets"]
+    labels = [row["档次"] for row in brackets]
+    fig_brackets = go.Figure()
+    fig_brackets.add_trace(go.Bar(
+        name='总收入',
+        x=labels,
+        y=[row["总收入"] for row in brackets],
+        customdata=[row["人数"] for row in brackets],
+        hovertemplate="%{x}<br>%{customdata} 人<br>¥%{y:,.2f}<extra>总收入</extra>",
+        marker_color='lightgreen'
+    ))
+    fig_brackets.add_trace(go.Bar(
+        name='总扣除',
+        x=labels,
+        y=[row["总扣除"] for row in brackets],
+        customdata=[row["人数"] for row in brackets],
+        hovertemplate="%{x}<br>%{customdata} 人<br>¥%{y:,.2f}<extra>总扣除</extra>",
+        marker_color='lightcoral'
+    ))
+    fig_brackets.update_layout(title='各税率档次收入与扣除', barmode='group',
+                               xaxis_title='个税档次', yaxis_title='金额 (¥)')
+    
+    # 税后收入排行
+    top_names = [name for name, _ in summary["top_earners"]]
+    fig_top = go.Figure(go.Bar(
+        x=[net_income for _, net_income in summary["top_earners"]],
+        y=top_names,
+        orientation='h',
+        marker_color='lightblue'
+    ))
+    fig_top.update_layout(title=f"税后收入前 {len(top_names)} 名", xaxis_title="税后收入 (¥)",
+                          yaxis={"autorange": "reversed"})
+    
+    # 总收入与税后收入散点（WebGL 绘制，员工过多时抽样）
+    sample = summary["sample"]
+    fig_scatter = go.Figure(go.Scattergl(
+        x=sample["total_incomes"],
+        y=sample["net_incomes"],
+        text=sample["employees"],
+        mode='markers',
+        marker={"size": 4, "opacity": 0.6},
+        hovertemplate="%{text}<br>总收入 ¥%{x:,.2f}<br>税后收入 ¥%{y:,.2f}<extra></extra>"
+    ))
+    sample_note = "" if len(sample["employees"]) == summary["headcount"] else f"（抽样 {len(sample['employees'])} 人）"
+    fig_scatter.update_layout(title=f"总收入与税后收入{sample_note}", xaxis_title="总收入 (¥)",
+                              yaxis_title="税后收入 (¥)")
+    return [fig_histogram, fig_brackets, fig_top, fig_scatter]
+
+@st.cache_resource(show_spinner=False)
+def load_calculator_html():
+    """读取计算器组件的HTML（每个进程只读一次文件）"""
+    with open("calculator_component.html", "r", encoding="utf-8") as f:
+        return f.read()
 
 class Calculator:
     """iPhone风格HTML计算器组件"""
@@ -18,8 +155,7 @@ class Calculator:
         
         # 读取HTML文件
         try:
-            with open("calculator_component.html", "r", encoding="utf-8") as f:
-                html_content = f.read()
+            html_content = load_calculator_html()
             
             # 使用streamlit组件显示HTML计算器
             components.html(html_content, height=800, scrolling=False)
@@ -62,7 +198,12 @@ class Calculator:
 class StreamlitSalaryCalculator:
     def __init__(self):
         if 'calculator' not in st.session_state:
-            st.session_state.calculator = SalaryCalculator()
+            employee_store = None
+            if EMPLOYEE_DB_PATH != ":memory:":
+                employee_store = SQLiteEmployeeRepository(EMPLOYEE_DB_PATH)
+            # 计算计划和税率表按配置在所有会话间共享，会话里只保留配置和自己的缓存
+            st.session_state.calculator = SalaryCalculator(employee_store=employee_store,
+                                                           plan_provider=get_shared_plan)
         if 'selected_employee' not in st.session_state:
             st.session_state.selected_employee = None
         if 'show_batch_analysis' not in st.session_state:
@@ -180,9 +321,24 @@ class StreamlitSalaryCalculator:
             success, message = self.calculator.reset_config()
             st.sidebar.success(message)
             st.rerun()
+        
+        # 计算结果缓存统计
+        with st.sidebar.expander("🧠 计算缓存统计"):
+            stats = self.calculator.get_cache_stats()
+            st.write(f"命中: {stats['hits']} | 未命中: {stats['misses']} | 淘汰: {stats['evictions']}")
+            st.write(f"缓存条目: {stats['size']} / {stats['maxsize']}")
     
     def employee_salary_management_tab(self):
         """员工工资管理标签页"""
+        # 税率表或扣除项配置无效时无法计算（详细信息和批量分析页面也一样），先提示修正
+        valid, message = self.calculator.validate_config()
+        if not valid:
+            st.subheader("👥 员工工资管理")
+            st.error(f"❌ {message}")
+            st.info("💡 请先在「📊 扣除项配置」或「📋 税率表管理」中修正配置")
+            return
+        self.show_config_warnings()
+        
         # 检查是否有选中的员工进行详细查看
         if st.session_state.selected_employee:
             self.employee_detail_view()
@@ -200,27 +356,30 @@ class StreamlitSalaryCalculator:
         
         with col1:
             st.write("**🔧 员工操作**")
-            operation = st.selectbox("选择操作", ["添加新员工", "编辑现有员工", "删除员工", "临时计算（不保存）"])
+            operation = st.selectbox("选择操作", ["添加新员工", "批量导入员工", "编辑现有员工", "删除员工", "临时计算（不保存）"])
             
-            employees = list(self.calculator.get_employees().keys())
+            has_employees = len(self.calculator.get_employees()) > 0
             
             if operation == "添加新员工":
                 self.add_employee_form()
                 
+            elif operation == "批量导入员工":
+                self.bulk_import_form()
+                
             elif operation == "编辑现有员工":
-                if employees:
+                if has_employees:
                     st.write("**✏️ 选择要编辑的员工**")
-                    selected_employee = st.selectbox("选择员工", employees, key="edit_employee_select")
+                    selected_employee = self.employee_search_select("选择员工", "edit_employee")
                     if selected_employee:
                         self.edit_employee_form(selected_employee)
                 else:
                     st.info("暂无员工，请先添加员工")
                     
             elif operation == "删除员工":
-                if employees:
+                if has_employees:
                     st.write("**🗑️ 删除员工**")
-                    delete_employee = st.selectbox("选择要删除的员工", employees, key="delete_employee_select")
-                    if st.button("🗑️ 确认删除", type="secondary", key="confirm_delete"):
+                    delete_employee = self.employee_search_select("选择要删除的员工", "delete_employee")
+                    if delete_employee and st.button("🗑️ 确认删除", type="secondary", key="confirm_delete"):
                         success = self.calculator.delete_employee(delete_employee)
                         if success:
                             st.success(f"✅ 成功删除员工: {delete_employee}")
@@ -237,6 +396,15 @@ class StreamlitSalaryCalculator:
             # 员工列表和批量操作
             self.display_employee_list_with_calculator()
     
+    def employee_search_select(self, label, key):
+        """姓名搜索框 + 匹配结果选择框，只列出最匹配的员工"""
+        query = st.text_input("🔍 搜索员工（姓名、拼音首字母或包含的文字）", key=f"{key}_search")
+        matches = self.calculator.search_employees(query, limit=EMPLOYEE_SEARCH_LIMIT)
+        if not matches:
+            st.info("没有找到匹配的员工")
+            return None
+        return st.selectbox(label, matches, key=f"{key}_select")
+    
     def temporary_calculation_form(self):
         """临时计算表单（不保存到员工列表）"""
         st.write("**💵 临时工资计算**")
@@ -395,6 +563,57 @@ class StreamlitSalaryCalculator:
                 else:
                     st.error("❌ 员工姓名不能为空")
     
+    def bulk_import_form(self):
+        """批量导入员工表单"""
+        st.write("**📥 批量导入员工**")
+        st.info("💡 支持 CSV / Excel / Parquet 文件：第一行为表头，需包含「员工姓名」列，其余列按收入项名称对应；"
+                "「适用扣除项」用顿号分隔，留空则使用默认扣除项。也可以直接导入本系统导出的工资表。")
+        
+        st.download_button(
+            label="📄 下载导入模板",
+            data=get_import_template(self.calculator.config).encode('utf-8-sig'),
+            file_name="员工导入模板.csv",
+            mime="text/csv"
+        )
+        
+        uploaded_file = st.file_uploader("选择员工名单文件", type=['csv', 'xlsx', 'parquet'], key="bulk_import_file")
+        if uploaded_file is not None and st.button("📥 开始导入", type="primary", use_container_width=True):
+            file_name = uploaded_file.name.lower()
+            if file_name.endswith(".xlsx"):
+                file_type = "xlsx"
+            elif file_name.endswith(".parquet"):
+                file_type = "parquet"
+            else:
+                file_type = "csv"
+            source = uploaded_file
+            if file_type == "csv":
+                # Excel 另存的 CSV 常为 GBK 编码
+                content = uploaded_file.getvalue()
+                try:
+                    source = content.decode('utf-8-sig')
+                except UnicodeDecodeError:
+                    source = content.decode('gbk', errors='replace')
+                source = io.StringIO(source)
+            
+            try:
+                with st.spinner("正在导入..."):
+                    report = self.calculator.import_employees(source, file_type=file_type)
+            except Exception as e:
+                st.error(f"❌ 导入失败: {str(e)}")
+                return
+            
+            if report["imported"]:
+                st.success(f"✅ 成功导入 {report['imported']} 名员工")
+            if report.get("config_changed"):
+                st.warning("⚠️ 该文件是在不同的工资配置下导出的，请核对收入项和扣除项")
+            if report["ignored_columns"]:
+                st.warning(f"⚠️ 以下列无法识别，已忽略: {', '.join(report['ignored_columns'])}")
+            if report["errors"]:
+                st.error(f"❌ {report['failed']} 行导入失败")
+                errors_df = pd.DataFrame(report["errors"]).rename(
+                    columns={"row": "行号", "name": "员工姓名", "error": "失败原因"})
+                st.dataframe(errors_df, use_container_width=True)
+    
     def edit_employee_form(self, employee_name):
         """编辑员工表单"""
         existing_salary_data = self.calculator.get_employee_salary(employee_name)
@@ -495,19 +714,38 @@ class StreamlitSalaryCalculator:
             
             st.markdown("---")
             
-            # 员工卡片列表
+            # 员工卡片列表（分页，只计算和显示当前页）
             st.write("**点击员工查看详情:**")
-            for emp_name in employees_data.keys():
-                salary_data = self.calculator.get_employee_salary(emp_name)
-                selected_deductions = self.calculator.get_employee_deductions(emp_name)
-                summary, _ = self.calculator.get_calculation_summary(salary_data, selected_deductions)
-                
-                if st.button(f"👤 {emp_name} - {summary['税后收入']}", 
+            col_sort, col_order, col_size = st.columns([2, 1, 1])
+            with col_sort:
+                sort_label = st.selectbox("排序", list(EMPLOYEE_SORT_OPTIONS.keys()), key="employee_list_sort")
+            with col_order:
+                descending = st.checkbox("倒序", key="employee_list_descending")
+            with col_size:
+                page_size = st.selectbox("每页人数", EMPLOYEE_PAGE_SIZES, index=1, key="employee_list_page_size")
+            
+            page = st.session_state.get("employee_list_page", 1)
+            employee_page = self.calculator.get_employee_page(
+                page, page_size, EMPLOYEE_SORT_OPTIONS[sort_label], descending)
+            
+            for emp_name, result in employee_page["employees"]:
+                if st.button(f"👤 {emp_name} - ¥{result['net_income']:,.2f}", 
                            key=f"view_emp_{emp_name}",
                            use_container_width=True):
                     st.session_state.selected_employee = emp_name
                     st.rerun()
             
+            if employee_page["page_count"] > 1:
+                # 删除员工或调大每页人数后页数可能变少，页码随之修正
+                st.session_state.employee_list_page = employee_page["page"]
+                st.number_input(
+                    f"页码（共 {employee_page['page_count']} 页，{employee_page['total']} 名员工）",
+                    min_value=1,
+                    max_value=employee_page["page_count"],
+                    step=1,
+                    key="employee_list_page"
+                )
+            
             st.markdown("---")
             
             # 添加计算器组件
@@ -519,57 +757,20 @@ class StreamlitSalaryCalculator:
             # 即使没有员工也显示计算器
             st.session_state.calc_component.render()
     
-    def display_summary_charts(self, all_results):
+    def display_summary_charts(self, payroll_run):
         """显示汇总图表"""
         st.subheader("📈 员工工资汇总分析")
         
-        # 准备数据
-        employees = []
-        total_incomes = []
-        total_deductions = []
-        net_incomes = []
-        
-        for emp_name, result in all_results.items():
-            employees.append(emp_name)
-            total_incomes.append(result['total_income'])
-            total_deductions.append(result['total_deductions'])
-            net_incomes.append(result['net_income'])
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # 员工税后收入对比
-            fig_bar = px.bar(
-                x=employees,
-                y=net_incomes,
-                title="员工税后收入对比",
-                labels={'x': '员工', 'y': '税后收入 (¥)'}
-            )
-            fig_bar.update_traces(marker_color='lightblue')
-            st.plotly_chart(fig_bar, use_container_width=True)
+        # 图表按工资结果哈希缓存，名单和配置未变时不重新生成
+        figures = build_summary_figures(payroll_run.result_hash(), payroll_run)
+        if payroll_run.headcount > CHART_DETAIL_LIMIT:
+            st.caption(f"共 {payroll_run.headcount} 名员工，超过 {CHART_DETAIL_LIMIT} 人时按分布和税率档次汇总显示")
         
-        with col2:
-            # 总收入vs总扣除
-            fig_comparison = go.Figure()
-            fig_comparison.add_trace(go.Bar(
-                name='总收入',
-                x=employees,
-                y=total_incomes,
-                marker_color='lightgreen'
-            ))
-            fig_comparison.add_trace(go.Bar(
-                name='总扣除',
-                x=employees,
-                y=total_deductions,
-                marker_color='lightcoral'
-            ))
-            fig_comparison.update_layout(
-                title='收入与扣除对比',
-                barmode='group',
-                xaxis_title='员工',
-                yaxis_title='金额 (¥)'
-            )
-            st.plotly_chart(fig_comparison, use_container_width=True)
+        for row in range(0, len(figures), 2):
+            columns = st.columns(2)
+            for column, figure in zip(columns, figures[row:row + 2]):
+                with column:
+                    st.plotly_chart(figure, use_container_width=True)
     
     def batch_analysis_view(self):
         """批量分析页面"""
@@ -585,55 +786,73 @@ class StreamlitSalaryCalculator:
             st.error("暂无员工数据，请先添加员工")
             return
         
-        # 计算所有员工工资
-        all_results = self.calculator.calculate_all_employees()
+        # 工资计算快照：名单和配置未变时直接复用
+        payroll_run = self.calculator.get_payroll_run()
         
         # 创建汇总表格
         st.write("### 📋 工资汇总表")
-        summary_data = []
-        for emp_name, result in all_results.items():
-            summary_data.append({
-                "员工姓名": emp_name,
-                "总收入": f"¥{result['total_income']:,.2f}",
-                "总扣除": f"¥{result['total_deductions']:,.2f}",
-                "税后收入": f"¥{result['net_income']:,.2f}"
-            })
-        
-        summary_df = pd.DataFrame(summary_data)
+        summary_df = pd.DataFrame(payroll_run.summary_rows())
         st.dataframe(summary_df, use_container_width=True)
         
-        # CSV导出按钮
-        csv_content = self.calculator.export_employees_to_csv()
-        if csv_content:
+        # CSV导出按钮（点击后才生成导出内容，之后随快照复用）
+        if not payroll_run.has_csv_content():
+            if st.button("📄 生成详细CSV工资表", use_container_width=True):
+                payroll_run.csv_content()
+        if payroll_run.has_csv_content():
             st.download_button(
                 label="📥 下载详细CSV工资表",
-                data=csv_content.encode('utf-8-sig'),
-                file_name=f"员工工资表_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+                data=payroll_run.csv_content().encode('utf-8-sig'),
+                file_name=f"员工工资表_{payroll_run.computed_at.strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 use_container_width=True,
                 type="primary"
             )
+        if importlib.util.find_spec("pyarrow") is not None and st.button("📦 生成 Parquet 工资表", use_container_width=True):
+            output = io.BytesIO()
+            success, message = self.calculator.export_employees_to_parquet(output)
+            if success:
+                st.download_button(
+                    label="📥 下载 Parquet 工资表",
+                    data=output.getvalue(),
+                    file_name=f"员工工资表_{payroll_run.computed_at.strftime('%Y%m%d_%H%M%S')}.parquet",
+                    mime="application/octet-stream",
+                    use_container_width=True
+                )
+            else:
+                st.error(message)
+        if importlib.util.find_spec("pyarrow") is not None and st.button("📦 生成 Parquet 员工名单", use_container_width=True):
+            # 名单（薪资数据和扣除项选择）可在“批量导入员工”中重新导入
+            output = io.BytesIO()
+            success, message = self.calculator.export_roster_to_parquet(output)
+            if success:
+                st.download_button(
+                    label="📥 下载 Parquet 员工名单",
+                    data=output.getvalue(),
+                    file_name=f"员工名单_{payroll_run.computed_at.strftime('%Y%m%d_%H%M%S')}.parquet",
+                    mime="application/octet-stream",
+                    use_container_width=True
+                )
+            else:
+                st.error(message)
         
         st.markdown("---")
         
         # 显示汇总图表
-        self.display_summary_charts(all_results)
+        self.display_summary_charts(payroll_run)
         
         # 显示统计信息
         st.write("### 📈 统计信息")
-        total_company_income = sum(result['total_income'] for result in all_results.values())
-        total_company_deductions = sum(result['total_deductions'] for result in all_results.values())
-        total_company_net = sum(result['net_income'] for result in all_results.values())
+        totals = payroll_run.totals
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            st.metric("员工总数", len(all_results))
+            st.metric("员工总数", totals['headcount'])
         with col2:
-            st.metric("公司总支出（总收入）", f"¥{total_company_income:,.2f}")
+            st.metric("公司总支出（总收入）", f"¥{totals['total_income']:,.2f}")
         with col3:
-            st.metric("总扣除金额", f"¥{total_company_deductions:,.2f}")
+            st.metric("总扣除金额", f"¥{totals['total_deductions']:,.2f}")
         with col4:
-            st.metric("实际发放总额", f"¥{total_company_net:,.2f}")
+            st.metric("实际发放总额", f"¥{totals['net_income']:,.2f}")
     
     def employee_detail_view(self):
         """员工详细查看页面"""
@@ -705,6 +924,8 @@ class StreamlitSalaryCalculator:
         
         if show_charts:
             # 可视化图表
+            import plotly.express as px
+            
             st.subheader("📈 收支分析")
             
             col_chart1, col_chart2 = st.columns(2)
@@ -783,6 +1004,9 @@ class StreamlitSalaryCalculator:
                         st.rerun()
                     else:
                         st.error("删除失败")
+                dependents = self.calculator.get_salary_item_dependents(delete_item)
+                if dependents:
+                    st.caption(f"⚠️ 扣除项 {', '.join(dependents)} 以该项为计算基数，删除后将按0计算")
         
         with col2:
             st.subheader("📋 当前收入项配置")
@@ -804,8 +1028,14 @@ class StreamlitSalaryCalculator:
             else:
                 st.info("暂无收入项配置")
     
+    def show_config_warnings(self):
+        """显示能计算但需要用户注意的配置问题"""
+        for warning in self.calculator.get_config_warnings():
+            st.warning(f"⚠️ {warning}")
+    
     def deduction_config_tab(self):
         """扣除项配置标签页"""
+        self.show_config_warnings()
         col1, col2 = st.columns([1, 1])
         
         with col1:
@@ -866,6 +1096,9 @@ class StreamlitSalaryCalculator:
                     """)
                 
                 optional = st.checkbox("可选扣除项", value=True, help="员工可以选择是否适用此扣除项")
+                pre_tax = False
+                if deduction_type in ["percentage", "fixed_amount"]:
+                    pre_tax = st.checkbox("税前扣除", value=False, help="从应税收入中扣除后再计算个人所得税，如社保、公积金")
                 
                 submitted = st.form_submit_button("添加扣除项", type="primary")
                 
@@ -883,7 +1116,8 @@ class StreamlitSalaryCalculator:
                                 deduction_rate,
                                 deduction_base,
                                 deduction_amount,
-                                optional=optional
+                                optional=optional,
+                                pre_tax=pre_tax
                             )
                             if success:
                                 st.success(f"成功添加扣除项: {deduction_name}")
@@ -923,6 +1157,7 @@ class StreamlitSalaryCalculator:
                         description = f"计算型 - {method}"
                     
                     optional_text = "✅" if config.get("optional", False) else "❌"
+                    pre_tax_text = "✅" if config["type"] != "calculated" and is_pre_tax(name, config) else "❌"
                     
                     items_data.append({
                         "扣除项名称": name,
@@ -932,7 +1167,8 @@ class StreamlitSalaryCalculator:
                             "calculated": "🔢 计算型"
                         }[config["type"]],
                         "描述": description,
-                        "可选": optional_text
+                        "可选": optional_text,
+                        "税前": pre_tax_text
                     })
                 
                 df = pd.DataFrame(items_data)
@@ -944,6 +1180,8 @@ class StreamlitSalaryCalculator:
                 - 📊 **百分比**：按工资百分比计算，如社保8%
                 - 💰 **固定金额**：每月固定金额，如迟到扣款50元
                 - 🔢 **计算型**：复杂算法计算，如个税累进税率
+                
+                **税前**：标记为税前的扣除项先从应税收入中扣除，再计算个人所得税
                 """)
             else:
                 st.info("暂无扣除项配置")
@@ -952,6 +1190,10 @@ class StreamlitSalaryCalculator:
         """税率表管理标签页"""
         st.subheader("📋 个人所得税税率表管理")
         
+        valid, message = self.calculator.validate_tax_brackets()
+        if not valid:
+            st.error(f"❌ {message}")
+        
         col1, col2 = st.columns([1, 1])
         
         with col1:
@@ -1028,6 +1270,22 @@ class StreamlitSalaryCalculator:
                             st.success("更新成功")
                             st.rerun()
 
+        # 金额计算方式
+        st.write("**金额计算方式:**")
+        money = self.calculator.get_money_settings()
+        unit_labels = {"yuan": "按元计算（浮点）", "fen": "按分计算（整数，结果精确到分）"}
+        rounding_labels = {"half_up": "四舍五入", "half_even": "银行家舍入", "down": "舍去", "up": "进一"}
+        with st.form("money_settings_form"):
+            unit = st.radio("计算方式", list(unit_labels), index=list(unit_labels).index(money["unit"]),
+                            format_func=unit_labels.get, horizontal=True)
+            rounding = st.selectbox("扣除项和个税的舍入方式", list(rounding_labels),
+                                    index=list(rounding_labels).index(money["rounding"]),
+                                    format_func=rounding_labels.get)
+            if st.form_submit_button("保存计算方式"):
+                if self.calculator.set_money_settings(unit, rounding):
+                    st.success("计算方式已更新")
+                    st.rerun()
+
 def main():
     app = StreamlitSalaryCalculator()
     app.main()
@@ -0,0 +1,244 @@
+"""
+工资计算器 - 配置参数试算
+把配置中的一个数值参数（扣除比例、固定金额、收入项默认值、起征点、税率档次等）取一组不同的值，
+对整个员工名单一次性计算所有取值下的工资：员工数据只读取一次，每个取值是计算数组中的一行，
+结果为每个取值的公司汇总，以及每个员工相对当前配置的变化。
+"""
+
+import numpy as np
+
+from salary_calculator_columnar import calculate_payroll_columnar
+from salary_calculator_config import assoc_in
+from salary_calculator_plan import STEP_PERCENTAGE, STEP_FIXED_AMOUNT, STEP_PROGRESSIVE_TAX, CalculationPlan
+
+
+class SweepError(ValueError):
+    """试算参数无效（路径不存在、不是数值，或某个取值使配置无法编译）"""
+
+
+def parse_path(path):
+    """把 "deduction_items.社保.rate" 形式的路径转为元组，数字部分作为列表下标"""
+    if isinstance(path, str):
+        path = path.split(".")
+    return tuple(int(key) if isinstance(key, str) and key.isdigit() else key for key in path)
+
+
+def _lookup(config, path):
+    node = config
+    for key in path:
+        try:
+            node = node[key]
+        except (KeyError, IndexError, TypeError):
+            raise SweepError(f"配置中没有参数: {'.'.join(str(key) for key in path)}")
+    return node
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def compile_sweep_plans(config, path, values):
+    """为每个取值编译计算计划，任一取值使配置无效时抛出 SweepError"""
+    path = parse_path(path)
+    if not _is_number(_lookup(config, path)):
+        raise SweepError(f"参数 {'.'.join(str(key) for key in path)} 不是数值，不能试算")
+    plans = []
+    for value in values:
+        if not _is_number(value):
+            raise SweepError(f"试算取值必须是数值: {value!r}")
+        try:
+            plans.append(CalculationPlan.compile(assoc_in(config, path, value)))
+        except ValueError as e:  # TaxBracketError、PlanError
+            raise SweepError(f"取值 {value} 时配置无效: {e}")
+    return plans
+
+
+def _stack(values):
+    """各取值下的参数排成一列 (取值数, 1)；所有取值相同时只保留一行，计算时自动广播"""
+    column = np.asarray(values, dtype=np.float64)
+    if (column == column[0]).all():
+        column = column[:1]
+    return column[:, None]
+
+
+def _tax_sweep(plans, taxable_income):
+    """按各取值的税率表计算个税；税率表都相同时直接用同一张表"""
+    tables = [plan.tax_table for plan in plans]
+    maxs = np.array([table.maxs for table in tables], dtype=np.float64)
+    rates = np.array([table.rates for table in tables], dtype=np.float64)
+    deductions = np.array([table.deductions for table in tables], dtype=np.float64)
+    mins = np.array([table.mins[0] for table in tables], dtype=np.float64)
+    if (maxs == maxs[0]).all() and (rates == rates[0]).all() and (deductions == deductions[0]).all():
+        return tables[0].tax_array(taxable_income)
+
+    # 每个取值一张表：档次下标 = 上限小于应税收入的档次数（与 searchsorted side="left" 相同）
+    taxable_income = np.broadcast_to(taxable_income, (len(plans), taxable_income.shape[1]))
+    indices = (taxable_income[:, :, None] > maxs[:, None, :]).sum(axis=2)
+    rows = np.arange(len(plans))[:, None]
+    tax = taxable_income * rates[rows, indices] - deductions[rows, indices]
+    tax = np.maximum(0, tax)
+    return np.where(taxable_income < mins[:, None], 0.0, tax)
+
+
+def calculate_sweep_columnar(plans, employees):
+    """对同一名单按多份结构相同、数值不同的计算计划一次性计算
+
+    返回 (员工姓名列表, 总收入, 总扣除, 税后收入, 各扣除项)，金额数组形状为 (计划数, 员工数)，
+    每一行与用该计划调用 calculate_payroll_columnar 的结果完全相同
+    """
+    base = plans[0]
+    structure = [(step.name, step.kind, step.base, step.pre_tax) for step in base.steps]
+    for plan in plans[1:]:
+        if ([(step.name, step.kind, step.base, step.pre_tax) for step in plan.steps] != structure
+                or [name for name, _ in plan.income_items] != [name for name, _ in base.income_items]):
+            raise SweepError("试算的各计划收入项、扣除项必须相同")
+    if base.fen is not None:
+        return _calculate_sweep_fen(plans, employees)
+
+    names = []
+    salary_datas = []
+    selections = []
+    for name, employee_data in employees:
+        names.append(name)
+        salary_datas.append(employee_data.get("salary_data", {}))
+        selections.append(employee_data.get("selected_deductions", []))
+    count = len(names)
+    scenarios = len(plans)
+
+    # 收入项：员工填写的值各取值相同，未填写的取各计划的默认值
+    income_rows = {}
+    total_income = np.zeros((1, count), dtype=np.float64)
+    for row, (item_name, _) in enumerate(base.income_items):
+        present = np.fromiter((item_name in data for data in salary_datas), dtype=bool, count=count)
+        values = np.fromiter((data.get(item_name, 0) for data in salary_datas), dtype=np.float64, count=count)
+        defaults = _stack([plan.income_items[row][1] for plan in plans])
+        income_rows[item_name] = np.where(present, values, defaults)
+        total_income = total_income + income_rows[item_name]
+
+    deduction_rows = {name: row for row, name in enumerate(base.deduction_order)}
+    deductions = [np.zeros((1, count))] * len(base.deduction_order)
+    for position, step in enumerate(base.steps):
+        chosen = np.fromiter((step.name in selection for selection in selections), dtype=bool, count=count)
+        plan_steps = [plan.steps[position] for plan in plans]
+
+        kind = step.kind
+        if kind == STEP_PERCENTAGE:
+            amount = income_rows[step.base] * _stack([plan_step.rate for plan_step in plan_steps])
+        elif kind == STEP_FIXED_AMOUNT:
+            present = np.fromiter((step.override_key in data for data in salary_datas), dtype=bool, count=count)
+            values = np.fromiter((data.get(step.override_key, 0) for data in salary_datas),
+                                 dtype=np.float64, count=count)
+            amount = np.where(present, values, _stack([plan_step.amount for plan_step in plan_steps]))
+        elif kind == STEP_PROGRESSIVE_TAX:
+            # 应税收入 = 总收入 - 税前扣除 - 起征点
+            pre_tax_deductions = np.zeros((1, count), dtype=np.float64)
+            for dependency in step.depends_on:
+                pre_tax_deductions = pre_tax_deductions + deductions[deduction_rows[dependency]]
+            taxable_income = np.maximum(0, total_income - pre_tax_deductions
+                                        - _stack([plan.threshold for plan in plans]))
+            amount = _tax_sweep(plans, taxable_income)
+        else:
+            amount = np.zeros((1, count))
+
+        deductions[step.index] = np.where(chosen, amount, 0.0)
+
+    # 合计保持配置顺序
+    total_deductions = np.zeros((1, count), dtype=np.float64)
+    for amount in deductions:
+        total_deductions = total_deductions + amount
+
+    shape = (scenarios, count)
+    total_income = np.broadcast_to(total_income, shape)
+    total_deductions = np.broadcast_to(total_deductions, shape)
+    return (names, total_income, total_deductions, total_income - total_deductions,
+            {name: np.broadcast_to(deductions[row], shape) for name, row in deduction_rows.items()})
+
+
+def _calculate_sweep_fen(plans, employees):
+    """按分计算时逐个计划用列式引擎计算（舍入须在每个取值各自的金额上进行），再叠成数组"""
+    employees = list(employees)
+    payrolls = [calculate_payroll_columnar(plan, employees) for plan in plans]
+    return (payrolls[0].names,
+            np.stack([payroll.total_income for payroll in payrolls]),
+            np.stack([payroll.total_deductions for payroll in payrolls]),
+            np.stack([payroll.net_income for payroll in payrolls]),
+            {name: np.stack([payroll.deductions[row] for payroll in payrolls])
+             for row, name in enumerate(payrolls[0].deduction_items)})
+
+
+class SweepResult:
+    """一次参数试算的结果
+
+    values: 参数的各个取值；baseline: 当前配置下的参数值
+    每个取值的公司汇总及相对当前配置的变化见 totals()，每个员工的变化见 employee_deltas()
+    """
+
+    def __init__(self, path, baseline, values, names, total_income, total_deductions, net_income, deductions):
+        self.path = path
+        self.baseline = baseline
+        self.values = list(values)
+        self.names = names
+        # 第0行为当前配置，之后每行对应一个取值
+        self._total_income = total_income
+        self._total_deductions = total_deductions
+        self._net_income = net_income
+        self._deductions = deductions
+
+    def __len__(self):
+        return len(self.values)
+
+    def totals(self):
+        """每个取值的公司汇总：[{"value", "total_income", "total_deductions", "net_income",
+        "total_income_delta", "total_deductions_delta", "net_income_delta", "deductions_delta": {扣除项: 变化}}]"""
+        total_income = self._total_income.sum(axis=1)
+        total_deductions = self._total_deductions.sum(axis=1)
+        net_income = self._net_income.sum(axis=1)
+        deduction_totals = {name: amounts.sum(axis=1) for name, amounts in self._deductions.items()}
+        return [
+            {
+                "value": value,
+                "total_income": float(total_income[row]),
+                "total_deductions": float(total_deductions[row]),
+                "net_income": float(net_income[row]),
+                "total_income_delta": float(total_income[row] - total_income[0]),
+                "total_deductions_delta": float(total_deductions[row] - total_deductions[0]),
+                "net_income_delta": float(net_income[row] - net_income[0]),
+                "deductions_delta": {name: float(amounts[row] - amounts[0])
+                                     for name, amounts in deduction_totals.items()}
+            }
+            for row, value in enumerate(self.values, start=1)
+        ]
+
+    def net_income_deltas(self):
+        """每个员工税后收入的变化，形状为 (取值数, 员工数)，列顺序同 names"""
+        return self._net_income[1:] - self._net_income[0]
+
+    def deduction_deltas(self, name):
+        """每个员工某一扣除项的变化，形状为 (取值数, 员工数)"""
+        amounts = self._deductions[name]
+        return amounts[1:] - amounts[0]
+
+    def employee_deltas(self, index):
+        """第 index 个取值下每个员工的变化：{员工: {"net_income": 变化, "total_deductions": 变化}}，只列出有变化的员工"""
+        row = index + 1
+        net_delta = self._net_income[row] - self._net_income[0]
+        deduction_delta = self._total_deductions[row] - self._total_deductions[0]
+        return {
+            self.names[column]: {"net_income": float(net_delta[column]),
+                                 "total_deductions": float(deduction_delta[column])}
+            for column in np.flatnonzero((net_delta != 0) | (deduction_delta != 0))
+        }
+
+
+def sweep(config, base_plan, employees, path, values):
+    """在当前配置上试算参数 path 的一组取值，返回 SweepResult
+
+    base_plan: 当前配置编译好的计划（作为比较基准）
+    """
+    path = parse_path(path)
+    values = list(values)
+    plans = compile_sweep_plans(config, path, values)
+    names, total_income, total_deductions, net_income, deductions = calculate_sweep_columnar(
+        [base_plan] + plans, employees)
+    return SweepResult(path, _lookup(config, path), values, names,
+                       total_income, total_deductions, net_income, deductions)
@@ -0,0 +1,85 @@
+"""
+工资计算器 - 预编译累进税率表
+把配置中的税率档次编译成有序的上限、税率、速算扣除数数组，查找用二分法（O(log n)）
+"""
+
+import bisect
+
+import numpy as np
+
+
+class TaxBracketError(ValueError):
+    """税率表不连续、重叠或为空"""
+
+
+class TaxBracketTable:
+    """编译后的累进税率表
+
+    档次按最低收入排序，且必须首尾相接：从0开始、相邻档次 max == 下一档 min、最后一档无上限。
+    区间边界沿用原有规则，恰好落在边界上的收入归入较低的一档。
+    """
+
+    __slots__ = ("mins", "maxs", "rates", "deductions", "_maxs_array", "_rates_array", "_deductions_array")
+
+    def __init__(self, mins, maxs, rates, deductions):
+        self.mins = mins
+        self.maxs = maxs
+        self.rates = rates
+        self.deductions = deductions
+        self._maxs_array = np.asarray(maxs, dtype=np.float64)
+        self._rates_array = np.asarray(rates, dtype=np.float64)
+        self._deductions_array = np.asarray(deductions, dtype=np.float64)
+
+    @classmethod
+    def compile(cls, brackets):
+        """从档次字典列表编译税率表，档次有缺口或重叠时抛出 TaxBracketError"""
+        if not brackets:
+            raise TaxBracketError("税率表为空")
+
+        ordered = sorted(brackets, key=lambda x: x["min"])
+        for i, bracket in enumerate(ordered):
+            if bracket["min"] >= bracket["max"]:
+                raise TaxBracketError(f"第{i+1}档的最低收入必须小于最高收入")
+            if i > 0:
+                previous_max = ordered[i - 1]["max"]
+                if previous_max < bracket["min"]:
+                    raise TaxBracketError(f"第{i}档与第{i+1}档之间有缺口: {previous_max:,} - {bracket['min']:,}")
+                if previous_max > bracket["min"]:
+                    raise TaxBracketError(f"第{i}档与第{i+1}档重叠: {bracket['min']:,} - {previous_max:,}")
+        if ordered[0]["min"] > 0:
+            raise TaxBracketError(f"第1档的最低收入必须为0，当前为{ordered[0]['min']:,}")
+        if ordered[-1]["max"] != float('inf'):
+            raise TaxBracketError("最后一档必须无上限")
+
+        return cls(
+            [b["min"] for b in ordered],
+            [b["max"] for b in ordered],
+            [b["rate"] for b in ordered],
+            [b["deduction"] for b in ordered]
+        )
+
+    def bracket_index(self, taxable_income):
+        """应税收入所在档次的下标（低于第一档时为 -1）"""
+        if taxable_income < self.mins[0]:
+            return -1
+        return bisect.bisect_left(self.maxs, taxable_income)
+
+    def tax(self, taxable_income):
+        """计算单个应税收入的累进税"""
+        index = self.bracket_index(taxable_income)
+        if index < 0:
+            return 0
+        tax = taxable_income * self.rates[index] - self.deductions[index]
+        return max(0, tax)
+
+    def bracket_indices(self, taxable_income):
+        """整列应税收入所在档次的下标"""
+        indices = np.searchsorted(self._maxs_array, taxable_income, side="left")
+        return np.where(taxable_income < self.mins[0], -1, indices)
+
+    def tax_array(self, taxable_income):
+        """对整列应税收入计算累进税"""
+        indices = np.searchsorted(self._maxs_array, taxable_income, side="left")
+        tax = taxable_income * self._rates_array[indices] - self._deductions_array[indices]
+        tax = np.maximum(0, tax)
+        return np.where(taxable_income < self.mins[0], 0.0, tax)
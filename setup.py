@@ -6,11 +6,34 @@ setup(
     description="工资计算器 - 支持员工管理、税率配置的专业工资计算工具",
     author="Salary Calculator Team",
     packages=find_packages(),
+    py_modules=[
+        "start_app",
+        "salary_calculator_core",
+        "salary_calculator_config",
+        "salary_calculator_plan",
+        "salary_calculator_tax",
+        "salary_calculator_columnar",
+        "salary_calculator_fen",
+        "salary_calculator_periods",
+        "salary_calculator_sweep",
+        "salary_calculator_grossup",
+        "salary_calculator_parallel",
+        "salary_calculator_storage",
+        "salary_calculator_import",
+        "salary_calculator_metrics",
+        "salary_calculator_charts",
+        "salary_calculator_cli",
+        "salary_calculator_parquet",
+        "salary_calculator_search",
+        "salary_calculator_streamlit",
+    ],
     include_package_data=True,
     install_requires=[
         "streamlit>=1.28.0",
         "pandas>=1.5.0", 
-        "plotly>=5.15.0"
+        "numpy>=1.21.0",
+        "plotly>=5.15.0",
+        "openpyxl>=3.0.0"
     ],
     python_requires=">=3.7",
     entry_points={
@@ -2,8 +2,12 @@
 """
 工资计算器 - 启动脚本 (Streamlit版)
 支持局域网访问，确保手机等设备可以使用
+
+命令行批量计算（不启动网页界面）:
+    python start_app.py batch --config 工资配置.json --roster 员工名单.csv --output 工资表.csv
 """
 
+import importlib.util
 import subprocess
 import sys
 import os
@@ -11,15 +15,12 @@ import os
 def check_dependencies():
     """检查依赖包"""
     required_packages = [
-        'streamlit', 'pandas', 'plotly'
+        'streamlit', 'pandas', 'plotly', 'numpy'
     ]
     
-    missing_packages = []
-    for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
-            missing_packages.append(package)
+    # 只查找包是否已安装，不真正导入（导入 streamlit 等需要数秒，启动的子进程还会再导入一次）
+    missing_packages = [package for package in required_packages
+                        if importlib.util.find_spec(package) is None]
     
     if missing_packages:
         print(f"缺少依赖包: {', '.join(missing_packages)}")
@@ -61,8 +62,15 @@ def start_streamlit():
     except Exception as e:
         print(f"❌ 启动失败: {e}")
 
-def main():
+def main(argv=None):
     """主函数"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        # 批量计算只需要核心模块，不检查也不导入网页界面的依赖
+        from salary_calculator_cli import main as batch_main
+        sys.exit(batch_main(argv[1:]))
+    
     print("💰 工资计算器")
     print("=" * 30)
     
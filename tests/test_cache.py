@@ -0,0 +1,63 @@
+"""单个工资计算结果缓存的测试"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+
+SALARY = {"基本工资": 20000, "绩效奖金": 3000}
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+
+    def test_repeated_call_hits_cache(self):
+        first = self.calculator.calculate_salary(SALARY)
+        second = self.calculator.calculate_salary(dict(reversed(list(SALARY.items()))))
+        self.assertEqual(first, second)
+        stats = self.calculator.get_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+
+    def test_config_change_invalidates_cached_results(self):
+        before = self.calculator.calculate_salary(SALARY, ["社保"])
+        self.calculator.update_deduction_item("社保", rate=0.2)
+        after = self.calculator.calculate_salary(SALARY, ["社保"])
+        self.assertAlmostEqual(before["deductions"]["社保"], 20000 * 0.105)
+        self.assertAlmostEqual(after["deductions"]["社保"], 20000 * 0.2)
+        self.assertEqual(self.calculator.get_cache_stats()["hits"], 0)
+
+    def test_selected_deductions_are_part_of_the_key(self):
+        with_tax = self.calculator.calculate_salary(SALARY, ["社保", "个人所得税"])
+        without_tax = self.calculator.calculate_salary(SALARY, ["社保"])
+        self.assertIn("个人所得税", with_tax["deductions"])
+        self.assertNotIn("个人所得税", without_tax["deductions"])
+
+    def test_mutating_argument_does_not_change_cached_result(self):
+        selected = ["社保", "公积金"]
+        self.calculator.calculate_salary(SALARY, selected)
+        selected.append("个人所得税")
+
+        result = self.calculator.calculate_salary(SALARY, ["社保", "公积金"])
+        self.assertEqual(result["selected_deductions"], ["社保", "公积金"])
+        self.assertNotIn("个人所得税", result["deductions"])
+
+    def test_mutating_returned_list_does_not_change_cached_result(self):
+        result = self.calculator.calculate_salary(SALARY, ["社保"])
+        result["selected_deductions"].append("公积金")
+
+        again = self.calculator.calculate_salary(SALARY, ["社保"])
+        self.assertEqual(again["selected_deductions"], ["社保"])
+
+        _, summary_result = self.calculator.get_calculation_summary(SALARY, ["社保"])
+        summary_result["selected_deductions"].clear()
+        _, again = self.calculator.get_calculation_summary(SALARY, ["社保"])
+        self.assertEqual(again["selected_deductions"], ["社保"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""命令行批量计算的测试"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_cli import main
+
+
+class JsonRosterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.roster = os.path.join(self.directory.name, "员工名单.json")
+        self.output = os.path.join(self.directory.name, "工资表.json")
+        with open(self.roster, "w", encoding="utf-8") as f:
+            json.dump({
+                "张三": {"salary_data": {"基本工资": 20000}},
+                "李四": {"salary_data": {"基本工资": "x"}},
+                "王五": {"salary_data": {"基本工资": -1}},
+                "赵六": {"salary_data": {"基本工资": 8000}, "selected_deductions": ["不存在"]}
+            }, f, ensure_ascii=False)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_batch(self, *args):
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            code = main(["--roster", self.roster, "--output", self.output, *args])
+        return code, stderr.getvalue()
+
+    def test_invalid_amounts_are_reported_as_invalid_rows(self):
+        code, stderr = self.run_batch()
+        self.assertEqual(code, 0)
+        self.assertIn("第2行 李四: 基本工资: 不是有效数字", stderr)
+        self.assertIn("第3行 王五: 基本工资: 不能为负数", stderr)
+        self.assertIn("第4行 赵六: 未知扣除项: 不存在", stderr)
+        with open(self.output, encoding="utf-8") as f:
+            payload = json.load(f)
+        self.assertEqual(list(payload["employees"]), ["张三"])
+        self.assertEqual(payload["totals"]["headcount"], 1)
+
+    def test_strict_leaves_no_output_file(self):
+        code, _ = self.run_batch("--strict")
+        self.assertEqual(code, 1)
+        self.assertEqual(os.listdir(self.directory.name), ["员工名单.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
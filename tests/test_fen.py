@@ -0,0 +1,144 @@
+"""按分计算的换算和舍入方式测试"""
+
+import json
+import os
+import random
+import sys
+import unittest
+from fractions import Fraction
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_fen import (MAX_FEN, RATE_SCALE, ROUNDING_MODES, FenError, FenTaxTable, divide_rounded,
+                                   divide_rounded_int, to_fen, to_fen_array)
+from salary_calculator_tax import TaxBracketTable
+
+
+def reference_round(fraction, rounding):
+    """用 Fraction 按 rounding 舍入到整数"""
+    magnitude = abs(fraction)
+    whole = int(magnitude)
+    remainder = magnitude - whole
+    if rounding == "down":
+        rounded = whole
+    elif rounding == "up":
+        rounded = whole + (remainder > 0)
+    elif remainder != Fraction(1, 2):
+        rounded = whole + (remainder > Fraction(1, 2))
+    elif rounding == "half_up":
+        rounded = whole + 1
+    else:
+        rounded = whole + whole % 2
+    return -rounded if fraction < 0 else rounded
+
+
+class ToFenTest(unittest.TestCase):
+
+    def test_half_fen_rounds_away_from_zero(self):
+        # 1.005、2.675 的浮点值略小于 x.xx5，仍按 0.5 分进位
+        for value, fen in [(1.005, 101), (2.675, 268), (0.004999, 0), (-1.005, -101), (0.015, 2), (-0.0, 0)]:
+            with self.subTest(value=value):
+                self.assertEqual(to_fen(value), fen)
+                self.assertEqual(int(to_fen_array([value])[0]), fen)
+
+    def test_scalar_matches_array(self):
+        rng = random.Random(1)
+        values = [rng.uniform(-1e6, 1e6) for _ in range(2000)] + [k / 200 for k in range(-1000, 1000)]
+        np.testing.assert_array_equal([to_fen(value) for value in values], to_fen_array(values))
+
+    def test_out_of_range(self):
+        for value in [float("nan"), float("inf"), (MAX_FEN + 1) / 100]:
+            with self.subTest(value=value):
+                with self.assertRaises(FenError):
+                    to_fen(value)
+                with self.assertRaises(FenError):
+                    to_fen_array([value])
+
+
+class DivideRoundedTest(unittest.TestCase):
+
+    def test_modes_match_reference(self):
+        numerators = list(range(-2500, 2501)) + [10 ** 12 + 500, -(10 ** 12) - 1500]
+        for denominator in (1000, 7, RATE_SCALE):
+            for rounding in ROUNDING_MODES:
+                with self.subTest(denominator=denominator, rounding=rounding):
+                    expected = [reference_round(Fraction(n, denominator), rounding) for n in numerators]
+                    np.testing.assert_array_equal(
+                        divide_rounded(np.array(numerators, dtype=np.int64), denominator, rounding), expected)
+                    self.assertEqual([divide_rounded_int(n, denominator, rounding) for n in numerators], expected)
+
+    def test_ties(self):
+        cases = {"half_up": [1, 2, 3, -3], "half_even": [0, 2, 2, -2], "down": [0, 1, 2, -2], "up": [1, 2, 3, -3]}
+        for rounding, expected in cases.items():
+            with self.subTest(rounding=rounding):
+                self.assertEqual([divide_rounded_int(n, 10, rounding) for n in (5, 15, 25, -25)], expected)
+
+
+class FenTaxTableTest(unittest.TestCase):
+
+    def test_scalar_matches_array(self):
+        brackets = SalaryCalculator().config["calculation_methods"]["progressive_tax"]["brackets"]
+        rng = random.Random(2)
+        taxable = [rng.randint(0, 10 ** 9) for _ in range(1000)] + [0, 1, 300000, 300001, 1200000, 1200001]
+        for rounding in ROUNDING_MODES:
+            with self.subTest(rounding=rounding):
+                table = FenTaxTable.compile(TaxBracketTable.compile(brackets), rounding)
+                np.testing.assert_array_equal([table.tax_one(value) for value in taxable],
+                                              table.tax(np.array(taxable, dtype=np.int64)))
+
+
+class FenCalculatorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+        self.calculator.set_money_settings("fen", "half_up")
+
+    def test_deduction_rounding_modes(self):
+        # 12345.67 × 0.105 = 1296.29535，12345.67 × 0.12 = 1481.4804
+        salary = {"基本工资": 12345.67, "绩效奖金": 0, "餐补": 0, "交通补贴": 0}
+        expected = {"half_up": (1296.3, 1481.48), "half_even": (1296.3, 1481.48),
+                    "down": (1296.29, 1481.48), "up": (1296.3, 1481.49)}
+        for rounding, (social, fund) in expected.items():
+            with self.subTest(rounding=rounding):
+                self.calculator.update_deduction_item("社保", rounding=rounding)
+                self.calculator.update_deduction_item("公积金", rounding=rounding)
+                deductions = self.calculator.calculate_salary(salary)["deductions"]
+                self.assertEqual((deductions["社保"], deductions["公积金"]), (social, fund))
+
+    def test_half_even_tie(self):
+        self.calculator.update_deduction_item("社保", rate=0.1, rounding="half_even")
+        self.assertEqual(self.calculator.calculate_salary({"基本工资": 0.25}, ["社保"])["deductions"]["社保"], 0.02)
+        self.calculator.update_deduction_item("社保", rounding="half_up")
+        self.assertEqual(self.calculator.calculate_salary({"基本工资": 0.25}, ["社保"])["deductions"]["社保"], 0.03)
+
+    def test_scalar_matches_columnar_and_totals_are_exact(self):
+        self.calculator.update_deduction_item("公积金", rounding="half_even")
+        rng = random.Random(3)
+        for index in range(300):
+            self.calculator.add_employee(f"员工{index}", {"基本工资": round(rng.uniform(3000, 80000), 2),
+                                                         "绩效奖金": round(rng.uniform(0, 5000), 2)})
+        results = self.calculator.calculate_all_employees()
+        for name, result in results.items():
+            self.assertEqual(result, self.calculator.calculate_salary(
+                self.calculator.employees[name]["salary_data"], result["selected_deductions"]))
+
+        totals = self.calculator.get_company_totals()
+        expected = sum(Fraction(str(result["net_income"])) for result in results.values())
+        self.assertEqual(Fraction(str(totals["net_income"])), expected)
+
+    def test_invalid_settings_are_rejected(self):
+        config = json.loads(self.calculator.export_config())
+        config["deduction_items"]["社保"]["rounding"] = "ceiling"
+        success, message = self.calculator.import_config(json.dumps(config))
+        self.assertFalse(success)
+        self.assertIn("ceiling", message)
+        config["deduction_items"]["社保"].pop("rounding")
+        config["calculation_methods"]["money"]["unit"] = "li"
+        self.assertFalse(self.calculator.import_config(json.dumps(config))[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+"""税后反算的往返测试：按反算出的金额重新计算，税后收入应等于目标"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_grossup import GrossUpError
+
+TARGETS = [3000, 8000, 9000, 15000, 30000, 80000, 500000]
+
+
+class GrossUpTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+
+    def test_round_trip(self):
+        for target in TARGETS:
+            with self.subTest(target=target):
+                result = self.calculator.gross_up(target)
+                amount = result["income_breakdown"]["基本工资"]
+                again = self.calculator.calculate_salary({"基本工资": amount})
+                self.assertAlmostEqual(again["net_income"], target, places=6)
+                self.assertEqual(result["net_income"], again["net_income"])
+
+    def test_other_item_and_selection(self):
+        result = self.calculator.gross_up(20000, {"基本工资": 15000}, ["社保", "个人所得税"], item="绩效奖金")
+        self.assertEqual(result["income_breakdown"]["基本工资"], 15000)
+        self.assertEqual(result["selected_deductions"], ["社保", "个人所得税"])
+        self.assertAlmostEqual(result["net_income"], 20000, places=6)
+
+    def test_unreachable_target(self):
+        with self.assertRaisesRegex(GrossUpError, "无法使税后收入达到"):
+            self.calculator.gross_up(100)
+
+    def test_round_trip_in_fen(self):
+        self.calculator.set_money_settings("fen", "half_up")
+        for target in TARGETS:
+            with self.subTest(target=target):
+                result = self.calculator.gross_up(target)
+                amount = result["income_breakdown"]["基本工资"]
+                self.assertEqual(round(amount, 2), amount)
+                self.assertLessEqual(abs(result["net_income"] - target), 0.05)
+
+    def test_employees(self):
+        self.calculator.add_employee("张三", {"基本工资": 12000})
+        self.calculator.add_employee("李四", {"基本工资": 30000}, ["社保", "个人所得税"])
+        targets = {"张三": 15000, "李四": 40000}
+        amounts = self.calculator.gross_up_employees(targets)
+        for name, target in targets.items():
+            employee_data = self.calculator.employees[name]
+            salary_data = dict(employee_data["salary_data"], 绩效奖金=amounts[name])
+            result = self.calculator.calculate_salary(salary_data, employee_data["selected_deductions"])
+            self.assertAlmostEqual(result["net_income"], target, places=6)
+
+        self.assertIsNone(self.calculator.gross_up_employees({"张三": 1})["张三"])
+        with self.assertRaisesRegex(GrossUpError, "员工不存在"):
+            self.calculator.gross_up_employees({"不存在": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""员工名单批量导入（CSV）的行校验测试"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_import import parse_amount
+
+ROSTER = """员工姓名,基本工资,绩效奖金,适用扣除项,备注
+张三,"¥20,000",3000,社保、个人所得税,
+李四,abc,,,
+,8000,,,
+王五,-1,,,
+
+赵六,9000,,工会,
+孙七,12000,,,
+张三,1,,,
+"""
+
+
+class ParseAmountTest(unittest.TestCase):
+
+    def test_amounts(self):
+        self.assertEqual(parse_amount(" ¥1,234.5 "), 1234.5)
+        self.assertEqual(parse_amount(3), 3.0)
+        self.assertIsNone(parse_amount(""))
+        self.assertIsNone(parse_amount(None))
+        for value, message in [("abc", "不是有效数字"), (float("nan"), "不是有效数字"),
+                               ("inf", "不是有效数字"), (-0.01, "不能为负数"), (True, "不是有效数字")]:
+            with self.assertRaisesRegex(ValueError, message):
+                parse_amount(value)
+
+
+class ImportEmployeesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+
+    def import_roster(self, text, chunk_size=5000):
+        return self.calculator.import_employees(text.encode("utf-8"), "csv", chunk_size=chunk_size)
+
+    def test_invalid_rows_are_reported_with_row_numbers(self):
+        for chunk_size in (5000, 2):
+            with self.subTest(chunk_size=chunk_size):
+                self.calculator = SalaryCalculator()
+                report = self.import_roster(ROSTER, chunk_size)
+
+                errors = [(error["row"], error["name"], error["error"]) for error in report["errors"]]
+                self.assertEqual(errors[:4], [
+                    (3, "李四", "基本工资: 不是有效数字"),
+                    (4, "", "员工姓名不能为空"),
+                    (5, "王五", "基本工资: 不能为负数"),
+                    (7, "赵六", "未知扣除项: 工会"),
+                ])
+                self.assertEqual([(row, name) for row, name, _ in errors[4:]], [(9, "张三")])
+                self.assertEqual(report["imported"], 2)
+                self.assertEqual(report["failed"], 5)
+                self.assertEqual(report["ignored_columns"], ["备注"])
+
+    def test_valid_rows_are_saved(self):
+        self.import_roster(ROSTER)
+
+        self.assertEqual(list(self.calculator.employees), ["张三", "孙七"])
+        zhang = self.calculator.employees["张三"]
+        self.assertEqual(zhang["salary_data"], {"基本工资": 20000.0, "绩效奖金": 3000.0})
+        self.assertEqual(zhang["selected_deductions"], ["社保", "个人所得税"])
+        self.assertEqual(self.calculator.employees["孙七"]["selected_deductions"], ["社保", "公积金", "个人所得税"])
+
+    def test_missing_name_column(self):
+        report = self.import_roster("基本工资\n8000\n")
+        self.assertEqual(report["imported"], 0)
+        self.assertIn("缺少姓名列", report["errors"][0]["error"])
+
+    def test_exported_roster_imports_back(self):
+        self.calculator.add_employee("张三", {"基本工资": 20000, "绩效奖金": 3000}, ["社保", "个人所得税"])
+        self.calculator.add_employee("李四", {"基本工资": 8000})
+        exported = self.calculator.export_employees_to_csv()
+        before = self.calculator.calculate_all_employees()
+
+        other = SalaryCalculator()
+        report = other.import_employees(exported.encode("utf-8"), "csv")
+        self.assertEqual((report["imported"], report["failed"]), (2, 0))
+        after = other.calculate_all_employees()
+        for name in before:
+            self.assertEqual(after[name]["net_income"], before[name]["net_income"])
+            self.assertEqual(after[name]["selected_deductions"], before[name]["selected_deductions"])
+
+
+if __name__ == "__main__":
+    unittest.main()
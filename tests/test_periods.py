@@ -0,0 +1,30 @@
+"""按月累计预扣个税的回归测试"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+
+
+class CalculatePeriodTest(unittest.TestCase):
+
+    def test_previous_month_without_employees(self):
+        """上个月名单为空时，本月按本年首次发薪计算"""
+        calculator = SalaryCalculator()
+        calculator.calculate_period(2026, 1)
+        calculator.add_employee("张三", {"基本工资": 20000})
+
+        period = calculator.calculate_period(2026, 2)
+        first = SalaryCalculator()
+        first.add_employee("张三", {"基本工资": 20000})
+        expected = first.calculate_period(2026, 1)
+
+        self.assertEqual(period.results()["张三"], expected.results()["张三"])
+        self.assertEqual(period.year_to_date("张三")["months"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
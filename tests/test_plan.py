@@ -0,0 +1,106 @@
+"""配置编译为计算计划的测试"""
+
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_plan import STEP_ZERO, CalculationPlan, PlanError, PlanStep, _topological_order
+
+
+class CompilePlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+
+    def config_with(self, edit):
+        config = json.loads(self.calculator.export_config())
+        edit(config)
+        return config
+
+    def test_tax_runs_after_pre_tax_items_but_output_keeps_config_order(self):
+        def move_tax_first(config):
+            items = config["deduction_items"]
+            config["deduction_items"] = {"个人所得税": items.pop("个人所得税"), **items}
+        config = self.config_with(move_tax_first)
+        plan = CalculationPlan.compile(config)
+
+        self.assertEqual([step.name for step in plan.steps], ["社保", "公积金", "个人所得税"])
+        self.assertEqual(plan.steps[-1].depends_on, ("社保", "公积金"))
+        result = plan.evaluate({"基本工资": 20000})
+        self.assertEqual(list(result["deductions"]), ["个人所得税", "社保", "公积金"])
+        expected = self.calculator.calculate_salary({"基本工资": 20000})
+        self.assertEqual(result["deductions"], expected["deductions"])
+        self.assertEqual(result["net_income"], expected["net_income"])
+
+    def test_pre_tax_tax_item_is_rejected(self):
+        def mark_tax_pre_tax(config):
+            config["deduction_items"]["个人所得税"]["pre_tax"] = True
+        config = self.config_with(mark_tax_pre_tax)
+        with self.assertRaisesRegex(PlanError, "不能作为税前扣除"):
+            CalculationPlan.compile(config)
+
+        version = self.calculator.config_version
+        success, message = self.calculator.import_config(json.dumps(config, ensure_ascii=False))
+        self.assertFalse(success)
+        self.assertIn("不能作为税前扣除", message)
+        self.assertEqual(self.calculator.config_version, version)
+
+    def test_cycle_is_rejected(self):
+        steps = [PlanStep("甲", 0, STEP_ZERO, depends_on=("乙",)),
+                 PlanStep("乙", 1, STEP_ZERO, depends_on=("甲",)),
+                 PlanStep("丙", 2, STEP_ZERO)]
+        with self.assertRaisesRegex(PlanError, "循环依赖: 甲, 乙"):
+            _topological_order(steps)
+
+    def test_threshold_and_legacy_pre_tax_items(self):
+        def legacy(config):
+            for item in config["deduction_items"].values():
+                item.pop("pre_tax", None)
+            config["calculation_methods"]["progressive_tax"]["threshold"] = 8000
+        plan = CalculationPlan.compile(self.config_with(legacy))
+        self.assertEqual(plan.threshold, 8000)
+        self.assertEqual(plan.steps[-1].depends_on, ("社保", "公积金"))
+
+
+class MissingBaseTest(unittest.TestCase):
+    """百分比扣除项的计算基数不存在时按0计算并提醒（与编译计划之前的行为一致）"""
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+
+    def test_import_accepts_missing_base_with_warning(self):
+        config = json.loads(self.calculator.export_config())
+        config["deduction_items"]["社保"]["base"] = "已删除的收入项"
+
+        success, message = self.calculator.import_config(json.dumps(config, ensure_ascii=False))
+        self.assertTrue(success)
+        self.assertIn("按0计算", message)
+        self.assertEqual(len(self.calculator.get_config_warnings()), 1)
+        result = self.calculator.calculate_salary({"基本工资": 20000})
+        self.assertEqual(result["deductions"]["社保"], 0.0)
+        self.assertEqual(result["deductions"]["公积金"], 2400.0)
+
+    def test_deleting_a_base_item_is_allowed(self):
+        self.assertEqual(self.calculator.get_salary_item_dependents("基本工资"), ["社保", "公积金"])
+        self.assertTrue(self.calculator.delete_salary_item("基本工资"))
+
+        valid, message = self.calculator.validate_config()
+        self.assertTrue(valid)
+        self.assertIn("社保", message)
+        self.calculator.add_employee("张三", {"绩效奖金": 20000})
+        deductions = self.calculator.calculate_all_employees()["张三"]["deductions"]
+        self.assertEqual((deductions["社保"], deductions["公积金"]), (0.0, 0.0))
+        self.assertEqual(deductions, self.calculator.calculate_salary({"绩效奖金": 20000})["deductions"])
+
+    def test_warning_clears_when_base_is_restored(self):
+        self.calculator.delete_salary_item("基本工资")
+        self.calculator.add_salary_item("基本工资")
+        self.assertEqual(self.calculator.get_config_warnings(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""员工姓名搜索的排序和增量维护测试"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_search import COMPACT_THRESHOLD, EmployeeNameIndex, name_initials
+
+
+class EmployeeNameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.index = EmployeeNameIndex(["张三丰", "张三", "小张", "李四", "Zoe", "张思", "王张三"])
+
+    def test_initials(self):
+        self.assertEqual(name_initials("张三"), "zs")
+        self.assertEqual(name_initials("Zoe 2"), "zoe2")
+
+    def test_order_is_prefix_then_initials_then_substring(self):
+        self.assertEqual(self.index.search("张三"), ["张三", "张三丰", "王张三"])
+        self.assertEqual(self.index.search("张"), ["张三", "张三丰", "张思", "小张", "王张三"])
+        self.assertEqual(self.index.search("zs"), ["张三", "张思", "张三丰"])
+        self.assertEqual(self.index.search("Z"), ["Zoe", "张三", "张思", "张三丰"])
+
+    def test_limit_and_empty_query(self):
+        self.assertEqual(self.index.search("张", limit=2), ["张三", "张三丰"])
+        self.assertEqual(self.index.search("  ", limit=3), ["Zoe", "小张", "张三"])
+        self.assertEqual(self.index.search("不存在"), [])
+
+    def test_incremental_changes(self):
+        self.index.add("老张")
+        self.index.remove("小张")
+        self.index.rename("王张三", "王五")
+        self.assertEqual(self.index.search("张"), ["张三", "张三丰", "张思", "老张"])
+        self.index.add("小张")
+        self.assertEqual(self.index.search("小"), ["小张"])
+
+    def test_results_survive_text_rebuild(self):
+        names = [f"员工{index:05d}" for index in range(COMPACT_THRESHOLD * 2)]
+        index = EmployeeNameIndex()
+        index.add_many(names)
+        for name in names[::2]:
+            index.remove(name)
+        self.assertEqual(index.search("0001", limit=100), [name for name in names[1::2] if "0001" in name])
+        self.assertEqual(len(index), COMPACT_THRESHOLD)
+
+
+class SearchEmployeesTest(unittest.TestCase):
+
+    def test_index_follows_roster_changes(self):
+        calculator = SalaryCalculator()
+        calculator.add_employee("张三", {})
+        self.assertEqual(calculator.search_employees("zs"), ["张三"])
+
+        calculator.add_employees([("张四", {}, None), ("李四", {}, None)])
+        calculator.rename_employee("张三", "王五")
+        calculator.delete_employee("李四")
+        self.assertEqual(calculator.search_employees("四"), ["张四"])
+        self.assertEqual(calculator.search_employees("张"), ["张四"])
+        self.assertEqual(calculator.search_employees("ww"), ["王五"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""紧凑员工存储的编码、解码和名单顺序测试"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_storage import COMPACT_MIN_HOLES, CompactEmployeeRepository
+
+EMPLOYEES = {
+    "默认值": {"salary_data": {"基本工资": 10000, "绩效奖金": 2000}, "selected_deductions": ["社保", "公积金"]},
+    "类型不同": {"salary_data": {"基本工资": 10000.0, "餐补": 500}, "selected_deductions": []},
+    "另存金额": {"salary_data": {"加班费": 1234.5, "基本工资": 30000}, "selected_deductions": ["个人所得税"]},
+    "其他键": {"salary_data": {"deduction_餐费": 200, "未登记收入项": 1, "基本工资": 0},
+            "selected_deductions": ["个人所得税", "社保", "未登记扣除项", "社保"]},
+    "空数据": {"salary_data": {}, "selected_deductions": []},
+}
+
+
+class CompactEmployeeRepositoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calculator = SalaryCalculator()
+        self.repository = CompactEmployeeRepository(self.calculator.config)
+        for name, employee_data in EMPLOYEES.items():
+            self.repository[name] = employee_data
+
+    def assertSameEmployee(self, actual, expected):
+        self.assertEqual(actual, expected)
+        for key, value in expected["salary_data"].items():
+            self.assertIs(type(actual["salary_data"][key]), type(value), key)
+
+    def test_round_trip(self):
+        self.assertEqual(list(self.repository), list(EMPLOYEES))
+        for name, employee_data in EMPLOYEES.items():
+            self.assertSameEmployee(self.repository[name], employee_data)
+        self.assertEqual(dict(self.repository.items()), EMPLOYEES)
+
+    def test_returned_data_is_a_copy(self):
+        employee_data = self.repository["默认值"]
+        employee_data["salary_data"]["基本工资"] = 1
+        employee_data["selected_deductions"].append("个人所得税")
+        self.assertEqual(self.repository["默认值"], EMPLOYEES["默认值"])
+
+    def test_changed_default_is_re_encoded(self):
+        self.calculator.update_salary_item("基本工资", default=30000)
+        self.calculator.update_salary_item("餐补", default=500.0)
+        self.repository.sync_config(self.calculator.config)
+
+        for name, employee_data in EMPLOYEES.items():
+            self.assertSameEmployee(self.repository[name], employee_data)
+        columns = self.repository.roster_columns()
+        np.testing.assert_array_equal(columns.values("基本工资", -1), [10000, 10000, 30000, 0, -1])
+
+    def test_roster_columns_follow_changes(self):
+        columns = self.repository.roster_columns()
+        self.assertIs(self.repository.roster_columns(), columns)
+        np.testing.assert_array_equal(columns.values("加班费", -1), [-1, -1, 1234.5, -1, -1])
+
+        self.repository["默认值"] = {"salary_data": {"加班费": 7}, "selected_deductions": ["社保"]}
+        columns = self.repository.roster_columns()
+        np.testing.assert_array_equal(columns.values("加班费", -1), [7, -1, 1234.5, -1, -1])
+        np.testing.assert_array_equal(columns.chosen("社保"), [True, False, False, True, False])
+        self.assertEqual(list(columns.selections[3]), EMPLOYEES["其他键"]["selected_deductions"])
+
+    def test_rename_keeps_id_and_position(self):
+        employee_id = self.repository.employee_id("类型不同")
+        self.repository.rename("类型不同", "改名")
+
+        self.assertEqual(list(self.repository)[1], "改名")
+        self.assertEqual(self.repository.employee_id("改名"), employee_id)
+        self.assertEqual(self.repository.get_by_id(employee_id), ("改名", EMPLOYEES["类型不同"]))
+        with self.assertRaises(ValueError):
+            self.repository.rename("改名", "默认值")
+
+    def test_deleted_holes_are_compacted(self):
+        repository = CompactEmployeeRepository(self.calculator.config)
+        count = COMPACT_MIN_HOLES * 2 + 10
+        for index in range(count):
+            repository[f"员工{index}"] = {"salary_data": {"基本工资": index}, "selected_deductions": []}
+        ids = {name: repository.employee_id(name) for name in repository}
+        kept = [f"员工{index}" for index in range(0, count, 3)]
+        for name in list(repository):
+            if name not in kept:
+                del repository[name]
+
+        self.assertLess(len(repository._records), count - COMPACT_MIN_HOLES)
+        self.assertEqual(list(repository), kept)
+        for name in kept:
+            self.assertEqual(repository.get_by_id(ids[name])[0], name)
+        with self.assertRaises(KeyError):
+            repository.get_by_id(ids["员工1"])
+        repository["新员工"] = {"salary_data": {}, "selected_deductions": []}
+        self.assertEqual(repository.employee_id("新员工"), count)
+
+
+class RenameEmployeeTest(unittest.TestCase):
+
+    def test_renamed_result_keeps_roster_position(self):
+        calculator = SalaryCalculator()
+        for name, salary in [("甲", 8000), ("乙", 12000), ("丙", 20000)]:
+            calculator.add_employee(name, {"基本工资": salary})
+        before = calculator.calculate_all_employees()
+
+        self.assertTrue(calculator.rename_employee("乙", "丁"))
+        after = calculator.calculate_all_employees()
+        self.assertEqual(list(after), ["甲", "丁", "丙"])
+        self.assertEqual(after["丁"], before["乙"])
+        page = calculator.get_employee_page(1, 10, sort_by="net_income")
+        self.assertEqual([name for name, _ in page["employees"]], ["甲", "丁", "丙"])
+        page = calculator.get_employee_page(1, 10, sort_by="name")
+        self.assertEqual([name for name, _ in page["employees"]], sorted(["甲", "丁", "丙"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+"""配置参数试算与逐个取值重新计算一致性的测试"""
+
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_sweep import SweepError, parse_path
+
+EMPLOYEES = [
+    ("张三", {"基本工资": 20000, "绩效奖金": 3500.5}, None),
+    ("李四", {"基本工资": 6000}, ["社保", "餐费"]),
+    ("王五", {"绩效奖金": 0, "deduction_餐费": 120}, ["社保", "公积金", "餐费", "个人所得税"]),
+    ("赵六", {"基本工资": 55000, "加班费": 1234.56}, ["个人所得税", "餐费"]),
+    ("孙七", {}, []),
+]
+
+CASES = [
+    ("deduction_items.社保.rate", [0.08, 0.105, 0.13]),
+    ("deduction_items.餐费.amount", [0, 99.99, 300]),
+    ("salary_items.绩效奖金.default", [0, 2500]),
+    ("calculation_methods.progressive_tax.threshold", [3000, 8000]),
+    ("calculation_methods.progressive_tax.brackets.2.rate", [0.15, 0.25]),
+]
+
+
+def build_calculator(money_unit=None):
+    calculator = SalaryCalculator()
+    calculator.add_deduction_item("餐费", "fixed_amount", amount=200)
+    if money_unit is not None:
+        calculator.set_money_settings(money_unit, "half_up")
+    calculator.add_employees(EMPLOYEES)
+    return calculator
+
+
+def recompute(calculator, path, value):
+    """按修改了一个参数的配置重新计算整个名单"""
+    config = json.loads(calculator.export_config())
+    node = config
+    keys = parse_path(path)
+    for key in keys[:-1]:
+        node = node[key]
+    node[keys[-1]] = value
+    other = SalaryCalculator()
+    success, message = other.import_config(json.dumps(config))
+    assert success, message
+    other.add_employees(EMPLOYEES)
+    return other.calculate_all_employees_columnar()
+
+
+class SweepConfigTest(unittest.TestCase):
+
+    def check_matches_recompute(self, calculator):
+        for path, values in CASES:
+            with self.subTest(path=path):
+                result = calculator.sweep_config(path, values)
+                totals = result.totals()
+                base = calculator.calculate_all_employees_columnar()
+                for index, value in enumerate(values):
+                    payroll = recompute(calculator, path, value)
+                    np.testing.assert_array_equal(result.net_income_deltas()[index],
+                                                  payroll.net_income - base.net_income)
+                    self.assertEqual(totals[index]["net_income"], float(payroll.net_income.sum()))
+                    self.assertEqual(totals[index]["total_deductions"], float(payroll.total_deductions.sum()))
+
+    def test_sweep_matches_recompute(self):
+        self.check_matches_recompute(build_calculator())
+
+    def test_sweep_matches_recompute_in_fen(self):
+        self.check_matches_recompute(build_calculator("fen"))
+
+    def test_current_value_has_no_deltas(self):
+        calculator = build_calculator()
+        result = calculator.sweep_config("deduction_items.社保.rate", [0.105, 0.2])
+        self.assertEqual(result.employee_deltas(0), {})
+        self.assertEqual(set(result.employee_deltas(1)), {"张三", "李四", "王五"})
+        self.assertGreater(result.totals()[1]["deductions_delta"]["社保"], 0)
+
+    def test_invalid_sweeps_leave_config_unchanged(self):
+        calculator = build_calculator()
+        version = calculator.config_version
+        for path, values in [("deduction_items.不存在.rate", [0.1]),
+                             ("deduction_items.社保.base", [1]),
+                             ("deduction_items.社保.rate", ["x"]),
+                             ("calculation_methods.progressive_tax.brackets.2.min", [9000])]:
+            with self.subTest(path=path), self.assertRaises(SweepError):
+                calculator.sweep_config(path, values)
+        self.assertEqual(calculator.config_version, version)
+
+
+if __name__ == "__main__":
+    unittest.main()
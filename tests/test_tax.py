@@ -0,0 +1,70 @@
+"""累进税率表编译和查找的测试"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from salary_calculator_core import SalaryCalculator
+from salary_calculator_tax import TaxBracketError, TaxBracketTable
+
+BRACKETS = [
+    {"min": 0, "max": 3000, "rate": 0.03, "deduction": 0},
+    {"min": 3000, "max": 12000, "rate": 0.10, "deduction": 210},
+    {"min": 12000, "max": float('inf'), "rate": 0.20, "deduction": 1410}
+]
+
+
+class TaxBracketTableTest(unittest.TestCase):
+
+    def test_gap_is_rejected(self):
+        brackets = [dict(bracket) for bracket in BRACKETS]
+        brackets[1]["min"] = 4000
+        with self.assertRaisesRegex(TaxBracketError, "第1档与第2档之间有缺口"):
+            TaxBracketTable.compile(brackets)
+
+    def test_overlap_is_rejected(self):
+        brackets = [dict(bracket) for bracket in BRACKETS]
+        brackets[1]["min"] = 2000
+        with self.assertRaisesRegex(TaxBracketError, "第1档与第2档重叠"):
+            TaxBracketTable.compile(brackets)
+
+    def test_first_and_last_bracket_are_checked(self):
+        with self.assertRaisesRegex(TaxBracketError, "税率表为空"):
+            TaxBracketTable.compile([])
+        with self.assertRaisesRegex(TaxBracketError, "第1档的最低收入必须为0"):
+            TaxBracketTable.compile(BRACKETS[1:])
+        with self.assertRaisesRegex(TaxBracketError, "最后一档必须无上限"):
+            TaxBracketTable.compile(BRACKETS[:2])
+
+    def test_brackets_are_sorted_and_boundaries_belong_to_lower_bracket(self):
+        table = TaxBracketTable.compile(list(reversed(BRACKETS)))
+        self.assertEqual(table.bracket_index(3000), 0)
+        self.assertEqual(table.bracket_index(3000.01), 1)
+        self.assertAlmostEqual(table.tax(3000), 90)
+        self.assertAlmostEqual(table.tax(20000), 2590)
+
+    def test_array_lookup_matches_scalar(self):
+        table = TaxBracketTable.compile(BRACKETS)
+        incomes = np.array([0, 1, 2999.99, 3000, 3000.01, 11999, 12000, 12000.5, 1e7])
+        np.testing.assert_array_equal(table.tax_array(incomes), [table.tax(income) for income in incomes])
+
+
+class ValidateTaxBracketsTest(unittest.TestCase):
+
+    def test_invalid_table_is_reported_not_raised(self):
+        calculator = SalaryCalculator()
+        brackets = calculator.config["calculation_methods"]["progressive_tax"]["brackets"]
+        calculator.update_tax_bracket(0, max_income=brackets[0]["max"] - 1)
+
+        valid, message = calculator.validate_tax_brackets()
+        self.assertFalse(valid)
+        self.assertIn("缺口", message)
+        self.assertFalse(calculator.validate_config()[0])
+
+
+if __name__ == "__main__":
+    unittest.main()